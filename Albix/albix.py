@@ -10,13 +10,33 @@ Author: JJ Posti <techtimejourney.net>
 
 import sys
 sys.dont_write_bytecode = True
+import albix_startup
+_startup = albix_startup.StartupTimer()
 import os
-import json
-import random
 from os.path import basename, splitext
 
+APP_VERSION = "6.0"
+
 # ----- REQUIRE lyrics module next to this script or in PYTHONPATH -----
 import albix_lyrics
+import albix_playlist
+import albix_import
+import albix_library
+import albix_playlist_io
+import albix_search
+import albix_gapless
+import albix_core
+import albix_session
+import albix_metrics
+# albix_radio (asyncio, ssl) and albix_stations (the station database) load on first use
+albix_radio = None
+albix_stations = None
+
+def _load_radio():
+    global albix_radio, albix_stations
+    if albix_stations is None:
+        import albix_radio
+        import albix_stations
 
 # ---------------- PyQt6 first, fallback to PyQt5 ----------------
 USING_QT6 = False
@@ -26,11 +46,10 @@ try:
     from PyQt6.QtGui import QIcon, QAction, QKeySequence
     from PyQt6.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-        QListWidget, QFileDialog, QSlider, QAbstractItemView, QMessageBox, QLabel,
+        QListView, QFileDialog, QSlider, QAbstractItemView, QMessageBox, QLabel,
         QTabWidget, QLineEdit, QStatusBar, QMenuBar
     )
-    from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-    from PyQt6.QtMultimediaWidgets import QVideoWidget
+    from PyQt6.QtMultimedia import QMediaPlayer
     USING_QT6 = True
     print("Using PyQt6")
 except Exception as e:
@@ -40,13 +59,13 @@ except Exception as e:
     from PyQt5.QtGui import QIcon, QKeySequence
     from PyQt5.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-        QListWidget, QFileDialog, QSlider, QAbstractItemView, QMessageBox, QLabel,
+        QListView, QFileDialog, QSlider, QAbstractItemView, QMessageBox, QLabel,
         QTabWidget, QLineEdit, QStatusBar, QMenuBar, QAction
     )
-    from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-    from PyQt5.QtMultimediaWidgets import QVideoWidget
+    from PyQt5.QtMultimedia import QMediaPlayer
     USING_QT6 = False
     print("Using PyQt5")
+_startup.mark("imports")
 
 # ---------------- Cross-version helpers ----------------
 def align_center():
@@ -67,6 +86,14 @@ def file_dialog_options(use_native: bool = False):
             opt |= QFileDialog.DontUseNativeDialog
         return opt
 
+def _video_widget_class():
+    # QtMultimediaWidgets is only loaded once a video actually plays
+    if USING_QT6:
+        from PyQt6.QtMultimediaWidgets import QVideoWidget
+    else:
+        from PyQt5.QtMultimediaWidgets import QVideoWidget
+    return QVideoWidget
+
 def _is_wayland() -> bool:
     try:
         plat = QtWidgets.QApplication.platformName()
@@ -90,30 +117,32 @@ def _safe_bring_to_front(w):
 
 # ---------------- Animated button (simple hover) ----------------
 class AnimatedButton(QtWidgets.QPushButton):
+    # shared by every button: built once, not per instance
+    _default = """
+        QPushButton {
+            color: #e5e9ec;
+            background-color: #2e3a41;
+            border: 1px solid #3b474e;
+            border-radius: 10px;
+            padding: 10px 14px;
+            min-width: 88px;
+            font-weight: 600;
+        }
+    """
+    _hover = """
+        QPushButton {
+            color: #ffffff;
+            background-color: #3b474e;
+            border: 1px solid #4d5960;
+            border-radius: 10px;
+            padding: 10px 14px;
+            min-width: 88px;
+            font-weight: 600;
+        }
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._default = """
-            QPushButton {
-                color: #e5e9ec;
-                background-color: #2e3a41;
-                border: 1px solid #3b474e;
-                border-radius: 10px;
-                padding: 10px 14px;
-                min-width: 88px;
-                font-weight: 600;
-            }
-        """
-        self._hover = """
-            QPushButton {
-                color: #ffffff;
-                background-color: #3b474e;
-                border: 1px solid #4d5960;
-                border-radius: 10px;
-                padding: 10px 14px;
-                min-width: 88px;
-                font-weight: 600;
-            }
-        """
         self.setStyleSheet(self._default)
 
     def enterEvent(self, e):
@@ -126,8 +155,19 @@ class AnimatedButton(QtWidgets.QPushButton):
 
 # ---------------- Main Window ----------------
 class MainWindow(QMainWindow):
-    SUPPORTED_VIDEO_EXTENSIONS = {".mp4", ".avi", ".mkv", ".mov", ".wmv"}
-    SUPPORTED_AUDIO_EXTENSIONS = {".mp3", ".ogg", ".flac", ".wav"}
+    SUPPORTED_VIDEO_EXTENSIONS = albix_core.VIDEO_EXTENSIONS
+    SUPPORTED_AUDIO_EXTENSIONS = albix_core.AUDIO_EXTENSIONS
+    # Save dialog filter -> extension appended when the user typed none
+    PLAYLIST_SAVE_FILTERS = {
+        "Albix Playlist (*.jsonl)": ".jsonl",
+        "JSON Files (*.json)": ".json",
+        "M3U8 Playlist (*.m3u8)": ".m3u8",
+        "PLS Playlist (*.pls)": ".pls",
+        "XSPF Playlist (*.xspf)": ".xspf",
+    }
+
+    # Slider/time/lyrics refresh rate while playing (ALBIX_UI_HZ overrides)
+    POSITION_UPDATE_HZ = 10
 
     def __init__(self):
         super().__init__()
@@ -137,68 +177,139 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1000, 700)
         self.setAcceptDrops(True)
 
-        # Playlist & state
-        self.playlist = []
-        self.current_song_index = -1
-        self.current_radio = None
-        self.shuffle_mode = False
-        self.repeat_mode = False
+        # Playlist & state (self.playlist is the model's live entry list)
+        self.library = albix_library.get_library()
+        self.playlist_model = albix_playlist.PlaylistModel(self, library=self.library,
+                                                           namer=albix_lyrics.display_names)
+        self.playlist = self.playlist_model.entries
+        # Playlist position, shuffle/repeat and stations live in the headless controller;
+        # the window plays what it asks for
+        # the station directory is opened with the Radio tab or the first station (_ensure_radio)
+        self.stations = None
+        self.controller = albix_core.PlaybackController(self, model=self.playlist_model,
+                                                        stations=albix_core.StationRegistry({}))
+        self.controller.trackRequested.connect(self._load_track)
+        self.controller.stationRequested.connect(self._load_station)
+        self.controller.stopRequested.connect(self.stop_song)
+        self.controller.restartRequested.connect(self._restart_track)
+        self.controller.message.connect(lambda text: self.status_bar.showMessage(text))
+        # Now-playing reader and reconnect supervisor, built with the station directory
+        self.stream_titles = None
+        self.stream_guard = None
+        self._stream_song = None      # (artist, title) from the stream, for a lyrics dock built later
+        self._stream_url = None       # URL the player has now (primary or failover)
+        # Timing spans of the hot paths (see albix_metrics); the stats dock is built on first use
+        self.metrics = albix_metrics.get_metrics()
+        self.stats_dock = None
         self.current_media_type = 'audio'
         self._lyrics_visible = False
 
+        # Background ingestion: folder walks and playlist files, one at a time
+        self._queued = QtCore.Qt.ConnectionType.QueuedConnection if USING_QT6 else QtCore.Qt.QueuedConnection
+        self._import_worker = None
+        self._import_job_id = 0       # monotonically increasing; late signals from older jobs are ignored
+        self._import_kind = None      # "folder" | "playlist"
+        self._import_source = ""
+        self._import_queue = []       # folder roots dropped while a walk is running
+        self._import_threads = []     # live threads, incl. cancelled ones still winding down
+
+        # Search indexes behind the filter boxes (playlist index is built on first use)
+        self._playlist_index = None
+        self._playlist_filter_timer = QtCore.QTimer(self)
+        self._playlist_filter_timer.setSingleShot(True)
+        self._playlist_filter_timer.timeout.connect(self._apply_playlist_filter)
+        self.playlist_model.rowsInserted.connect(self._on_playlist_rows_inserted)
+        self.playlist_model.rowsAboutToBeRemoved.connect(self._on_playlist_rows_removing)
+        self.playlist_model.modelReset.connect(self._on_playlist_reset)
+        for sig in (self.playlist_model.rowsRemoved, self.playlist_model.rowsMoved, self.playlist_model.layoutChanged):
+            sig.connect(self._refilter_playlist_now)
+
         # Track-end watchdog
         self._duration_ms = 0
         self._end_guard = False
 
-        # Radio stations
-        self.radio_stations = {
-            "Triple J (Australia)": "https://live-radio01.mediahubaustralia.com/2TJW/mp3/",
-            "Radio Paradise (USA)": "https://stream.radioparadise.com/mp3-192",
-            "FIP (France)": "https://icecast.radiofrance.fr/fip-midfi.mp3",
-            "SomaFM: Indie Pop Rocks (USA)": "https://ice2.somafm.com/indiepop-128-mp3",
-            "Radio Nova (France)": "https://novazz.ice.infomaniak.ch/novazz-128.mp3",
-            "181.fm The Rock! (USA)": "https://listen.181fm.com/181-rock_128k.mp3",
-            "Big R Radio: Top 40 Hits (USA)": "https://bigrradio.cdnstream1.com/5104_128",
-            "Yle Radio Suomi(FI)":"https://icecast.live.yle.fi/radio/YleRS/icecast.audio",
-            "YleX(FI)":"https://icecast.live.yle.fi/radio/YleX/icecast.audio",
-            "Yle Vega(FI)":"https://icecast.live.yle.fi/radio/YleVega/icecast.audio",
-            "Yle Klassinen(FI)":"https://icecast.live.yle.fi/radio/YleKlassinen/icecast.audio",
-            "Järviradio(FI)":"https://jarviradio.radiotaajuus.fi:9000/jr",
-        }
-
-        # Multimedia setup
-        if USING_QT6:
-            self.player = QMediaPlayer(self)
-            self.audio_out = QAudioOutput(self)
-            self.player.setAudioOutput(self.audio_out)
-            self.player.playbackStateChanged.connect(self._on_playback_state_changed)
-            self.player.positionChanged.connect(self.update_slider)
-            self.player.durationChanged.connect(self.set_duration)
-            self.player.mediaStatusChanged.connect(self.handle_media_status)
-            self.player.errorOccurred.connect(self.handle_error)
-        else:
-            self.player = QMediaPlayer(self)
-            self.player.stateChanged.connect(self._on_state_changed)
-            self.player.positionChanged.connect(self.update_slider)
-            self.player.durationChanged.connect(self.set_duration)
-            self.player.mediaStatusChanged.connect(self.handle_media_status)
-            self.player.error.connect(self.handle_error)
+        # Position display: polled at a fixed rate while playing instead of on every positionChanged
+        self._position_timer = QtCore.QTimer(self)
+        self._position_timer.timeout.connect(self._on_position_tick)
+        self._last_position = -1      # last position pushed to the UI
+        self._shown_second = -1       # second currently shown in the time label
+        self._shown_slider = -1       # slider value currently shown
+        self._lyrics_update = None    # bound lyrics.update_position, resolved once
+        self.set_position_update_hz(os.environ.get("ALBIX_UI_HZ") or self.POSITION_UPDATE_HZ)
+
+        # Multimedia setup: two players, the idle one pre-rolls the next track
+        self.gapless_mode = True
+        self.deck = albix_gapless.PlayerDeck(self)
+        self.deck.stateChanged.connect(self._on_playback_state_changed if USING_QT6 else self._on_state_changed)
+        self.deck.durationChanged.connect(self.set_duration)
+        self.deck.mediaStatusChanged.connect(self.handle_media_status)
+        self.deck.errorOccurred.connect(self.handle_error)
+        self.deck.switched.connect(self._on_track_switched)
+        self._preroll_timer = QtCore.QTimer(self)
+        self._preroll_timer.setSingleShot(True)
+        self._preroll_timer.setInterval(albix_gapless.PREROLL_DELAY_MS)
+        self._preroll_timer.timeout.connect(self._preroll_next)
+        for sig in (self.playlist_model.rowsInserted, self.playlist_model.rowsRemoved,
+                    self.playlist_model.rowsMoved, self.playlist_model.layoutChanged, self.playlist_model.modelReset):
+            sig.connect(self._schedule_preroll)
 
         # UI
         self._apply_dark_theme()
         self._build_ui()
 
-        # ---- Lyrics integration (show/hide only) ----
-        try:
-            self.lyrics = albix_lyrics.AlbixLyrics(self, video_widget=self.video_widget)
-        except Exception as e:
-            self.lyrics = None
-            QMessageBox.warning(self, "Lyrics",
-                                f"Failed to initialize Albix Lyrics module:\n{e}")
+        # ---- Lyrics integration (show/hide only; the dock is built on first toggle) ----
+        self.lyrics = None
+        self._lyrics_failed = False
 
         # Initialize volume to slider value
         self.change_volume(self.volume_slider.value())
 
+        # Session snapshot: restored now (the list fills in over the next event-loop passes),
+        # saved periodically and on exit; the playlist file is rewritten only after edits
+        self.session = albix_session.SessionStore() if albix_session.SESSION_ENABLED else None
+        self._session_fill = None         # (PlaylistSnapshot, next row, state) while restoring
+        self._session_dirty = False       # playlist changed since the last snapshot
+        self._pending_seek = None         # (path, ms): resume point applied once the track loads
+        self._session_fill_timer = QtCore.QTimer(self)
+        self._session_fill_timer.setInterval(0)
+        self._session_fill_timer.timeout.connect(self._continue_session_fill)
+        self._session_timer = QtCore.QTimer(self)
+        self._session_timer.setInterval(albix_session.SESSION_SAVE_INTERVAL_MS)
+        self._session_timer.timeout.connect(self._save_session)
+        for sig in (self.playlist_model.rowsInserted, self.playlist_model.rowsRemoved,
+                    self.playlist_model.rowsMoved, self.playlist_model.layoutChanged, self.playlist_model.modelReset):
+            sig.connect(self._mark_session_dirty)
+        self.playlist_model.modelReset.connect(self._drop_session_fill)
+        if self.session is not None:
+            self._restore_session()
+            self._session_timer.start()
+
+    @property
+    def player(self):
+        """The QMediaPlayer currently playing (the deck swaps players between tracks)."""
+        return self.deck.player
+
+    # Playback state, as kept by the controller
+    @property
+    def current_song_index(self) -> int:
+        return self.controller.current_row
+
+    @current_song_index.setter
+    def current_song_index(self, row: int):
+        self.controller.current_row = row
+
+    @property
+    def current_radio(self):
+        return self.controller.current_station
+
+    @property
+    def shuffle_mode(self) -> bool:
+        return self.controller.shuffle_mode
+
+    @property
+    def repeat_mode(self) -> bool:
+        return self.controller.repeat
+
     # ---------------- Drag & Drop ----------------
     def dragEnterEvent(self, event: QtGui.QDragEnterEvent) -> None:
         if event.mimeData().hasUrls():
@@ -215,22 +326,141 @@ class MainWindow(QMainWindow):
             super().dropEvent(event)
 
     def _process_dropped_files(self, files):
-        for file_path in files:
-            ext = splitext(file_path)[1].lower()
-            if ext in self.SUPPORTED_VIDEO_EXTENSIONS:
-                mtype = "video"
-            elif ext in self.SUPPORTED_AUDIO_EXTENSIONS:
-                mtype = "audio"
+        # Files and folders alike go through the background walker: no stat() on the GUI thread
+        files = [f for f in files if f]
+        if files:
+            self._start_import(files)
+
+    # ---------------- Background folder import ----------------
+    def _media_ext_types(self):
+        return albix_core.media_ext_types()
+
+    def _start_import(self, roots):
+        if self._import_worker is not None:
+            if self._import_kind == "folder":
+                self._import_queue.extend(roots)
+                return
+            self._retire_import()
+        self._import_job_id += 1
+        self.metrics.begin("import", "add_folder")
+        worker = albix_import.FolderImportWorker(self._import_job_id, roots, self._media_ext_types(),
+                                                 library=self.library)
+        worker.tagging.connect(self._on_import_tagging, self._queued)
+        self._run_import(worker, "folder", "Importing…")
+
+    def _start_playlist_load(self, file_name: str):
+        # A load replaces the playlist: anything still streaming in is dropped
+        self._import_queue.clear()
+        self._retire_import()
+        self.playlist_model.clear()
+        self.current_song_index = -1
+        self._update_controls_enabled()
+        self._import_job_id += 1
+        self.metrics.begin("import", "load_playlist", format=splitext(file_name)[1])
+        worker = albix_import.PlaylistLoadWorker(self._import_job_id, file_name, self._media_ext_types())
+        worker.failed.connect(self._on_playlist_load_failed, self._queued)
+        self._import_source = file_name
+        self._run_import(worker, "playlist", f"Loading playlist {basename(file_name)}…")
+
+    def _run_import(self, worker, kind: str, message: str):
+        thread = QtCore.QThread(self)
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        worker.batch.connect(self._on_import_batch, self._queued)
+        worker.progress.connect(self._on_import_progress, self._queued)
+        worker.finished.connect(self._on_import_finished, self._queued)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda t=thread: self._import_threads.remove(t) if t in self._import_threads else None)
+
+        self._import_threads.append(thread)
+        self._import_worker = worker
+        self._import_kind = kind
+        self.import_cancel_button.show()
+        self.status_bar.showMessage(message)
+        thread.start()
+
+    def _retire_import(self):
+        """Cancel the running worker and stop listening to it; its thread winds down on its own."""
+        if self._import_worker is not None:
+            self._import_worker.cancel()
+        self._import_worker = None
+        self._import_kind = None
+        self.import_cancel_button.hide()
+
+    def cancel_import(self):
+        self._import_queue.clear()
+        if self._import_worker is not None:
+            self._import_worker.cancel()
+
+    def _is_current_import(self, job_id: int) -> bool:
+        w = self._import_worker
+        return w is not None and job_id == w.job_id and not w.is_cancelled()
+
+    @QtCore.pyqtSlot(int, object)
+    def _on_import_batch(self, job_id: int, entries):
+        if not self._is_current_import(job_id):
+            return
+        # Stream URLs from foreign playlists become radio stations, not tracks
+        tracks = []
+        for it in entries:
+            if it["type"] == "radio":
+                self._add_station(it.get("title") or it["path"], it["path"])
             else:
-                continue
-            if not os.path.exists(file_path):
-                continue
-            if any(it["path"] == file_path for it in self.playlist):
-                continue
-            self.playlist.append({"path": file_path, "type": mtype})
-            self.playlist_widget.addItem(basename(file_path))
+                tracks.append(it)
+        self.playlist_model.add_entries(tracks)
         self._update_controls_enabled()
 
+    @QtCore.pyqtSlot(int, int, int)
+    def _on_import_progress(self, job_id: int, a: int, b: int):
+        if not self._is_current_import(job_id):
+            return
+        if self._import_kind == "playlist":
+            self.status_bar.showMessage(f"Loading playlist… {a} entries")
+        else:
+            self.status_bar.showMessage(f"Importing… {b} media files found ({a} entries scanned)")
+
+    @QtCore.pyqtSlot(int, int, int)
+    def _on_import_tagging(self, job_id: int, done: int, total: int):
+        if self._is_current_import(job_id):
+            self.status_bar.showMessage(f"Reading tags… {done}/{total}")
+
+    @QtCore.pyqtSlot(int, str)
+    def _on_playlist_load_failed(self, job_id: int, message: str):
+        if self._is_current_import(job_id):
+            QMessageBox.critical(self, "Error Loading Playlist", message)
+
+    @QtCore.pyqtSlot(int, int, int, bool)
+    def _on_import_finished(self, job_id: int, a: int, b: int, cancelled: bool):
+        if self._import_worker is None or job_id != self._import_worker.job_id:
+            return
+        kind = self._import_kind
+        self._import_worker = None
+        self._import_kind = None
+        if cancelled:
+            self.metrics.cancel("import")
+        else:
+            self.metrics.end("import", entries=a if kind == "playlist" else b)
+        if self._import_queue:
+            roots, self._import_queue = self._import_queue, []
+            self._start_import(roots)
+            return
+        self.import_cancel_button.hide()
+        # the walk has cached tags for the new files; rows named from file names can now use them
+        self.playlist_model.refresh_names()
+        if kind == "playlist":
+            skipped = f" ({b} invalid entries skipped)" if b else ""
+            if cancelled:
+                self.status_bar.showMessage(f"Playlist loading cancelled after {a} entries.")
+            else:
+                self.status_bar.showMessage(f"Playlist loaded from {self._import_source}: {a} entries{skipped}")
+        elif cancelled:
+            self.status_bar.showMessage(f"Import cancelled ({b} media files found).")
+        else:
+            self.status_bar.showMessage(f"Import finished: {b} media files found.")
+
     # ---------------- UI build ----------------
     def _build_ui(self):
         central = QWidget(self)
@@ -239,15 +469,9 @@ class MainWindow(QMainWindow):
         main_layout.setContentsMargins(20, 20, 20, 20)
         main_layout.setSpacing(15)
 
-        # Video widget
-        self.video_widget = QVideoWidget(self)
-        self.video_widget.setObjectName("video_widget")
-        self.video_widget.setMinimumSize(640, 360)
-        self.video_widget.hide()
-        main_layout.addWidget(self.video_widget)
-
-        # Connect player to video widget
-        self.player.setVideoOutput(self.video_widget)
+        # Video widget: created (above the tabs) when the first video plays
+        self.video_widget = None
+        self._main_layout = main_layout
 
         # Tabs
         self.tab_widget = QTabWidget(self)
@@ -282,6 +506,7 @@ class MainWindow(QMainWindow):
 
         self._setup_music_tab()
         self._setup_radio_tab()
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
 
         main_layout.addWidget(self.tab_widget)
 
@@ -328,6 +553,11 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar(self)
         self.setStatusBar(self.status_bar)
 
+        self.import_cancel_button = QPushButton("Cancel Import", self.status_bar)
+        self.import_cancel_button.clicked.connect(self.cancel_import)
+        self.import_cancel_button.hide()
+        self.status_bar.addPermanentWidget(self.import_cancel_button)
+
         # File menu (kept), NO View menu
         menubar = self.menuBar()
         file_menu = menubar.addMenu("File")
@@ -340,6 +570,24 @@ class MainWindow(QMainWindow):
         load_action.triggered.connect(self.load_playlist)
         file_menu.addAction(load_action)
 
+        # Playlist edit history (removes and moves)
+        self.undo_action = QAction("Undo Playlist Edit", self)
+        self.undo_action.setShortcut(QKeySequence("Ctrl+Z"))
+        self.undo_action.triggered.connect(self.controller.undo)
+        file_menu.addAction(self.undo_action)
+
+        self.redo_action = QAction("Redo Playlist Edit", self)
+        self.redo_action.setShortcut(QKeySequence("Ctrl+Shift+Z"))
+        self.redo_action.triggered.connect(self.controller.redo)
+        file_menu.addAction(self.redo_action)
+        self.controller.historyChanged.connect(self._on_playlist_history)
+        self._on_playlist_history(False, False)
+
+        stats_action = QAction("Performance Stats", self)
+        stats_action.setShortcut(QKeySequence("F12"))
+        stats_action.triggered.connect(self.toggle_stats)
+        file_menu.addAction(stats_action)
+
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -386,6 +634,10 @@ class MainWindow(QMainWindow):
         self.add_button.clicked.connect(self.add_songs)
         row2.addWidget(self.add_button)
 
+        self.add_folder_button = AnimatedButton("Add Folder")
+        self.add_folder_button.clicked.connect(self.add_folder)
+        row2.addWidget(self.add_folder_button)
+
         self.remove_button = AnimatedButton("Remove")
         self.remove_button.clicked.connect(self.remove_songs)
         self.remove_button.setEnabled(False)
@@ -403,6 +655,13 @@ class MainWindow(QMainWindow):
         self.repeat_button.setEnabled(False)
         row2.addWidget(self.repeat_button)
 
+        self.gapless_button = AnimatedButton("Gapless ON")
+        self.gapless_button.setCheckable(True)
+        self.gapless_button.setChecked(True)
+        self.gapless_button.setToolTip(self.deck.stats.summary())
+        self.gapless_button.clicked.connect(self.toggle_gapless)
+        row2.addWidget(self.gapless_button)
+
         self.lyrics_button = AnimatedButton("Lyrics")
         self.lyrics_button.setCheckable(True)
         self.lyrics_button.clicked.connect(self.toggle_lyrics)
@@ -410,13 +669,28 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(row2)
 
-        # Playlist
-        self.playlist_widget = QListWidget(self.music_tab)
+        # Filter
+        self.playlist_filter_edit = QLineEdit(self.music_tab)
+        self.playlist_filter_edit.setPlaceholderText("Filter playlist (name, artist, title, album)")
+        self.playlist_filter_edit.setClearButtonEnabled(True)
+        self.playlist_filter_edit.textChanged.connect(self._apply_playlist_filter)
+        layout.addWidget(self.playlist_filter_edit)
+
+        # Playlist (model/view: rows are painted on demand, no per-item widgets)
+        self.playlist_filtered = albix_playlist.FilteredPlaylistModel(self.playlist_model, self)
+        self.playlist_widget = QListView(self.music_tab)
+        self.playlist_widget.setModel(self.playlist_model)
+        self.playlist_widget.setUniformItemSizes(True)
         sel_mode = QAbstractItemView.SelectionMode.ExtendedSelection if USING_QT6 else QAbstractItemView.ExtendedSelection
         self.playlist_widget.setSelectionMode(sel_mode)
-        self.playlist_widget.itemDoubleClicked.connect(self.play_selected_song)
+        # Drag to reorder: the model hands the drop to the controller, which moves the rows
+        self.playlist_widget.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove if USING_QT6
+                                             else QAbstractItemView.InternalMove)
+        self.playlist_widget.setDefaultDropAction(Qt.DropAction.MoveAction if USING_QT6 else Qt.MoveAction)
+        self.playlist_widget.setDropIndicatorShown(True)
+        self.playlist_widget.doubleClicked.connect(self.play_selected_song)
         self.playlist_widget.setStyleSheet("""
-            QListWidget::item {
+            QListView::item {
                 padding: 10px;
                 font-size: 12px;
             }
@@ -426,18 +700,32 @@ class MainWindow(QMainWindow):
     def _setup_radio_tab(self):
         layout = QVBoxLayout(self.radio_tab)
 
-        self.radio_list_widget = QListWidget(self.radio_tab)
+        self.radio_filter_edit = QLineEdit(self.radio_tab)
+        self.radio_filter_edit.setPlaceholderText("Filter stations")
+        self.radio_filter_edit.setClearButtonEnabled(True)
+        self.radio_filter_edit.textChanged.connect(self._apply_radio_filter)
+        layout.addWidget(self.radio_filter_edit)
+
+        # Station directory (model/view: only the listed ids are held, rows are read when painted);
+        # the model comes with the directory, when the tab is first opened
+        self.station_model = None
+        self.radio_list_widget = QListView(self.radio_tab)
+        self.radio_list_widget.setUniformItemSizes(True)
         sel_mode = QAbstractItemView.SelectionMode.SingleSelection if USING_QT6 else QAbstractItemView.SingleSelection
         self.radio_list_widget.setSelectionMode(sel_mode)
-        self.radio_list_widget.itemDoubleClicked.connect(self.play_radio_station)
+        self.radio_list_widget.doubleClicked.connect(self.play_radio_station)
         self.radio_list_widget.setStyleSheet("""
-            QListWidget::item {
+            QListView::item {
                 padding: 10px;
                 font-size: 12px;
             }
         """)
-        for station in self.radio_stations.keys():
-            self.radio_list_widget.addItem(station)
+        # queried when the tab is first opened
+        self._stations_listed = False
+        self._station_refresh_timer = QtCore.QTimer(self)
+        self._station_refresh_timer.setSingleShot(True)
+        self._station_refresh_timer.setInterval(0)
+        self._station_refresh_timer.timeout.connect(lambda: self.station_model.refresh())
         layout.addWidget(self.radio_list_widget)
 
         # Custom station row
@@ -445,15 +733,142 @@ class MainWindow(QMainWindow):
         self.custom_station_name = QLineEdit(self.radio_tab)
         self.custom_station_name.setPlaceholderText("Station Name")
         self.custom_station_url = QLineEdit(self.radio_tab)
-        self.custom_station_url.setPlaceholderText("Stream URL")
+        self.custom_station_url.setPlaceholderText("Stream URL (a backup URL may follow after a space)")
         add_station = AnimatedButton("Add Station")
         add_station.clicked.connect(self.add_custom_station)
+        self.probe_button = AnimatedButton("Check Stations")
+        self.probe_button.setToolTip("Test the listed stations and sort them by how fast audio starts")
+        self.probe_button.clicked.connect(self.check_stations)
+        self.import_stations_button = AnimatedButton("Import Stations")
+        self.import_stations_button.setToolTip("Add stations from a station list (JSON, CSV, M3U, PLS, XSPF)")
+        self.import_stations_button.clicked.connect(self.import_stations)
 
         row.addWidget(self.custom_station_name)
         row.addWidget(self.custom_station_url)
         row.addWidget(add_station)
+        row.addWidget(self.probe_button)
+        row.addWidget(self.import_stations_button)
         layout.addLayout(row)
 
+        # Station-list importer and health prober are built with the directory
+        self.station_importer = None
+        self._station_import_source = ""
+        self.prober = None
+        self._probe_done = self._probe_total = 0
+
+    def _ensure_radio(self):
+        """Load the radio modules and open the station directory on first use."""
+        if self.stations is not None:
+            return self.stations
+        _load_radio()
+        self.stations = albix_stations.get_directory()
+        self.controller.stations = self.stations
+        self.station_model = albix_stations.StationListModel(self.stations, self)
+        self.station_model.annotate = self._station_stream_stats
+
+        # Now-playing titles of the station that plays, read from its ICY metadata
+        self.stream_titles = albix_radio.StreamTitleReader(self)
+        self.stream_titles.titleChanged.connect(self._on_stream_title)
+        # Radio reconnects: dropped or stalled streams are reopened with backoff, alternates tried in turn
+        self.stream_guard = albix_radio.StreamSupervisor(self)
+        self.stream_guard.connectRequested.connect(self._connect_stream)
+        self.stream_guard.status.connect(lambda text: self.status_bar.showMessage(text))
+        self.stream_guard.failed.connect(self._on_stream_failed)
+
+        # Station-list imports are written to the directory in the background
+        self.station_importer = albix_stations.StationImporter(self.stations, self)
+        self.station_importer.progress.connect(self._on_stations_importing)
+        self.station_importer.finished.connect(self._on_stations_imported)
+
+        # Station health checks run on their own event loop in the background
+        self.prober = albix_radio.StationProber(self)
+        self.prober.probed.connect(self._on_station_probed)
+        self.prober.finished.connect(self._on_stations_probed)
+        return self.stations
+
+    def _stop_stream(self):
+        if self.stream_guard is not None:
+            self.stream_guard.stop()
+            self.stream_titles.stop()
+
+    # ---------------- Filter / search ----------------
+    def _index_playlist_entries(self, entries):
+        infos = self.library.get_many(it["path"] for it in entries) if self.library is not None else {}
+        for it in entries:
+            p = it["path"]
+            info = infos.get(p)
+            if info is not None:
+                self._playlist_index.add(p, basename(p), it.get("title"), info.artist, info.title, info.album)
+            else:
+                self._playlist_index.add(p, basename(p), it.get("title"))
+
+    def _ensure_playlist_index(self):
+        if self._playlist_index is None:
+            self._playlist_index = albix_search.SearchIndex()
+            self._index_playlist_entries(self.playlist)
+        return self._playlist_index
+
+    def _on_playlist_rows_inserted(self, parent, first: int, last: int):
+        if self._playlist_index is not None:
+            self._index_playlist_entries(self.playlist[first:last + 1])
+        self._schedule_playlist_filter()
+
+    def _on_playlist_rows_removing(self, parent, first: int, last: int):
+        if self._playlist_index is not None:
+            for it in self.playlist[first:last + 1]:
+                self._playlist_index.remove(it["path"])
+
+    def _on_playlist_reset(self):
+        self._playlist_index = None  # rebuilt from the new entries when the filter is next used
+        self._schedule_playlist_filter()
+
+    def _schedule_playlist_filter(self, *args):
+        # Coalesce bursts of edits (batched imports) into one re-filter
+        if self.playlist_filter_edit.text().strip():
+            self._playlist_filter_timer.start(100)
+
+    def _refilter_playlist_now(self, *args):
+        # Removes and moves renumber rows: the filtered view must not map to old rows,
+        # or the next remove would hit the wrong tracks (appends shift nothing and can wait)
+        if self.playlist_filter_edit.text().strip():
+            self._playlist_filter_timer.stop()
+            self._apply_playlist_filter()
+
+    def _apply_playlist_filter(self, *args):
+        text = self.playlist_filter_edit.text()
+        keys = self._ensure_playlist_index().query(text) if text.strip() else None
+        if keys is None:
+            if self.playlist_widget.model() is not self.playlist_model:
+                self.playlist_widget.setModel(self.playlist_model)
+                self._select_playlist_row(self.current_song_index)
+            return
+        row_of = self.playlist_model.row_of
+        self.playlist_filtered.set_rows(r for r in map(row_of, keys) if r >= 0)
+        if self.playlist_widget.model() is not self.playlist_filtered:
+            self.playlist_widget.setModel(self.playlist_filtered)
+        self._select_playlist_row(self.current_song_index)
+
+    def _on_tab_changed(self, index: int):
+        if self.tab_widget.widget(index) is self.radio_tab:
+            self._ensure_station_list()
+
+    def _ensure_station_list(self):
+        if self._stations_listed:
+            return
+        self._ensure_radio()
+        self._stations_listed = True
+        self.station_model.set_filter(self.radio_filter_edit.text())
+        self.radio_list_widget.setModel(self.station_model)
+
+    def _schedule_station_refresh(self):
+        # Coalesce bursts of station edits (streams from a playlist) into one query
+        if self._stations_listed:
+            self._station_refresh_timer.start()
+
+    def _apply_radio_filter(self, text: str):
+        if self._stations_listed:
+            self.station_model.set_filter(text)
+
     # ---------------- Theme ----------------
     def _apply_dark_theme(self):
         self.setStyleSheet("""
@@ -476,14 +891,14 @@ class MainWindow(QMainWindow):
             QPushButton:disabled { color: #7d8a92; background-color: #1a262d; border-color: #26333a; }
             QPushButton:focus { outline: none; border: 1px solid #7f8c94; }
 
-            QListWidget {
+            QListView {
                 color: #e5e9ec; background-color: #212c34;
                 border: 1px solid #3b474e; border-radius: 10px; padding: 6px;
                 selection-background-color: #3b474e; selection-color: #ffffff;
             }
-            QListWidget::item { padding: 10px; border-radius: 8px; }
-            QListWidget::item:hover:!selected { background: #1a262d; }
-            QListWidget::item:selected { background: #3b474e; color: #ffffff; }
+            QListView::item { padding: 10px; border-radius: 8px; }
+            QListView::item:hover:!selected { background: #1a262d; }
+            QListView::item:selected { background: #3b474e; color: #ffffff; }
 
             QLabel { color: #b9c2c8; font-size: 11px; }
 
@@ -529,33 +944,26 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Empty Playlist", "There is no playlist to save.")
             return
         opts = file_dialog_options(False)
-        file_name, _ = QFileDialog.getSaveFileName(self, "Save Playlist", "", "JSON Files (*.json)", options=opts)
+        file_name, selected = QFileDialog.getSaveFileName(self, "Save Playlist", "", ";;".join(self.PLAYLIST_SAVE_FILTERS),
+                                                          options=opts)
         if file_name:
+            if not splitext(file_name)[1]:
+                file_name += self.PLAYLIST_SAVE_FILTERS.get(selected, ".jsonl")
             try:
-                with open(file_name, 'w', encoding='utf-8') as f:
-                    json.dump(self.playlist, f, indent=4)
+                with self.metrics.span("save_playlist", entries=len(self.playlist), format=splitext(file_name)[1]):
+                    albix_playlist_io.write_playlist(file_name, self.playlist)
                 QMessageBox.information(self, "Playlist Saved", f"Playlist saved to {file_name}")
             except Exception as e:
                 QMessageBox.critical(self, "Error Saving Playlist", str(e))
 
     def load_playlist(self):
         opts = file_dialog_options(False)
-        file_name, _ = QFileDialog.getOpenFileName(self, "Load Playlist", "", "JSON Files (*.*)", options=opts)
+        file_name, _ = QFileDialog.getOpenFileName(self, "Load Playlist", "",
+                                                   "Playlists (*.jsonl *.json *.m3u *.m3u8 *.pls *.xspf);;All Files (*)",
+                                                   options=opts)
         if file_name:
-            try:
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                if isinstance(data, list) and all('path' in d and 'type' in d for d in data):
-                    self.playlist = data
-                    self.playlist_widget.clear()
-                    for item in self.playlist:
-                        self.playlist_widget.addItem(basename(item['path']))
-                    self._update_controls_enabled()
-                    QMessageBox.information(self, "Playlist Loaded", f"Playlist loaded from {file_name}")
-                else:
-                    QMessageBox.warning(self, "Invalid File", "The selected JSON does not contain a valid playlist.")
-            except Exception as e:
-                QMessageBox.critical(self, "Error Loading Playlist", str(e))
+            # Parsed on a worker thread; the first rows appear before the rest of the file is read
+            self._start_playlist_load(file_name)
 
     # ---------------- Music tab actions ----------------
     def add_songs(self):
@@ -569,43 +977,44 @@ class MainWindow(QMainWindow):
         )
         if not files:
             return
+        entries = []
         for file_path in files:
-            if any(it["path"] == file_path for it in self.playlist):
+            if file_path in self.playlist_model:
                 continue
-            ext = splitext(file_path)[1].lower()
-            if ext in self.SUPPORTED_VIDEO_EXTENSIONS:
-                mtype = "video"
-            elif ext in self.SUPPORTED_AUDIO_EXTENSIONS:
-                mtype = "audio"
-            else:
+            mtype = albix_core.media_type(file_path)
+            if mtype is None:
                 QMessageBox.warning(self, "Unsupported Format", f"Skipping:\n{basename(file_path)}")
                 continue
             if not os.path.exists(file_path):
                 QMessageBox.warning(self, "File Not Found", f"The file does not exist:\n{basename(file_path)}")
                 continue
-            self.playlist.append({"path": file_path, "type": mtype})
-            self.playlist_widget.addItem(basename(file_path))
+            entries.append({"path": file_path, "type": mtype})
+        with self.metrics.span("add_songs", entries=len(entries)):
+            self.playlist_model.add_entries(entries)
         self._update_controls_enabled()
 
+    def add_folder(self):
+        opts = file_dialog_options(False) | (QFileDialog.Option.ShowDirsOnly if USING_QT6 else QFileDialog.ShowDirsOnly)
+        folder = QFileDialog.getExistingDirectory(self, "Add Folder", "", options=opts)
+        if folder:
+            self._start_import([folder])
+
     def remove_songs(self):
-        selected = self.playlist_widget.selectedItems()
-        if not selected:
+        rows = sorted({self._playlist_source_row(ix.row())
+                       for ix in self.playlist_widget.selectionModel().selectedRows()}, reverse=True)
+        if not rows:
             return
-        for item in selected:
-            idx = self.playlist_widget.row(item)
-            if 0 <= idx < len(self.playlist):
-                self.playlist.pop(idx)
-                self.playlist_widget.takeItem(idx)
-                if idx == self.current_song_index:
-                    self.stop_song()
-        if self.current_song_index >= len(self.playlist):
-            self.current_song_index = len(self.playlist) - 1
+        with self.metrics.span("remove_songs", entries=len(rows)):
+            self.controller.remove_rows(rows)
+        self._update_controls_enabled()
+
+    def _on_playlist_history(self, can_undo: bool, can_redo: bool):
+        self.undo_action.setEnabled(can_undo)
+        self.redo_action.setEnabled(can_redo)
         self._update_controls_enabled()
 
     def play_selected_song(self):
-        self.current_song_index = self.playlist_widget.currentRow()
-        self.current_radio = None
-        self.play_song()
+        self.controller.play_row(self._playlist_source_row(self.playlist_widget.currentIndex().row()))
 
     # ---------------- Playback control ----------------
     def play_pause_song(self):
@@ -617,12 +1026,8 @@ class MainWindow(QMainWindow):
             elif state == QMP.PlaybackState.PausedState:
                 self.player.play()
             else:
-                if self.current_song_index == -1 and self.playlist:
-                    self.current_song_index = 0
-                    self.playlist_widget.setCurrentRow(self.current_song_index)
-                elif self.current_radio is not None:
-                    self.play_radio_station_by_name(self.current_radio)
-                self.play_song()
+                self._session_fill_to_current()
+                self.controller.start()
         else:
             state = self.player.state()
             if state == QMediaPlayer.State.PlayingState:
@@ -630,17 +1035,17 @@ class MainWindow(QMainWindow):
             elif state == QMediaPlayer.State.PausedState:
                 self.player.play()
             else:
-                if self.current_song_index == -1 and self.playlist:
-                    self.current_song_index = 0
-                    self.playlist_widget.setCurrentRow(self.current_song_index)
-                elif self.current_radio is not None:
-                    self.play_radio_station_by_name(self.current_radio)
-                self.play_song()
+                self._session_fill_to_current()
+                self.controller.start()
 
     def play_song(self):
-        if not (0 <= self.current_song_index < len(self.playlist)):
-            return
-        media_info = self.playlist[self.current_song_index]
+        self.controller.play_current()
+
+    def _load_track(self, row: int, media_info: dict):
+        with self.metrics.span("play_song", type=media_info["type"]):
+            self._load_track_now(row, media_info)
+
+    def _load_track_now(self, row: int, media_info: dict):
         file_path = media_info["path"]
         mtype = media_info["type"]
         self.current_media_type = mtype
@@ -650,19 +1055,21 @@ class MainWindow(QMainWindow):
             return
 
         if mtype == "video":
-            self.video_widget.show()
+            self._ensure_video_widget().show()
         else:
-            self.video_widget.hide()
-
-        if USING_QT6:
-            self.player.setSource(QUrl.fromLocalFile(file_path))
-        else:
-            self.player.setMedia(QMediaContent(QUrl.fromLocalFile(file_path)))
+            self._hide_video()
 
         # reset end-guard for a new track
         self._end_guard = False
-
-        self.player.play()
+        if self._pending_seek is not None and self._pending_seek[0] != file_path:
+            self._pending_seek = None
+
+        self._select_playlist_row(row)
+        self._stop_stream()
+        # setSource -> BufferedMedia; closed in handle_media_status
+        self.metrics.begin("media", "media_buffered", type=mtype)
+        self.deck.play_file(file_path)
+        self._schedule_preroll()
         self.playback_slider.setEnabled(True)
         self.stop_button.setEnabled(True)
         self.status_bar.showMessage(f"Playing: {basename(file_path)}")
@@ -670,111 +1077,178 @@ class MainWindow(QMainWindow):
         # Inform lyrics module of current media
         self._lyrics_call("set_media", file_path)
 
-    def play_radio_station(self, item):
-        station_name = item.text()
-        self.current_radio = station_name
-        self.current_song_index = -1
-        self.play_radio_station_by_name(station_name)
+    def play_radio_station(self, index):
+        name = self.station_model.name(index.row())
+        if name is not None:
+            self.play_radio_station_by_name(name)
 
     def play_radio_station_by_name(self, station_name: str):
-        if station_name not in self.radio_stations:
+        self._ensure_radio()
+        with self.metrics.span("play_radio_station"):
+            found = self.controller.play_station(station_name)
+        if not found:
             QMessageBox.warning(self, "Station Not Found", f"No such station:\n{station_name}")
-            return
-        stream_url = self.radio_stations[station_name]
-        self.video_widget.hide()
-        if USING_QT6:
-            self.player.setSource(QUrl(stream_url))
-        else:
-            self.player.setMedia(QMediaContent(QUrl(stream_url)))
-        self.player.play()
+
+    def _load_station(self, station_name: str, stream_url: str):
+        self._hide_video()
         self.playback_slider.setEnabled(True)
         self.stop_button.setEnabled(True)
         self.status_bar.showMessage(f"Streaming Radio: {station_name}")
         self._lyrics_call("clear")
+        self._stream_song = None
+        self._stream_url = None
+        self.stream_guard.start(station_name, [stream_url, *self.stations.urls(station_name)])
+
+    def _connect_stream(self, url: str):
+        self.metrics.begin("media", "media_buffered", type="radio")
+        self.deck.play_url(QUrl(url))
+        if url != self._stream_url:
+            # now-playing follows the URL that actually plays
+            self._stream_url = url
+            self.stream_titles.start(self.current_radio, url)
+
+    def _on_stream_failed(self, reason: str):
+        self.stop_song()
+        self.status_bar.showMessage(reason)
+
+    def _station_stream_stats(self, name: str):
+        stats = self.stream_guard.stats.get(name)
+        return stats.summary() if stats is not None else None
+
+    def _on_stream_title(self, station_name: str, text: str):
+        if station_name != self.current_radio or not text:
+            return
+        self.status_bar.showMessage(f"Streaming Radio: {station_name} — {text}")
+        artist, title = albix_radio.split_stream_title(text)
+        if artist and (artist, title) != self._stream_song:
+            self._stream_song = (artist, title)
+            self._lyrics_call("set_media", None, artist, title)
 
     def stop_song(self):
-        self.player.stop()
+        self.deck.stop()
         self.playback_slider.setValue(0)
         self.playback_slider.setEnabled(False)
         self.stop_button.setEnabled(False)
         self._set_play_button_text("Play")
         self.current_time_label.setText("00:00")
+        self._last_position = self._shown_slider = self._shown_second = 0
         self.status_bar.showMessage("Playback stopped.")
-        self.current_radio = None
-        self.video_widget.hide()
+        self.controller.stopped()
+        self._stop_stream()
+        self.metrics.cancel("media")
+        self._hide_video()
         self._lyrics_call("clear")
         # prevent watchdog from firing after manual stop
         self._end_guard = True
 
     def next_song(self):
-        if not self.playlist:
-            return
-        self.current_radio = None
-        if self.shuffle_mode and len(self.playlist) > 1:
-            choices = list(range(len(self.playlist)))
-            if 0 <= self.current_song_index < len(self.playlist):
-                choices.pop(self.current_song_index)
-            self.current_song_index = random.choice(choices)
-        else:
-            if (self.current_song_index + 1) < len(self.playlist):
-                self.current_song_index += 1
-            else:
-                self.status_bar.showMessage("End of playlist.")
-                self.stop_song()
-                return
-        self.playlist_widget.setCurrentRow(self.current_song_index)
-        self.play_song()
+        self._session_fill_to_current()
+        self.controller.next()
 
     def prev_song(self):
-        if not self.playlist:
-            return
-        self.current_radio = None
-        if self.shuffle_mode and len(self.playlist) > 1:
-            choices = list(range(len(self.playlist)))
-            if 0 <= self.current_song_index < len(self.playlist):
-                choices.pop(self.current_song_index)
-            self.current_song_index = random.choice(choices)
-        else:
-            if (self.current_song_index - 1) >= 0:
-                self.current_song_index -= 1
-            else:
-                self.status_bar.showMessage("Start of playlist.")
-                self.current_song_index = 0
-        self.playlist_widget.setCurrentRow(self.current_song_index)
-        self.play_song()
+        self._session_fill_to_current()
+        self.controller.prev()
 
     def toggle_shuffle(self):
-        self.shuffle_mode = not self.shuffle_mode
+        self.controller.set_shuffle(not self.shuffle_mode)
         self.shuffle_button.setText("Shuffle ON" if self.shuffle_mode else "Shuffle OFF")
         self.status_bar.showMessage(f"Shuffle Mode: {'ON' if self.shuffle_mode else 'OFF'}")
 
     def toggle_repeat(self):
-        self.repeat_mode = not self.repeat_mode
+        self.controller.set_repeat(not self.repeat_mode)
         self.repeat_button.setText("Repeat ON" if self.repeat_mode else "Repeat OFF")
         self.status_bar.showMessage(f"Repeat Mode: {'ON (Current Track)' if self.repeat_mode else 'OFF'}")
+        self._schedule_preroll()
+
+    def toggle_gapless(self):
+        self.gapless_mode = not self.gapless_mode
+        self.gapless_button.setText("Gapless ON" if self.gapless_mode else "Gapless OFF")
+        self.status_bar.showMessage(f"Gapless Mode: {'ON' if self.gapless_mode else 'OFF'}")
+        self._schedule_preroll()
+
+    # ---------------- Gapless pre-roll ----------------
+    def _schedule_preroll(self, *args):
+        if self.current_radio is None and 0 <= self.current_song_index < len(self.playlist):
+            self._preroll_timer.start()
+
+    def _preroll_next(self):
+        """Load the track that will play after this one into the idle player; prefetch lyrics further ahead."""
+        upcoming = self.controller.upcoming_paths(albix_lyrics.LYRICS_PREFETCH_AHEAD)
+        self.deck.preload(self._preroll_candidate(upcoming[:1]) if self.gapless_mode else None)
+        if self._lyrics_visible:
+            self._lyrics_call("prefetch", upcoming)
+
+    def _preroll_candidate(self, paths):
+        if not paths:
+            return None
+        row = self.playlist_model.row_of(paths[0])
+        if row < 0:
+            return None
+        it = self.playlist[row]
+        # video needs the single video widget; it is loaded the normal way
+        if it["type"] != "audio" or not os.path.exists(it["path"]):
+            return None
+        return it["path"]
+
+    def _on_track_switched(self, ms: float, preloaded: bool):
+        self.gapless_button.setToolTip(self.deck.stats.summary())
 
     # ---------------- Volume / Mute ----------------
     def change_volume(self, value: int):
-        if USING_QT6:
-            self.audio_out.setVolume(max(0.0, min(1.0, value / 100.0)))
-        else:
-            self.player.setVolume(value)
+        self.deck.set_volume(value)
         self.status_bar.showMessage(f"Volume: {value}%")
 
     def toggle_mute(self):
-        if USING_QT6:
-            self.audio_out.setMuted(self.mute_button.isChecked())
-        else:
-            self.player.setMuted(self.mute_button.isChecked())
+        self.deck.set_muted(self.mute_button.isChecked())
         self.status_bar.showMessage("Muted" if self.mute_button.isChecked() else f"Volume: {self.volume_slider.value()}%")
 
     # ---------------- Slider / time ----------------
+    def set_position_update_hz(self, hz: int):
+        """Rate at which the slider, time label and synced lyrics follow playback."""
+        try:
+            hz = max(1, min(60, int(hz)))
+        except (TypeError, ValueError):
+            hz = self.POSITION_UPDATE_HZ
+        self._position_timer.setInterval(int(1000 / hz))
+
+    def _on_position_tick(self):
+        pos = int(self.player.position())
+        if pos != self._last_position:
+            if pos > 0 and self.current_radio is not None:
+                self.stream_guard.audio()
+            self.update_slider(pos)
+
+    def _sync_position_timer(self, playing: bool):
+        if playing:
+            self._position_timer.start()
+        else:
+            self._position_timer.stop()
+        # paused/stopped: show where playback actually stopped
+        self._on_position_tick()
+
     def update_slider(self, position_ms: int):
-        self.playback_slider.blockSignals(True)
-        self.playback_slider.setValue(position_ms)
-        self.playback_slider.blockSignals(False)
-        self.current_time_label.setText(self._millis_to_time(position_ms))
-        self._lyrics_call("update_position", int(position_ms))
+        """Push a playback position to the UI, touching only what visibly changed."""
+        self.metrics.hit("update_slider")
+        self._last_position = position_ms
+        slider = self.playback_slider
+        if slider.isVisible():
+            # one slider pixel covers duration/width ms; smaller moves are invisible
+            step = max(1, self._duration_ms // max(1, slider.width()))
+            value = position_ms - position_ms % step
+            if value != self._shown_slider and not slider.isSliderDown():
+                self._shown_slider = value
+                slider.blockSignals(True)
+                slider.setValue(value)
+                slider.blockSignals(False)
+        second = max(0, position_ms // 1000)
+        if second != self._shown_second and self.current_time_label.isVisible():
+            self._shown_second = second
+            self.current_time_label.setText(self._millis_to_time(position_ms))
+        if self._lyrics_update is not None and self._lyrics_visible:
+            try:
+                self._lyrics_update(position_ms)
+            except Exception as e:
+                print("lyrics.update_position error:", e)
 
         # Watchdog: if we're within 1s of the end and not advanced yet, advance once.
         if self.current_radio is None and self._duration_ms > 0:
@@ -784,33 +1258,51 @@ class MainWindow(QMainWindow):
 
     def set_duration(self, duration_ms: int):
         self._duration_ms = max(0, int(duration_ms))
+        self._shown_slider = -1
         self.playback_slider.setRange(0, self._duration_ms)
         self.total_time_label.setText(self._millis_to_time(self._duration_ms))
         self._end_guard = False
 
     def seek_position(self, position_ms: int):
         self.player.setPosition(position_ms)
-        self.current_time_label.setText(self._millis_to_time(position_ms))
+        self._shown_slider = position_ms  # the user is holding the handle there
+        self.update_slider(position_ms)
         self.status_bar.showMessage(f"Seeked to: {self._millis_to_time(position_ms)}")
-        self._lyrics_call("update_position", int(position_ms))
 
     # ---------------- Media status / errors ----------------
     def handle_media_status(self, status):
         name = getattr(status, 'name', str(status))
+        if 'BufferedMedia' in name:
+            self.metrics.end("media")
+        elif 'InvalidMedia' in name:
+            self.metrics.cancel("media")
+        if self.current_radio is not None and self.stream_guard.active:
+            # a stream never really ends: it dropped. A failed source also raises
+            # errorOccurred, and handle_error reports that one.
+            if 'EndOfMedia' in name:
+                self.stream_guard.dropped("stream ended")
+                return
+            if 'InvalidMedia' in name:
+                return
+            if 'StalledMedia' in name:
+                self.stream_guard.stalled()
+            elif 'BufferedMedia' in name:
+                self.stream_guard.audio()
         if 'EndOfMedia' in name:
             self._advance_after_end()
         if 'LoadedMedia' in name or 'BufferedMedia' in name:
             self._end_guard = False
+            self._apply_pending_seek()
 
     def _advance_after_end(self):
-        if self.current_radio is not None:
-            return
-        if self.repeat_mode:
-            self.player.setPosition(0)
-            self.player.play()
-            self._end_guard = False
-        else:
-            self.next_song()
+        if self.current_radio is None and not self.repeat_mode:
+            self.deck.mark_end()
+        self.controller.track_ended()
+
+    def _restart_track(self):
+        self.player.setPosition(0)
+        self.player.play()
+        self._end_guard = False
 
     def handle_error(self, *args):
         err = ""
@@ -818,10 +1310,28 @@ class MainWindow(QMainWindow):
             err = self.player.errorString()
         except Exception:
             err = "Playback error."
+        # radio: no dialog, the supervisor reconnects (or reports that it gave up)
+        if self.current_radio is not None and self.stream_guard.dropped(err or "playback error"):
+            return
         if err:
             QMessageBox.critical(self, "Playback Error", f"An error occurred:\n\n{err}")
             self.stop_song()
 
+    # ---------------- Window close ----------------
+    def closeEvent(self, event):
+        self.cancel_import()
+        self._session_timer.stop()
+        self._save_session()
+        self._stop_stream()
+        if self.station_importer is not None:
+            self.station_importer.cancel()
+        self._lyrics_call("shutdown")
+        self.metrics.flush()
+        for t in list(self._import_threads):
+            t.quit()
+            t.wait(2000)  # workers check for cancellation per directory entry / playlist row
+        super().closeEvent(event)
+
     # ---------------- Key handling ----------------
     def keyPressEvent(self, event):
         if event.key() == key('Key_F11'):
@@ -843,37 +1353,74 @@ class MainWindow(QMainWindow):
 
     def _hide_ui_for_fullscreen(self):
         self.playlist_widget.hide()
+        self.playlist_filter_edit.hide()
         self.play_button.hide()
         self.stop_button.hide()
         self.add_button.hide()
+        self.add_folder_button.hide()
         self.prev_button.hide()
         self.next_button.hide()
         self.remove_button.hide()
         self.shuffle_button.hide()
         self.repeat_button.hide()
+        self.gapless_button.hide()
         self.tab_widget.hide()
         self.lyrics_button.hide()
 
     def _show_normal_ui(self):
         self.playlist_widget.show()
+        self.playlist_filter_edit.show()
         self.play_button.show()
         self.stop_button.show()
         self.add_button.show()
+        self.add_folder_button.show()
         self.prev_button.show()
         self.next_button.show()
         self.remove_button.show()
         self.shuffle_button.show()
         self.repeat_button.show()
+        self.gapless_button.show()
         self.tab_widget.show()
         self.lyrics_button.show()
 
     # ---------------- Helpers ----------------
+    def _ensure_video_widget(self):
+        if self.video_widget is None:
+            self.video_widget = _video_widget_class()(self)
+            self.video_widget.setObjectName("video_widget")
+            self.video_widget.setMinimumSize(640, 360)
+            self.video_widget.hide()
+            self._main_layout.insertWidget(0, self.video_widget)
+            self.deck.set_video_output(self.video_widget)
+        return self.video_widget
+
+    def _hide_video(self):
+        if self.video_widget is not None:
+            self.video_widget.hide()
+
     def _update_controls_enabled(self):
         enabled = bool(self.playlist)
         for w in (self.play_button, self.remove_button, self.prev_button,
-                  self.next_button, self.shuffle_button, self.repeat_button):
+                  self.next_button, self.shuffle_button, self.repeat_button,
+                  self.gapless_button):
             w.setEnabled(enabled)
 
+    def _select_playlist_row(self, row: int):
+        if not (0 <= row < len(self.playlist)):
+            return
+        if self.playlist_widget.model() is self.playlist_filtered:
+            row = self.playlist_filtered.row_for_source(row)
+            if row < 0:
+                return  # playing track is filtered out; leave the selection alone
+            self.playlist_widget.setCurrentIndex(self.playlist_filtered.index(row))
+        else:
+            self.playlist_widget.setCurrentIndex(self.playlist_model.index(row))
+
+    def _playlist_source_row(self, view_row: int) -> int:
+        if self.playlist_widget.model() is self.playlist_filtered:
+            return self.playlist_filtered.source_row(view_row)
+        return view_row
+
     def _set_play_button_text(self, txt: str):
         self.play_button.setText(txt)
 
@@ -884,8 +1431,29 @@ class MainWindow(QMainWindow):
         return f"{m:02}:{s:02}"
 
     # ---------------- Lyrics control (toggle via button) ----------------
+    def _ensure_lyrics(self):
+        """Build the lyrics dock on first use and bring it up to date with playback."""
+        if self.lyrics is not None or self._lyrics_failed:
+            return self.lyrics
+        try:
+            self.lyrics = albix_lyrics.AlbixLyrics(self)
+        except Exception as e:
+            self._lyrics_failed = True
+            QMessageBox.warning(self, "Lyrics",
+                                f"Failed to initialize Albix Lyrics module:\n{e}")
+            return None
+        fn = getattr(self.lyrics, "update_position", None)
+        self._lyrics_update = fn if callable(fn) else None
+        entry = self.controller.current_entry()
+        if entry is not None and self.current_radio is None:
+            self._lyrics_call("set_media", entry["path"])
+        elif self.current_radio is not None and self._stream_song is not None:
+            self._lyrics_call("set_media", None, *self._stream_song)
+        self._lyrics_call("set_playing", self._position_timer.isActive())
+        return self.lyrics
+
     def toggle_lyrics(self):
-        if not getattr(self, "lyrics", None):
+        if not self._ensure_lyrics():
             return
         try:
             visible_now = bool(self.lyrics.isVisible())
@@ -897,11 +1465,14 @@ class MainWindow(QMainWindow):
             self.show_lyrics()
 
     def show_lyrics(self):
-        if not getattr(self, "lyrics", None):
+        if not self._ensure_lyrics():
             return
         try:
             self.lyrics.show_panel()
             self._lyrics_visible = True
+            self._schedule_preroll()
+            if self._lyrics_update is not None:
+                self._lyrics_update(int(self.player.position()))
             if hasattr(self, "lyrics_button"):
                 self.lyrics_button.setChecked(True)
                 self.lyrics_button.setText("Hide Lyrics")
@@ -935,31 +1506,220 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 print(f"lyrics.{name} error:", e)
 
+    # ---------------- Performance stats (File menu / F12) ----------------
+    def toggle_stats(self):
+        if self.stats_dock is None:
+            self.stats_dock = albix_metrics.StatsDock(self, self.metrics)
+            self.stats_dock.add_section("Track switches", self.deck.stats.summary)
+            self.stats_dock.add_section("Radio", lambda: self._station_stream_stats(self.current_radio)
+                                        if self.current_radio is not None else None)
+            self.stats_dock.add_section("Lyrics providers", albix_lyrics.provider_summary)
+        if self.stats_dock.is_visible():
+            self.stats_dock.hide_panel()
+        else:
+            self.stats_dock.show_panel()
+
+    # ---------------- Station health ----------------
+    def check_stations(self):
+        # the listed stations: the whole directory, or what the filter left
+        self._ensure_station_list()
+        if not self.prober.start(self.stations.as_dict(self.station_model.ids())):
+            return
+        self._probe_done = 0
+        self._probe_total = len(self.station_model.ids())
+        self.probe_button.setEnabled(False)
+        self.status_bar.showMessage(f"Checking {self._probe_total} stations…")
+
+    def _on_station_probed(self, result):
+        self._probe_done += 1
+        self.status_bar.showMessage(f"Checking stations… {self._probe_done}/{self._probe_total}")
+
+    def _on_stations_probed(self, results):
+        self.probe_button.setEnabled(True)
+        self.stations.record_probes(results)
+        # alive by time to first audio, then dead, then stations never checked
+        self.station_model.set_order("health")
+        alive = [r for r in results if r.ok]
+        msg = f"Stations checked: {len(alive)} alive, {len(results) - len(alive)} dead."
+        if alive:
+            msg += f" Fastest: {alive[0].name} ({alive[0].first_byte_ms:.0f} ms)."
+        self.status_bar.showMessage(msg)
+
+    # ---------------- Session snapshot ----------------
+    def _restore_session(self):
+        snap = self.session.open_playlist()
+        state = self.session.read_state()
+        self._apply_session_settings(state)
+        if snap is None or not len(snap):
+            if snap is not None:
+                snap.close()
+            return
+        self._session_fill = (snap, 0, state)
+        # only the first rows go in before the first paint; the timer-driven batches
+        # reach the current track, which is selected when its batch arrives
+        self._continue_session_fill(albix_session.SESSION_FIRST_BATCH)
+
+    def _session_fill_to_current(self):
+        """Play/Next/Prev before the restored current track arrived: load up to it now."""
+        if self._session_fill is not None:
+            snap, start, state = self._session_fill
+            current = int(state.get("current", -1))
+            if current >= start:
+                self._continue_session_fill(current + 1 - start)
+
+    def _apply_session_settings(self, state: dict):
+        for name, url in (state.get("stations") or {}).items():
+            self._add_station(name, url)
+        if "volume" in state:
+            self.volume_slider.setValue(int(state["volume"]))
+        if state.get("muted"):
+            self.mute_button.setChecked(True)
+            self.toggle_mute()
+        for on, mode, button, toggle in ((state.get("shuffle"), self.shuffle_mode, self.shuffle_button, self.toggle_shuffle),
+                                         (state.get("repeat"), self.repeat_mode, self.repeat_button, self.toggle_repeat),
+                                         (state.get("gapless"), self.gapless_mode, self.gapless_button, self.toggle_gapless)):
+            if on is not None and bool(on) != mode:
+                toggle()
+                button.setChecked(bool(on))
+
+    def _continue_session_fill(self, count: int = albix_session.SESSION_FILL_BATCH):
+        if self._session_fill is None:
+            self._session_fill_timer.stop()
+            return
+        snap, start, state = self._session_fill
+        stop = min(len(snap), start + count)
+        dirty = self._session_dirty
+        self.playlist_model.add_entries(snap.entries(start, stop))
+        self._session_dirty = dirty  # restored rows are already in the snapshot
+        current = int(state.get("current", -1))
+        if start <= current < stop and self.playlist_model.path(current) == state.get("path"):
+            self.controller.select(current)
+            self._select_playlist_row(current)
+            if state.get("position"):
+                self._pending_seek = (state["path"], int(state["position"]))
+        if stop < len(snap):
+            self._session_fill = (snap, stop, state)
+            self._session_fill_timer.start()
+            return
+        self._session_fill = None
+        self._session_fill_timer.stop()
+        snap.close()
+        self._update_controls_enabled()
+        self.status_bar.showMessage(f"Session restored: {len(self.playlist)} tracks.")
+
+    def _mark_session_dirty(self, *args):
+        self._session_dirty = True
+
+    def _drop_session_fill(self):
+        # the playlist was replaced (e.g. a playlist file loaded) before the restore finished
+        if self._session_fill is not None:
+            self._session_fill[0].close()
+            self._session_fill = None
+
+    def _apply_pending_seek(self):
+        seek, self._pending_seek = self._pending_seek, None
+        entry = self.controller.current_entry()
+        if seek is not None and entry is not None and entry["path"] == seek[0]:
+            self.player.setPosition(seek[1])
+
+    def _session_state(self) -> dict:
+        entry = self.controller.current_entry()
+        if self._pending_seek is not None:
+            position = self._pending_seek[1]  # restored but not played yet
+        elif entry is not None and self.current_radio is None:
+            position = int(self.player.position())
+        else:
+            position = 0
+        return {
+            "current": self.current_song_index,
+            "path": entry["path"] if entry is not None else None,
+            "position": position,
+            "shuffle": self.shuffle_mode,
+            "repeat": self.repeat_mode,
+            "gapless": self.gapless_mode,
+            "volume": self.volume_slider.value(),
+            "muted": self.mute_button.isChecked(),
+            # custom stations live in the station directory unless it could only be opened in memory
+            "stations": {} if self.stations is None or self.stations.persistent else self.stations.custom(),
+        }
+
+    def _save_session(self):
+        if self.session is None:
+            return
+        if self._session_fill is not None:  # never snapshot a half-restored list
+            self._continue_session_fill(len(self._session_fill[0]))
+        try:
+            with self.metrics.span("save_session", playlist=self._session_dirty):
+                if self._session_dirty:
+                    self.session.save_playlist(self.playlist)
+                    self._session_dirty = False
+                self.session.save_state(self._session_state())
+        except (OSError, ValueError) as e:
+            print("Session snapshot failed:", e)
+
     # ---------------- Custom stations ----------------
     def add_custom_station(self):
         name = self.custom_station_name.text().strip()
-        url = self.custom_station_url.text().strip()
-        if not name or not url:
+        urls = self.custom_station_url.text().split()
+        if not name or not urls:
             QMessageBox.warning(self, "Invalid Input", "Station name and URL cannot be empty.")
             return
-        self.radio_stations[name] = url
-        self.radio_list_widget.addItem(name)
+        self._add_station(name, urls[0], urls[1] if len(urls) > 1 else None)
         self.custom_station_name.clear()
         self.custom_station_url.clear()
 
+    def _add_station(self, name: str, url: str, alt_url=None):
+        self._ensure_radio()
+        self.stations.add(name, url, alt_url=alt_url)
+        self._schedule_station_refresh()
+
+    def import_stations(self):
+        self._ensure_radio()
+        if self.station_importer.is_running():
+            return
+        opts = file_dialog_options(False)
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Import Stations", "",
+            "Station Lists (*.json *.jsonl *.csv *.tsv *.m3u *.m3u8 *.pls *.xspf);;All Files (*)",
+            options=opts)
+        if file_name and self.station_importer.start(file_name):
+            self._station_import_source = basename(file_name)
+            self.import_stations_button.setEnabled(False)
+            self.status_bar.showMessage(f"Importing stations from {self._station_import_source}…")
+
+    def _on_stations_importing(self, done: int):
+        self.status_bar.showMessage(f"Importing stations… {done}")
+
+    def _on_stations_imported(self, done: int, skipped: int, error: str):
+        self.import_stations_button.setEnabled(True)
+        self._schedule_station_refresh()
+        if error:
+            QMessageBox.warning(self, "Import Stations", f"Could not import the station list:\n{error}")
+            return
+        note = f" ({skipped} unusable entries skipped)" if skipped else ""
+        self.status_bar.showMessage(f"Imported {done} stations from {self._station_import_source}{note}. "
+                                    f"{len(self.stations)} stations in the directory.")
+
     # ---------------- State change adapters ----------------
     def _on_playback_state_changed(self, state):
         from PyQt6.QtMultimedia import QMediaPlayer as QMP
         self._set_play_button_text("Pause" if state == QMP.PlaybackState.PlayingState else "Play")
+        self._sync_position_timer(state == QMP.PlaybackState.PlayingState)
         self._lyrics_call("set_playing", state == QMP.PlaybackState.PlayingState)
 
     def _on_state_changed(self, state):
         self._set_play_button_text("Pause" if state == QMediaPlayer.State.PlayingState else "Play")
+        self._sync_position_timer(state == QMediaPlayer.State.PlayingState)
         self._lyrics_call("set_playing", state == QMediaPlayer.State.PlayingState)
 
 # ---------------- Main ----------------
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    _startup.mark("application")
     window = MainWindow()
+    _startup.mark("main window")
     window.show()
+    # runs once the event loop has painted the window
+    QtCore.QTimer.singleShot(0, lambda: _startup.finish("first paint", version=APP_VERSION,
+                                                        qt=6 if USING_QT6 else 5))
     sys.exit(app.exec() if USING_QT6 else app.exec_())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# albix_bench.py — headless benchmarks for Albix (playlist edits, playlist I/O, skips, lyrics parsing, radio reconnects)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+#
+# Runs without a display:   python3 albix_bench.py [--quick] [--json] [--only NAME ...]
+
+import os, sys, json, time, random, asyncio, tempfile, argparse, threading
+sys.dont_write_bytecode = True
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from typing import Callable, Dict, List
+
+import albix_core
+import albix_lrc
+import albix_lyrics
+import albix_playlist_io
+import albix_radio
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore
+    from PyQt6.QtCore import pyqtSignal
+    USING_QT6 = True
+except Exception:
+    from PyQt5 import QtCore
+    from PyQt5.QtCore import pyqtSignal
+    USING_QT6 = False
+
+SIZES = {"full": {"tracks": 50000, "removes": 2000, "io": 20000, "skips": 20000, "lrc": 2000, "drops": 20},
+         "quick": {"tracks": 5000, "removes": 200, "io": 2000, "skips": 2000, "lrc": 200, "drops": 5}}
+
+
+# -------- Fixtures --------
+def _entries(n: int, root: str = "/music") -> List[dict]:
+    rng = random.Random(n)
+    out = []
+    for i in range(n):
+        artist = f"Artist {i % 500}"
+        ext = ".mp4" if i % 25 == 0 else ".mp3"
+        path = os.path.join(root, artist, f"Album {i % 40}", f"{i % 20 + 1:02} - {artist} - Song {i}{ext}")
+        it = {"path": path, "type": albix_core.media_type(path)}
+        if rng.random() < 0.1:
+            it["title"] = f"Song {i}"
+        out.append(it)
+    return out
+
+def _lrc_text(lines: int = 60) -> str:
+    out = ["[ar:Artist]", "[ti:Song]", "[offset:+120]"]
+    for i in range(lines):
+        ms = i * 3170
+        stamp = f"[{ms // 60000:02}:{ms // 1000 % 60:02}.{ms % 1000 // 10:02}]"
+        if i % 8 == 0:
+            stamp += f"[{(ms + 90000) // 60000:02}:{(ms + 90000) // 1000 % 60:02}.00]"  # repeated chorus
+        out.append(stamp + f"Line {i} <00:{i % 60:02}.10>of the <00:{i % 60:02}.40>song")
+    return "\n".join(out)
+
+def _percentile(samples: List[float], q: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q * len(s)))] if s else 0.0
+
+
+# -------- Radio stand-ins --------
+class _FlakyRadioServer:
+    """
+    Local stand-in for a radio server that misbehaves on purpose. /dead
+    answers 503 (the primary URL that needs a failover), /live streams
+    "audio" and drops every connection after `drop_after` chunks; every
+    `stall_every`-th connection pauses for `stall_s` first. With `down`
+    set, every connection is closed at once.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, drop_after: int = 20, stall_every: int = 3,
+                 stall_s: float = 0.3, chunk: int = 4096, interval: float = 0.005):
+        self.loop, self.drop_after, self.stall_every, self.stall_s = loop, drop_after, stall_every, stall_s
+        self.chunk, self.interval = chunk, interval
+        self.down = False
+        self.connections = 0
+        self.port = 0
+
+    def start(self):
+        async def serve():
+            srv = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+            return srv.sockets[0].getsockname()[1]
+        self.port = asyncio.run_coroutine_threadsafe(serve(), self.loop).result()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if self.down:
+                return
+            if head.split()[1] != b"/live":
+                writer.write(b"HTTP/1.0 503 Service Unavailable\r\n\r\n")
+                return
+            self.connections += 1
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: audio/mpeg\r\n\r\n")
+            for i in range(self.drop_after):
+                if i == self.drop_after // 2 and self.connections % self.stall_every == 0:
+                    await asyncio.sleep(self.stall_s)
+                writer.write(b"\xff" * self.chunk)
+                await writer.drain()
+                await asyncio.sleep(self.interval)
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class _HeadlessStreamPlayer(QtCore.QObject):
+    """Reads a stream the way a player would and reports to a StreamSupervisor; no decoding, no output."""
+
+    audio = pyqtSignal()
+    stalled = pyqtSignal()
+    dropped = pyqtSignal(str)
+    error = pyqtSignal(str)     # a failed source is reported twice, like QMediaPlayer's InvalidMedia + errorOccurred
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, stall_gap: float = 0.1):
+        super().__init__()
+        self.loop, self.stall_gap = loop, stall_gap
+        self._future = None
+
+    def load(self, url: str):
+        self.stop()
+        self._future = asyncio.run_coroutine_threadsafe(self._read(url), self.loop)
+
+    def stop(self):
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    async def _read(self, url: str):
+        writer = None
+        try:
+            reader, writer, status, _, _ = await albix_radio.open_stream(url)
+            if not 200 <= status < 300:
+                raise albix_radio.StreamError(f"HTTP {status}")
+            waiting = False
+            while True:
+                try:
+                    data = await asyncio.wait_for(reader.read(65536), self.stall_gap)
+                except asyncio.TimeoutError:
+                    if not waiting:
+                        waiting = True
+                        self.stalled.emit()
+                    continue
+                if not data:
+                    self.dropped.emit("stream ended")
+                    return
+                if waiting or data:
+                    waiting = False
+                    self.audio.emit()
+        except albix_radio.StreamError as e:
+            self.dropped.emit("stream unreadable")
+            self.error.emit(str(e))
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+# -------- Benchmarks --------
+def bench_playlist_edits(n: Dict[str, int]) -> Dict[str, float]:
+    c = albix_core.PlaybackController()
+    entries = _entries(n["tracks"])
+    t = time.perf_counter()
+    c.add_entries(entries)
+    add_s = time.perf_counter() - t
+    t = time.perf_counter()
+    c.add_entries(entries[: n["tracks"] // 10])  # all duplicates
+    dup_s = time.perf_counter() - t
+    c.set_shuffle(True)
+    c.current_row = len(c.model) // 2
+    rng = random.Random(1)
+    rows = rng.sample(range(len(c.model)), n["removes"])
+    t = time.perf_counter()
+    c.remove_rows(rows)
+    remove_s = time.perf_counter() - t
+    t = time.perf_counter()
+    for i in range(n["removes"]):
+        c.model.row_of(c.model.path(rng.randrange(len(c.model))))
+    lookup_s = time.perf_counter() - t
+    rows = rng.sample(range(len(c.model)), n["removes"])
+    t = time.perf_counter()
+    c.move_rows(rows, len(c.model) // 3)
+    move_s = time.perf_counter() - t
+    t = time.perf_counter()
+    c.undo()
+    c.undo()
+    undo_s = time.perf_counter() - t
+    return {"tracks": n["tracks"], "add_ms": add_s * 1e3, "add_duplicates_ms": dup_s * 1e3,
+            "removed": n["removes"], "remove_ms": remove_s * 1e3,
+            "row_lookup_us": lookup_s / n["removes"] * 1e6, "move_ms": move_s * 1e3,
+            "undo_move_and_remove_ms": undo_s * 1e3}
+
+def bench_playlist_io(n: Dict[str, int]) -> Dict[str, float]:
+    entries = _entries(n["io"])
+    out = {"entries": n["io"]}
+    with tempfile.TemporaryDirectory() as d:
+        for ext in (".jsonl", ".json", ".m3u8", ".pls", ".xspf"):
+            path = os.path.join(d, "bench" + ext)
+            t = time.perf_counter()
+            albix_playlist_io.write_playlist(path, entries)
+            out[f"save{ext}_ms"] = (time.perf_counter() - t) * 1e3
+            t = time.perf_counter()
+            got = sum(1 for _ in albix_playlist_io.iter_playlist(path, ext_types=albix_core.media_ext_types()))
+            out[f"load{ext}_ms"] = (time.perf_counter() - t) * 1e3
+            if got != len(entries):
+                out[f"load{ext}_lost"] = len(entries) - got
+    return out
+
+def bench_skips(n: Dict[str, int]) -> Dict[str, float]:
+    out = {}
+    for mode in ("linear", "shuffle"):
+        c = albix_core.PlaybackController()
+        c.add_entries(_entries(n["tracks"]))
+        c.set_shuffle(mode == "shuffle")
+        played = []
+        c.trackRequested.connect(lambda row, entry: played.append(row))
+        c.play_row(0)
+        samples = []
+        for i in range(n["skips"]):
+            t = time.perf_counter()
+            if i % 5 == 4:
+                c.prev()
+            elif c.current_row == len(c.model) - 1 and mode == "linear":
+                c.play_row(0)
+            else:
+                c.next()
+            c.upcoming_paths(albix_lyrics.LYRICS_PREFETCH_AHEAD)  # what the pre-roll asks after each switch
+            samples.append((time.perf_counter() - t) * 1e6)
+        out[f"{mode}_p50_us"] = _percentile(samples, 0.5)
+        out[f"{mode}_p99_us"] = _percentile(samples, 0.99)
+        out[f"{mode}_max_us"] = max(samples)
+    return out
+
+def bench_lyrics(n: Dict[str, int]) -> Dict[str, float]:
+    text = _lrc_text()
+    t = time.perf_counter()
+    for _ in range(n["lrc"]):
+        lrc = albix_lrc.parse_lrc(text)
+    parse_s = time.perf_counter() - t
+    t = time.perf_counter()
+    ticks = 0
+    for pos in range(0, lrc.times[-1] + 5000, 100):
+        lrc.index_at(pos)
+        ticks += 1
+    index_s = time.perf_counter() - t
+    paths = [it["path"] for it in _entries(n["tracks"])]
+    albix_lyrics.parse_artist_title_from_filename.cache_clear()
+    t = time.perf_counter()
+    for p in paths:
+        albix_lyrics.parse_artist_title_from_filename(p)
+    names_s = time.perf_counter() - t
+    return {"lrc_files_per_s": n["lrc"] / parse_s, "lrc_lines_per_s": n["lrc"] * len(lrc) / parse_s,
+            "index_at_us": index_s / ticks * 1e6, "filename_parses_per_s": len(paths) / names_s}
+
+def bench_radio(n: Dict[str, int]) -> Dict[str, float]:
+    """Reconnect behaviour against a stand-in server: failover, drops, stalls, then an outage."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="albix-bench-radio", daemon=True)
+    thread.start()
+    server = _FlakyRadioServer(loop)
+    server.start()
+    player = _HeadlessStreamPlayer(loop)
+    sup = albix_radio.StreamSupervisor(delay_ms=20, max_delay_ms=200, rounds=3, stable_ms=50,
+                                       stall_ms=2000, audio_ms=2000)
+    player.audio.connect(sup.audio)
+    player.stalled.connect(sup.stalled)
+    player.dropped.connect(sup.dropped)
+    player.error.connect(sup.dropped)
+    sup.connectRequested.connect(player.load)
+    events = QtCore.QEventLoop()
+    outcome = {"gave_up": 0.0}
+
+    def on_failed(reason):
+        outcome["gave_up"] = 1.0
+        events.quit()
+
+    def on_audio():
+        if sup.stats["bench"].reconnects >= n["drops"]:
+            server.down = True   # the outage: back off, then give up
+    sup.failed.connect(on_failed)
+    player.audio.connect(on_audio)
+    QtCore.QTimer.singleShot(60000, events.quit)
+    t = time.perf_counter()
+    sup.start("bench", [server.url("/dead"), server.url("/live")])
+    events.exec() if USING_QT6 else events.exec_()
+    run_s = time.perf_counter() - t
+    player.stop()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(2)
+    st = sup.stats["bench"]
+    recon = st.reconnect_audio_ms
+    return {"connects": st.connects, "reconnects": st.reconnects, "failovers": st.failovers,
+            "rebuffers": st.rebuffers, "stall_ms": st.stall_ms, "max_stall_ms": st.max_stall_ms,
+            "first_audio_ms": st.first_audio_ms, "reconnect_audio_p50_ms": _percentile(recon, 0.5),
+            "reconnect_audio_max_ms": max(recon) if recon else 0.0, "gave_up": outcome["gave_up"],
+            "run_s": run_s}
+
+BENCHMARKS: Dict[str, Callable[[Dict[str, int]], Dict[str, float]]] = {
+    "playlist_edits": bench_playlist_edits,
+    "playlist_io": bench_playlist_io,
+    "skips": bench_skips,
+    "lyrics": bench_lyrics,
+    "radio": bench_radio,
+}
+
+
+# -------- Main --------
+def run(names: List[str], quick: bool = False) -> Dict[str, Dict[str, float]]:
+    # the playlist models need an application object, not a display
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication(sys.argv[:1])
+    sizes = SIZES["quick" if quick else "full"]
+    results = {name: BENCHMARKS[name](sizes) for name in names}
+    del app
+    return results
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Albix headless benchmarks")
+    ap.add_argument("--quick", action="store_true", help="smaller workloads (about a tenth)")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    ap.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run just these benchmarks")
+    args = ap.parse_args(argv)
+    results = run(args.only or list(BENCHMARKS), args.quick)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for name, figures in results.items():
+        print(name)
+        for k, v in figures.items():
+            print(f"  {k:<24} {v:>14,.1f}" if isinstance(v, float) else f"  {k:<24} {v:>14,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# albix_core.py — UI-independent playback core for Albix: playlist, shuffle/repeat, track advance, stations
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys
+sys.dont_write_bytecode = True
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import albix_playlist
+import albix_search
+import albix_shuffle
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore
+    from PyQt6.QtCore import pyqtSignal
+    USING_QT6 = True
+except Exception:
+    from PyQt5 import QtCore
+    from PyQt5.QtCore import pyqtSignal
+    USING_QT6 = False
+
+AUDIO_EXTENSIONS = {".mp3", ".ogg", ".flac", ".wav"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mkv", ".mov", ".wmv"}
+UNDO_LIMIT = 100          # playlist edits (removes, moves) that can be undone
+
+DEFAULT_STATIONS = {
+    "Triple J (Australia)": "https://live-radio01.mediahubaustralia.com/2TJW/mp3/",
+    "Radio Paradise (USA)": "https://stream.radioparadise.com/mp3-192",
+    "FIP (France)": "https://icecast.radiofrance.fr/fip-midfi.mp3",
+    "SomaFM: Indie Pop Rocks (USA)": "https://ice2.somafm.com/indiepop-128-mp3",
+    "Radio Nova (France)": "https://novazz.ice.infomaniak.ch/novazz-128.mp3",
+    "181.fm The Rock! (USA)": "https://listen.181fm.com/181-rock_128k.mp3",
+    "Big R Radio: Top 40 Hits (USA)": "https://bigrradio.cdnstream1.com/5104_128",
+    "Yle Radio Suomi(FI)":"https://icecast.live.yle.fi/radio/YleRS/icecast.audio",
+    "YleX(FI)":"https://icecast.live.yle.fi/radio/YleX/icecast.audio",
+    "Yle Vega(FI)":"https://icecast.live.yle.fi/radio/YleVega/icecast.audio",
+    "Yle Klassinen(FI)":"https://icecast.live.yle.fi/radio/YleKlassinen/icecast.audio",
+    "Järviradio(FI)":"https://jarviradio.radiotaajuus.fi:9000/jr",
+}
+
+
+def media_ext_types() -> Dict[str, str]:
+    """".mp3" -> "audio", ".mkv" -> "video" for every supported extension."""
+    types = {ext: "audio" for ext in AUDIO_EXTENSIONS}
+    types.update({ext: "video" for ext in VIDEO_EXTENSIONS})
+    return types
+
+def media_type(path: str) -> Optional[str]:
+    """"audio", "video", or None for files Albix does not play."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in VIDEO_EXTENSIONS:
+        return "video"
+    if ext in AUDIO_EXTENSIONS:
+        return "audio"
+    return None
+
+
+# -------- Stations --------
+class StationRegistry:
+    """Radio stations by name, in insertion order, with a search index over the names."""
+
+    def __init__(self, stations: Optional[Dict[str, str]] = None):
+        self._urls: Dict[str, str] = {}
+        self.index = albix_search.SearchIndex()
+        for name, url in (DEFAULT_STATIONS if stations is None else stations).items():
+            self.add(name, url)
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __contains__(self, name) -> bool:
+        return name in self._urls
+
+    def names(self) -> List[str]:
+        return list(self._urls)
+
+    def url(self, name: str) -> Optional[str]:
+        return self._urls.get(name)
+
+    def urls(self, name: str) -> List[str]:
+        """Stream URLs to try, in order (one per station here)."""
+        return [self._urls[name]] if name in self._urls else []
+
+    def add(self, name: str, url: str) -> bool:
+        """Add or update a station. Returns True when the name is new."""
+        new = name not in self._urls
+        if new:
+            self.index.add(name, name)
+        self._urls[name] = url
+        return new
+
+    def remove(self, name: str) -> bool:
+        if self._urls.pop(name, None) is None:
+            return False
+        self.index.remove(name)
+        return True
+
+    def query(self, text: str) -> Optional[List[str]]:
+        """Matching names, or None when `text` filters nothing."""
+        return self.index.query(text)
+
+    def as_dict(self) -> Dict[str, str]:
+        return dict(self._urls)
+
+
+# -------- Controller --------
+class PlaybackController(QtCore.QObject):
+    """
+    What plays next, without any widgets or media players.
+
+    Owns the playlist model, the shuffle engine, repeat mode, the current
+    row or station and the station registry. It decides; whoever drives it
+    (MainWindow, or a benchmark) does the playing by listening to the
+    request signals. All signals are emitted synchronously.
+
+    Removes and moves (including rows dragged in the view) keep current_row
+    on the same track and go on an undo stack. Entries are remembered by
+    path, so appends in between do not upset undo/redo; replacing the whole
+    playlist clears the history.
+    """
+
+    trackRequested = pyqtSignal(int, object)    # row, entry: load and play it
+    stationRequested = pyqtSignal(str, str)     # name, url
+    stopRequested = pyqtSignal()                # the current track went away / playlist ended
+    restartRequested = pyqtSignal()             # repeat: play the current track again
+    message = pyqtSignal(str)                   # short status text
+    historyChanged = pyqtSignal(bool, bool)     # can undo, can redo
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None, model: Optional[albix_playlist.PlaylistModel] = None,
+                 stations: Optional[StationRegistry] = None):
+        super().__init__(parent)
+        self.model = model if model is not None else albix_playlist.PlaylistModel(self)
+        self.stations = stations if stations is not None else StationRegistry()
+        self.current_row = -1
+        self.current_station: Optional[str] = None
+        self.shuffle: Optional[albix_shuffle.ShuffleEngine] = None
+        self.repeat = False
+        self._undo: List[tuple] = []    # ("remove", [(row, entry)]) / ("move", paths, from rows, to rows)
+        self._redo: List[tuple] = []
+        self.model.rowsInserted.connect(self._on_rows_inserted)
+        self.model.rowsAboutToBeRemoved.connect(self._on_rows_removing)
+        self.model.modelReset.connect(self._reset_shuffle)
+        self.model.modelReset.connect(self.clear_history)
+        self.model.dropRequested.connect(self.move_rows)
+
+    # --- state ---
+    @property
+    def entries(self) -> List[dict]:
+        return self.model.entries
+
+    @property
+    def shuffle_mode(self) -> bool:
+        return self.shuffle is not None
+
+    def current_entry(self) -> Optional[dict]:
+        entries = self.model.entries
+        return entries[self.current_row] if 0 <= self.current_row < len(entries) else None
+
+    def set_shuffle(self, on: bool):
+        self.shuffle = albix_shuffle.ShuffleEngine() if on else None
+        self._reset_shuffle()
+
+    def set_repeat(self, on: bool):
+        self.repeat = bool(on)
+
+    # --- playlist edits ---
+    def add_entries(self, entries: Iterable[dict]) -> int:
+        return self.model.add_entries(entries)
+
+    def remove_rows(self, rows: Iterable[int]) -> int:
+        """Remove rows, keeping current_row on the same track. Stops playback if that track goes."""
+        removed = self._remove(rows)
+        if removed:
+            self._record(("remove", removed))
+        return len(removed)
+
+    def move_rows(self, rows: Iterable[int], before: int) -> bool:
+        """Move rows together in front of row `before` (pre-move numbering), keeping their order."""
+        rows = sorted({r for r in rows if 0 <= r < len(self.model)})
+        paths = [self.model.path(r) for r in rows]
+        dst = self.model.move_rows(rows, before)
+        if not dst:
+            return False
+        self.current_row = self._moved_row(self.current_row, rows, dst)
+        self._record(("move", paths, rows, dst))
+        return True
+
+    def clear(self):
+        self.model.clear()
+        self.current_row = -1
+
+    # --- undo ---
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+        op = self._undo.pop()
+        if op[0] == "remove":
+            rows = self.model.insert_rows(op[1])
+            for r in rows:
+                if r <= self.current_row:
+                    self.current_row += 1
+            self.message.emit(f"Restored {len(rows)} tracks.")
+        else:
+            self._relocate(op[1], op[2])
+            self.message.emit("Move undone.")
+        self._redo.append(op)
+        self.historyChanged.emit(bool(self._undo), True)
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+        op = self._redo.pop()
+        if op[0] == "remove":
+            row_of = self.model.row_of
+            self._remove(row_of(it["path"]) for _, it in op[1])
+        else:
+            self._relocate(op[1], op[3])
+        self._undo.append(op)
+        self.historyChanged.emit(True, bool(self._redo))
+        return True
+
+    def clear_history(self):
+        if self._undo or self._redo:
+            self._undo.clear()
+            self._redo.clear()
+            self.historyChanged.emit(False, False)
+
+    # --- playback decisions ---
+    def select(self, row: int) -> bool:
+        """Make `row` the current track without playing it."""
+        entries = self.model.entries
+        if not (0 <= row < len(entries)):
+            return False
+        self.current_row = row
+        self.current_station = None
+        path = entries[row]["path"]
+        # Manually picked tracks join the shuffle history, so Prev can return to them
+        if self.shuffle is not None and self.shuffle.current != path:
+            self.shuffle.start_at(path)
+        return True
+
+    def play_row(self, row: int) -> bool:
+        if not self.select(row):
+            return False
+        self.trackRequested.emit(row, self.model.entries[row])
+        return True
+
+    def play_current(self) -> bool:
+        return self.play_row(self.current_row)
+
+    def start(self) -> bool:
+        """Play/Pause from a stopped state: the current track or station, or the first row."""
+        if self.current_row == -1 and self.model.entries:
+            self.current_row = 0
+        elif self.current_station is not None:
+            self.play_station(self.current_station)
+        return self.play_current()
+
+    def play_station(self, name: str) -> bool:
+        url = self.stations.url(name)
+        if url is None:
+            return False
+        self.current_station = name
+        self.current_row = -1
+        self.stationRequested.emit(name, url)
+        return True
+
+    def stopped(self):
+        """Playback was stopped by the user; a station is not resumed by the next start()."""
+        self.current_station = None
+
+    def next(self) -> bool:
+        entries = self.model.entries
+        if not entries:
+            return False
+        self.current_station = None
+        if self.shuffle is not None and len(entries) > 1:
+            row = self.model.row_of(self.shuffle.next())
+        elif self.current_row + 1 < len(entries):
+            row = self.current_row + 1
+        else:
+            self.message.emit("End of playlist.")
+            self.stopRequested.emit()
+            return False
+        return self.play_row(row)
+
+    def prev(self) -> bool:
+        entries = self.model.entries
+        if not entries:
+            return False
+        self.current_station = None
+        if self.shuffle is not None and len(entries) > 1:
+            key = self.shuffle.prev()
+            if key is None:
+                self.message.emit("Start of shuffle history.")
+                return False
+            row = self.model.row_of(key)
+        elif self.current_row - 1 >= 0:
+            row = self.current_row - 1
+        else:
+            self.message.emit("Start of playlist.")
+            row = 0
+        return self.play_row(row)
+
+    def track_ended(self):
+        """The current track played to its end: repeat it or move on."""
+        if self.current_station is not None:
+            return
+        if self.repeat:
+            self.restartRequested.emit()
+        else:
+            self.next()
+
+    def upcoming_paths(self, count: int) -> List[str]:
+        """Paths that will play next, in order (the shuffle order when shuffle is on)."""
+        if self.repeat or self.current_station is not None:
+            return []
+        entries = self.model.entries
+        if self.shuffle is not None and len(entries) > 1:
+            return self.shuffle.peek(count)
+        start = self.current_row + 1
+        return [it["path"] for it in entries[start:start + count]]
+
+    # --- edits ---
+    def _remove(self, rows: Iterable[int]) -> list:
+        removed = self.model.remove_rows(rows)
+        if not removed:
+            return removed
+        gone = [r for r, _ in removed]
+        cur = self.current_row
+        i = bisect_left(gone, cur)
+        if cur >= 0:
+            self.current_row = cur - i
+        if i < len(gone) and gone[i] == cur:
+            self.stopRequested.emit()
+        if self.current_row >= len(self.model):
+            self.current_row = len(self.model) - 1
+        return removed
+
+    def _relocate(self, paths: Sequence[str], dst: Sequence[int]):
+        """Put the tracks `paths` (in that order) at rows `dst`."""
+        row_of = self.model.row_of
+        src = [row_of(p) for p in paths]
+        if -1 in src or src != sorted(src):
+            return  # the playlist changed under the history; leave it as it is
+        if self.model.relocate_rows(src, dst):
+            self.current_row = self._moved_row(self.current_row, src, dst)
+
+    @staticmethod
+    def _moved_row(row: int, src: Sequence[int], dst: Sequence[int]) -> int:
+        """Where `row` ends up when the rows `src` are moved to `dst` (both ascending)."""
+        if row < 0:
+            return row
+        i = bisect_left(src, row)
+        if i < len(src) and src[i] == row:
+            return dst[i]
+        pos = row - i                 # among the rows that stay
+        for d in dst:
+            if d > pos:
+                break
+            pos += 1
+        return pos
+
+    def _record(self, op: tuple):
+        self._undo.append(op)
+        del self._undo[:-UNDO_LIMIT]
+        self._redo.clear()
+        self.historyChanged.emit(True, False)
+
+    # --- model sync ---
+    def _on_rows_inserted(self, parent, first: int, last: int):
+        if self.shuffle is not None:
+            for it in self.model.entries[first:last + 1]:
+                self.shuffle.add(it["path"])
+
+    def _on_rows_removing(self, parent, first: int, last: int):
+        if self.shuffle is not None:
+            for it in self.model.entries[first:last + 1]:
+                self.shuffle.remove(it["path"])
+
+    def _reset_shuffle(self):
+        """Start a fresh shuffle cycle over the current playlist, from the current track."""
+        if self.shuffle is None:
+            return
+        entries = self.model.entries
+        self.shuffle.reset(it["path"] for it in entries)
+        if 0 <= self.current_row < len(entries):
+            self.shuffle.start_at(entries[self.current_row]["path"])
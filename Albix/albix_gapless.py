@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# albix_gapless.py — two-player deck for Albix: the next track is loaded while the current one plays
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import sys, time
+sys.dont_write_bytecode = True
+from typing import Optional
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore
+    from PyQt6.QtCore import QUrl, pyqtSignal
+    from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+    USING_QT6 = True
+    _READY = (QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.BufferedMedia)
+except Exception:
+    from PyQt5 import QtCore
+    from PyQt5.QtCore import QUrl, pyqtSignal
+    from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+    USING_QT6 = False
+    _READY = (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia)
+
+PREROLL_DELAY_MS = 1500   # let the current track settle before loading the next one
+SWITCH_HISTORY = 50       # switch timings kept for the running figures
+
+
+# -------- Switch timing --------
+class SwitchStats:
+    """Track-to-track switch times (request -> first position tick of the new track)."""
+
+    def __init__(self):
+        self.count = 0
+        self.preloaded = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = []
+
+    def record(self, ms: float, preloaded: bool):
+        self.count += 1
+        self.preloaded += int(preloaded)
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+        if len(self._recent) > SWITCH_HISTORY:
+            del self._recent[0]
+
+    @property
+    def mean_ms(self) -> float:
+        return sum(self._recent) / len(self._recent) if self._recent else 0.0
+
+    def summary(self) -> str:
+        if not self.count:
+            return "No track switches measured yet."
+        return (f"Last switch: {self.last_ms:.0f} ms · mean {self.mean_ms:.0f} ms · "
+                f"max {self.max_ms:.0f} ms · preloaded {self.preloaded}/{self.count}")
+
+
+# -------- Deck --------
+class PlayerDeck(QtCore.QObject):
+    """
+    Two QMediaPlayers (each with its own QAudioOutput on Qt6): one plays,
+    the other sits on the next track, already loaded. play_file() on the
+    preloaded path just starts the standby player and swaps roles, so a
+    track change costs no source reload.
+
+    Player signals are forwarded only from the active player, so the standby
+    loading in the background never moves the slider or trips end-of-media.
+    """
+
+    positionChanged = pyqtSignal(int)
+    durationChanged = pyqtSignal(int)
+    mediaStatusChanged = pyqtSignal(object)
+    stateChanged = pyqtSignal(object)
+    errorOccurred = pyqtSignal()
+    switched = pyqtSignal(float, bool)   # ms from request to playback, served from preload?
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._players = []
+        self._outputs = []
+        for _ in range(2):
+            self._add_player()
+        self._active = 0
+        self._standby_path: Optional[str] = None
+        self._video = None
+        self._t0: Optional[float] = None
+        self._t0_preloaded = False
+        self.stats = SwitchStats()
+
+    # --- active player ---
+    @property
+    def player(self) -> QMediaPlayer:
+        return self._players[self._active]
+
+    @property
+    def standby_path(self) -> Optional[str]:
+        return self._standby_path
+
+    # --- output ---
+    def set_video_output(self, widget):
+        self._video = widget
+        self.player.setVideoOutput(widget)
+
+    def set_volume(self, value: int):
+        for i, p in enumerate(self._players):
+            if USING_QT6:
+                self._outputs[i].setVolume(max(0.0, min(1.0, value / 100.0)))
+            else:
+                p.setVolume(value)
+
+    def set_muted(self, muted: bool):
+        for i, p in enumerate(self._players):
+            (self._outputs[i] if USING_QT6 else p).setMuted(muted)
+
+    # --- playback ---
+    def mark_end(self):
+        """The current track just ended; time the switch from here rather than from play_file()."""
+        self._t0 = time.perf_counter()
+
+    def play_file(self, path: str) -> bool:
+        """Play a local file, from the standby player if it holds it. Returns True when preloaded."""
+        t0 = self._t0 if self._t0 is not None else time.perf_counter()
+        standby = self._players[1 - self._active]
+        ready = self._standby_path == path and self._is_loaded(standby)
+        if ready:
+            old = self.player
+            self._active = 1 - self._active
+            self._standby_path = None
+            if self._video is not None:
+                standby.setVideoOutput(self._video)
+            standby.setPosition(0)
+            standby.play()
+            old.stop()
+            self._set_source(old, None)
+            # the new player announced these while it was still standby
+            self.durationChanged.emit(int(standby.duration()))
+            self.mediaStatusChanged.emit(standby.mediaStatus())
+        else:
+            self._set_source(self.player, QUrl.fromLocalFile(path))
+            self.player.play()
+        self._t0 = t0
+        self._t0_preloaded = ready
+        return ready
+
+    def play_url(self, url: QUrl):
+        """Streams are never preloaded; drop any standby track while one plays."""
+        self.drop_preload()
+        self._t0 = None
+        self._set_source(self.player, url)
+        self.player.play()
+
+    def stop(self):
+        self._t0 = None
+        self.player.stop()
+
+    def preload(self, path: Optional[str]):
+        """Load `path` into the standby player (paused), or clear it when None."""
+        if path == self._standby_path:
+            return
+        if path is None:
+            self.drop_preload()
+            return
+        self._standby_path = path
+        self._set_source(self._players[1 - self._active], QUrl.fromLocalFile(path))
+
+    def drop_preload(self):
+        if self._standby_path is None:
+            return
+        self._standby_path = None
+        self._set_source(self._players[1 - self._active], None)
+
+    # --- internals ---
+    def _add_player(self):
+        p = QMediaPlayer(self)
+        if USING_QT6:
+            out = QAudioOutput(self)
+            p.setAudioOutput(out)
+            self._outputs.append(out)
+            p.playbackStateChanged.connect(lambda s, p=p: self._is_active(p) and self.stateChanged.emit(s))
+            p.errorOccurred.connect(lambda *a, p=p: self._on_error(p))
+        else:
+            self._outputs.append(None)
+            p.stateChanged.connect(lambda s, p=p: self._is_active(p) and self.stateChanged.emit(s))
+            p.error.connect(lambda *a, p=p: self._on_error(p))
+        p.positionChanged.connect(lambda pos, p=p: self._on_position(p, pos))
+        p.durationChanged.connect(lambda d, p=p: self._is_active(p) and self.durationChanged.emit(int(d)))
+        p.mediaStatusChanged.connect(lambda s, p=p: self._is_active(p) and self.mediaStatusChanged.emit(s))
+        self._players.append(p)
+
+    def _is_active(self, p) -> bool:
+        return p is self._players[self._active]
+
+    def _on_position(self, p, pos: int):
+        if not self._is_active(p):
+            return
+        if self._t0 is not None and pos > 0:
+            ms = (time.perf_counter() - self._t0) * 1000.0
+            self._t0 = None
+            self.stats.record(ms, self._t0_preloaded)
+            self.switched.emit(ms, self._t0_preloaded)
+        self.positionChanged.emit(int(pos))
+
+    def _on_error(self, p):
+        if self._is_active(p):
+            self.errorOccurred.emit()
+        else:
+            # a track that fails to preload is simply loaded the normal way later
+            self._standby_path = None
+
+    @staticmethod
+    def _is_loaded(p) -> bool:
+        return p.mediaStatus() in _READY
+
+    @staticmethod
+    def _set_source(p, url: Optional[QUrl]):
+        if USING_QT6:
+            p.setSource(url if url is not None else QUrl())
+        else:
+            p.setMedia(QMediaContent(url) if url is not None else QMediaContent())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# albix_import.py — background folder import for Albix (os.scandir walk, batched results)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys, time, threading
+sys.dont_write_bytecode = True
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import albix_playlist_io
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore
+    from PyQt6.QtCore import pyqtSignal
+    USING_QT6 = True
+except Exception:
+    from PyQt5 import QtCore
+    from PyQt5.QtCore import pyqtSignal
+    USING_QT6 = False
+
+IMPORT_BATCH_SIZE = 300       # rows handed to the GUI per batch
+IMPORT_FLUSH_SECONDS = 0.15   # flush a partial batch after this long, so small imports show up at once
+LOAD_FIRST_BATCH = 50         # playlist files: hand over the first rows before parsing the rest
+LOAD_BATCH_SIZE = 2000
+
+
+# -------- Walk --------
+def iter_media_files(roots: Iterable[str], ext_types: Dict[str, str],
+                     cancel: Optional[threading.Event] = None,
+                     counter: Optional[list] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (path, type) for every supported file below `roots`.
+
+    `ext_types` maps a lower-case extension (".mp3") to a media type ("audio").
+    Roots may be files or directories. Symlinked directories are followed once;
+    a (device, inode) set keeps link loops from recursing forever.
+    `counter[0]`, when given, is bumped for every directory entry looked at.
+    """
+    seen_dirs = set()
+    stack = []
+    for root in roots:
+        if cancel is not None and cancel.is_set():
+            return
+        if counter is not None:
+            counter[0] += 1
+        if os.path.isdir(root):
+            stack.append(root)
+            while stack:
+                if cancel is not None and cancel.is_set():
+                    return
+                d = stack.pop()
+                try:
+                    st = os.stat(d)
+                except OSError:
+                    continue
+                ident = (st.st_dev, st.st_ino)
+                if ident in seen_dirs:
+                    continue
+                seen_dirs.add(ident)
+                try:
+                    it = os.scandir(d)
+                except OSError:
+                    continue
+                subdirs = []
+                files = []
+                with it:
+                    for entry in it:
+                        if counter is not None:
+                            counter[0] += 1
+                        try:
+                            if entry.is_dir():
+                                subdirs.append(entry.path)
+                                continue
+                            if not entry.is_file():
+                                continue
+                        except OSError:
+                            continue
+                        mtype = ext_types.get(os.path.splitext(entry.name)[1].lower())
+                        if mtype:
+                            files.append((entry.path, mtype))
+                # Sorted per directory so albums land in track order
+                files.sort()
+                yield from files
+                subdirs.sort(reverse=True)  # stack pops the alphabetically first one next
+                stack.extend(subdirs)
+        elif os.path.isfile(root):
+            mtype = ext_types.get(os.path.splitext(root)[1].lower())
+            if mtype:
+                yield root, mtype
+
+
+# -------- Worker (runs on a QThread, streams batches back) --------
+class FolderImportWorker(QtCore.QObject):
+    batch = pyqtSignal(int, object)             # job_id, list of {"path", "type"} dicts
+    progress = pyqtSignal(int, int, int)        # job_id, entries scanned, media files found
+    tagging = pyqtSignal(int, int, int)         # job_id, files checked against the media library, total
+    finished = pyqtSignal(int, int, int, bool)  # job_id, entries scanned, media files found, cancelled
+
+    def __init__(self, job_id: int, roots: Iterable[str], ext_types: Dict[str, str],
+                 batch_size: int = IMPORT_BATCH_SIZE, library=None):
+        super().__init__()
+        self.job_id = job_id
+        self.roots = list(roots)
+        self.ext_types = dict(ext_types)
+        self.batch_size = max(1, int(batch_size))
+        self.library = library  # albix_library.MediaLibrary; tags are cached after the walk
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Thread-safe; the walk stops at the next directory entry."""
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        counter = [0]
+        found = 0
+        found_paths = [] if self.library is not None else None
+        pending = []
+        last_flush = time.monotonic()
+        for path, mtype in iter_media_files(self.roots, self.ext_types, self._cancel, counter):
+            pending.append({"path": path, "type": mtype})
+            found += 1
+            if found_paths is not None:
+                found_paths.append(path)
+            now = time.monotonic()
+            if len(pending) >= self.batch_size or (now - last_flush) >= IMPORT_FLUSH_SECONDS:
+                self.batch.emit(self.job_id, pending)
+                self.progress.emit(self.job_id, counter[0], found)
+                pending = []
+                last_flush = now
+        if pending and not self._cancel.is_set():
+            self.batch.emit(self.job_id, pending)
+        self.progress.emit(self.job_id, counter[0], found)
+        # Rows are already listed; now fill the tag cache (only changed files are opened)
+        if found_paths and not self._cancel.is_set():
+            try:
+                self.library.refresh(found_paths, self._cancel,
+                                     lambda done, total: self.tagging.emit(self.job_id, done, total))
+            except Exception as e:
+                print("albix_import: library refresh failed:", e)
+        self.finished.emit(self.job_id, counter[0], found, self._cancel.is_set())
+
+
+# -------- Worker: playlist file loader (same signals as the folder import) --------
+class PlaylistLoadWorker(QtCore.QObject):
+    batch = pyqtSignal(int, object)             # job_id, list of {"path", "type"} dicts
+    progress = pyqtSignal(int, int, int)        # job_id, entries read, entries skipped
+    failed = pyqtSignal(int, str)               # job_id, message (unreadable / not a playlist)
+    finished = pyqtSignal(int, int, int, bool)  # job_id, entries read, entries skipped, cancelled
+
+    def __init__(self, job_id: int, path: str, ext_types: Optional[Dict[str, str]] = None,
+                 batch_size: int = LOAD_BATCH_SIZE):
+        super().__init__()
+        self.job_id = job_id
+        self.path = path
+        self.ext_types = dict(ext_types) if ext_types else None  # types local files in M3U/PLS/XSPF
+        self.batch_size = max(1, int(batch_size))
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        stats = {"skipped": 0}
+        count = 0
+        pending = []
+        limit = LOAD_FIRST_BATCH
+        try:
+            for entry in albix_playlist_io.iter_playlist(self.path, stats, self.ext_types):
+                if self._cancel.is_set():
+                    break
+                pending.append(entry)
+                count += 1
+                if len(pending) >= limit:
+                    self.batch.emit(self.job_id, pending)
+                    self.progress.emit(self.job_id, count, stats["skipped"])
+                    pending = []
+                    limit = self.batch_size
+        except (OSError, ValueError) as e:
+            self.failed.emit(self.job_id, str(e))
+        if pending and not self._cancel.is_set():
+            self.batch.emit(self.job_id, pending)
+        self.finished.emit(self.job_id, count, stats["skipped"], self._cancel.is_set())
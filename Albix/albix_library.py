@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# albix_library.py — persistent media library for Albix (SQLite tag cache keyed by path, size and mtime)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys, json, time, sqlite3, threading
+sys.dont_write_bytecode = True
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# -------- Optional deps --------
+# mutagen is only imported when a file is first read; startup just checks it is installed
+_HAVE_MUTAGEN = find_spec("mutagen") is not None
+_MutagenFile = None
+
+def _mutagen_file():
+    """mutagen.File, imported on first call. None when mutagen is unusable."""
+    global _MutagenFile, _HAVE_MUTAGEN
+    if _MutagenFile is None and _HAVE_MUTAGEN:
+        try:
+            from mutagen import File as _MutagenFile
+        except Exception:
+            _HAVE_MUTAGEN = False
+    return _MutagenFile
+
+
+def _default_db_path() -> str:
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "albix", "library.db")
+
+LIBRARY_DB_PATH = os.environ.get("ALBIX_LIBRARY_DB") or _default_db_path()
+LIBRARY_BATCH_SIZE = 200  # rows per SQL round trip / transaction during rescans
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    artist   TEXT,
+    title    TEXT,
+    album    TEXT,
+    duration REAL,
+    tags     TEXT,
+    scanned  REAL
+);
+CREATE INDEX IF NOT EXISTS tracks_artist ON tracks(artist);
+CREATE INDEX IF NOT EXISTS tracks_album  ON tracks(album);
+"""
+
+# -------- Data --------
+@dataclass
+class TrackInfo:
+    path: str
+    size: int
+    mtime_ns: int
+    artist: Optional[str] = None
+    title: Optional[str] = None
+    album: Optional[str] = None
+    duration: Optional[float] = None  # seconds
+    tags: Dict[str, str] = field(default_factory=dict)
+
+# -------- Tag reading --------
+def _first(v) -> Optional[str]:
+    if isinstance(v, (list, tuple)):
+        v = v[0] if v else None
+    if v is None:
+        return None
+    s = str(v).strip()
+    return s or None
+
+def read_tags(path: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[float], Dict[str, str]]:
+    """Read (artist, title, album, duration, tags) straight from the file. Empty values if unavailable."""
+    mutagen_file = _mutagen_file()
+    if mutagen_file is None:
+        return None, None, None, None, {}
+    try:
+        m = mutagen_file(path, easy=True)
+    except Exception:
+        return None, None, None, None, {}
+    if not m:
+        return None, None, None, None, {}
+    tags = {}
+    try:
+        for k, v in (m.tags or {}).items():
+            fv = _first(v)
+            if fv is not None:
+                tags[str(k).lower()] = fv
+    except Exception:
+        pass
+    duration = None
+    try:
+        length = getattr(getattr(m, "info", None), "length", None)
+        duration = float(length) if length else None
+    except Exception:
+        pass
+    artist = tags.get("artist") or tags.get("tpe1")
+    title = tags.get("title") or tags.get("tit2")
+    album = tags.get("album") or tags.get("talb")
+    return artist, title, album, duration, tags
+
+# -------- Library --------
+class MediaLibrary:
+    """
+    Tag cache on disk. A row is trusted while the file's (size, mtime) still
+    match what was recorded, so rescans only open files that changed.
+    Safe to share between threads; one connection is serialized by a lock.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or LIBRARY_DB_PATH
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                pass
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- reads ---
+    def get(self, path: str) -> Optional[TrackInfo]:
+        """Cached row without touching the file (may be stale)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime_ns, artist, title, album, duration, tags FROM tracks WHERE path = ?",
+                (path,)).fetchone()
+        return self._row_to_info(row) if row else None
+
+    def get_many(self, paths: Iterable[str]) -> Dict[str, TrackInfo]:
+        out = {}
+        paths = list(paths)
+        for i in range(0, len(paths), LIBRARY_BATCH_SIZE):
+            chunk = paths[i:i + LIBRARY_BATCH_SIZE]
+            q = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT path, size, mtime_ns, artist, title, album, duration, tags FROM tracks WHERE path IN ({q})",
+                    chunk).fetchall()
+            for row in rows:
+                out[row[0]] = self._row_to_info(row)
+        return out
+
+    def lookup(self, path: str) -> Optional[TrackInfo]:
+        """Fresh metadata for `path`: cached if unchanged on disk, re-read (and stored) otherwise."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        cached = self.get(path)
+        if cached and cached.size == st.st_size and cached.mtime_ns == st.st_mtime_ns:
+            return cached
+        info = self._read(path, st)
+        self._store([info])
+        return info
+
+    def search(self, text: str, limit: int = 200) -> List[str]:
+        """Paths whose artist, title or album contain `text` (case-insensitive)."""
+        like = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM tracks WHERE artist LIKE ?1 ESCAPE '\\' OR title LIKE ?1 ESCAPE '\\' "
+                "OR album LIKE ?1 ESCAPE '\\' LIMIT ?2", (like, int(limit))).fetchall()
+        return [r[0] for r in rows]
+
+    # --- writes ---
+    def refresh(self, paths: Iterable[str], cancel: Optional[threading.Event] = None,
+                progress=None) -> Tuple[int, int]:
+        """
+        Incremental rescan. Returns (files re-read, files unchanged).
+        `progress(done, total)` is called after every batch when given.
+        """
+        paths = list(paths)
+        total = len(paths)
+        read = unchanged = 0
+        for i in range(0, total, LIBRARY_BATCH_SIZE):
+            if cancel is not None and cancel.is_set():
+                break
+            chunk = paths[i:i + LIBRARY_BATCH_SIZE]
+            q = ",".join("?" * len(chunk))
+            with self._lock:
+                known = {r[0]: (r[1], r[2]) for r in self._conn.execute(
+                    f"SELECT path, size, mtime_ns FROM tracks WHERE path IN ({q})", chunk)}
+            fresh = []
+            for p in chunk:
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                if known.get(p) == (st.st_size, st.st_mtime_ns):
+                    unchanged += 1
+                    continue
+                fresh.append(self._read(p, st))
+            if fresh:
+                self._store(fresh)
+                read += len(fresh)
+            if progress is not None:
+                progress(min(i + LIBRARY_BATCH_SIZE, total), total)
+        return read, unchanged
+
+    def forget(self, paths: Iterable[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM tracks WHERE path = ?", ((p,) for p in paths))
+            self._conn.commit()
+
+    # --- internals ---
+    def _read(self, path: str, st) -> TrackInfo:
+        artist, title, album, duration, tags = read_tags(path)
+        return TrackInfo(path=path, size=st.st_size, mtime_ns=st.st_mtime_ns, artist=artist,
+                         title=title, album=album, duration=duration, tags=tags)
+
+    def _store(self, infos: List[TrackInfo]):
+        now = time.time()
+        rows = [(t.path, t.size, t.mtime_ns, t.artist, t.title, t.album, t.duration,
+                 json.dumps(t.tags, ensure_ascii=False) if t.tags else None, now) for t in infos]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks (path, size, mtime_ns, artist, title, album, duration, tags, scanned) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    @staticmethod
+    def _row_to_info(row) -> TrackInfo:
+        try:
+            tags = json.loads(row[7]) if row[7] else {}
+        except ValueError:
+            tags = {}
+        return TrackInfo(path=row[0], size=row[1], mtime_ns=row[2], artist=row[3], title=row[4],
+                         album=row[5], duration=row[6], tags=tags)
+
+# -------- Shared instance --------
+_library: Optional[MediaLibrary] = None
+_library_failed = False
+_library_lock = threading.Lock()
+
+def get_library() -> Optional[MediaLibrary]:
+    """Process-wide library, opened on first use. None if the database cannot be opened."""
+    global _library, _library_failed
+    if _library is not None or _library_failed:
+        return _library
+    with _library_lock:
+        if _library is None and not _library_failed:
+            try:
+                _library = MediaLibrary()
+            except Exception as e:
+                print("albix_library: cannot open", LIBRARY_DB_PATH, "-", e)
+                _library_failed = True
+    return _library
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# albix_lrc.py — LRC (time-synced lyrics) parsing for Albix
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import re, sys
+sys.dont_write_bytecode = True
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_TIME_TAG = re.compile(r"\[(\d{1,3}):(\d{1,2})(?:[.:](\d{1,3}))?\]")
+_META_TAG = re.compile(r"^\[([A-Za-z#]+):(.*)\]\s*$")
+_WORD_TAG = re.compile(r"<\d{1,3}:\d{1,2}(?:[.:]\d{1,3})?>")  # enhanced LRC per-word times
+
+
+@dataclass
+class LrcLyrics:
+    """Lines sorted by start time; `times[i]` (ms) is when `lines[i]` begins."""
+    times: array = field(default_factory=lambda: array("q"))
+    lines: List[str] = field(default_factory=list)
+    meta: Dict[str, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def index_at(self, position_ms: int) -> int:
+        """Line playing at `position_ms`, or -1 before the first line."""
+        return bisect_right(self.times, position_ms) - 1
+
+
+def _ms(m: "re.Match") -> int:
+    mins, secs, frac = m.group(1), m.group(2), m.group(3) or "0"
+    # ".5" is half a second, ".05" is 50 ms, ".005" is 5 ms
+    frac_ms = int(frac) * (100 if len(frac) == 1 else 10 if len(frac) == 2 else 1)
+    return (int(mins) * 60 + int(secs)) * 1000 + frac_ms
+
+
+def parse_lrc(text: str) -> Optional[LrcLyrics]:
+    """
+    Parse LRC text. Returns None when it holds no timed lines, so plain lyrics
+    can be shown as they are. Lines with several time tags ("[00:12][01:40]chorus")
+    are repeated at each time; [offset:±ms] is applied.
+    """
+    timed = []
+    meta: Dict[str, str] = {}
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        pos = 0
+        stamps = []
+        while True:
+            m = _TIME_TAG.match(line, pos)
+            if not m:
+                break
+            stamps.append(_ms(m))
+            pos = m.end()
+        if stamps:
+            lyric = _WORD_TAG.sub("", line[pos:]).strip()
+            for t in stamps:
+                timed.append((t, len(timed), lyric))
+            continue
+        m = _META_TAG.match(line)
+        if m:
+            meta[m.group(1).lower()] = m.group(2).strip()
+    if not timed:
+        return None
+
+    try:
+        offset = int(meta.get("offset", "0"))
+    except ValueError:
+        offset = 0
+    timed.sort()  # by time, then by order of appearance
+    out = LrcLyrics(meta=meta)
+    for t, _, lyric in timed:
+        # a positive offset makes lyrics appear sooner
+        out.times.append(max(0, t - offset))
+        out.lines.append(lyric)
+    return out
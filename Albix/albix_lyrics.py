@@ -2,23 +2,59 @@
 # albix_lyrics.py — minimal show/hide lyrics for Albix, robust metadata detection
 # GPL v2 — JJ Posti (techtimejourney.net) 2025. 
 
-import os, re, sys
+import os, re, sys, time, threading
 sys.dont_write_bytecode = True
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import quote
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from importlib.util import find_spec
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # -------- Optional deps --------
+# requests and mutagen are slow to import and not needed until the first
+# fetch / tag read, so only their presence is checked here.
+_HAVE_REQUESTS = find_spec("requests") is not None
+_HAVE_MUTAGEN = find_spec("mutagen") is not None
+requests = None
+_MutagenFile = None
+
+def _load_requests():
+    """Import requests on first use. None (and _HAVE_REQUESTS cleared) if that fails."""
+    global requests, _HAVE_REQUESTS
+    if requests is None and _HAVE_REQUESTS:
+        try:
+            import requests
+            import requests.adapters
+        except Exception:
+            _HAVE_REQUESTS = False
+    return requests
+
+def _mutagen_file():
+    """mutagen.File, imported on first use. None when mutagen is unusable."""
+    global _MutagenFile, _HAVE_MUTAGEN
+    if _MutagenFile is None and _HAVE_MUTAGEN:
+        try:
+            from mutagen import File as _MutagenFile
+        except Exception:
+            _HAVE_MUTAGEN = False
+    return _MutagenFile
+
 try:
-    import requests
-    _HAVE_REQUESTS = True
+    import albix_library
+    _HAVE_LIBRARY = True
 except Exception:
-    _HAVE_REQUESTS = False
+    _HAVE_LIBRARY = False
 
 try:
-    from mutagen import File as MutagenFile
-    _HAVE_MUTAGEN = True
+    import albix_lyrics_cache
+    _HAVE_CACHE = True
 except Exception:
-    _HAVE_MUTAGEN = False
+    _HAVE_CACHE = False
+
+import albix_lrc
+import albix_metrics
 
 # -------- Qt shims --------
 USING_QT6 = False
@@ -33,12 +69,33 @@ except Exception:
 
 if USING_QT6:
     DockArea = Qt.DockWidgetArea
+    EndOfBlock = QtGui.QTextCursor.MoveOperation.EndOfBlock
+    KeepAnchor = QtGui.QTextCursor.MoveMode.KeepAnchor
+    BoldWeight = QtGui.QFont.Weight.Bold
+    NormalWeight = QtGui.QFont.Weight.Normal
 else:
     DockArea = Qt
+    EndOfBlock = QtGui.QTextCursor.EndOfBlock
+    KeepAnchor = QtGui.QTextCursor.KeepAnchor
+    BoldWeight = QtGui.QFont.Bold
+    NormalWeight = QtGui.QFont.Normal
 
-LYRICS_TIMEOUT = 10
+LYRICS_TIMEOUT = 10          # overall deadline per lookup, retries included (seconds)
+LYRICS_CONNECT_TIMEOUT = 3.05
+LYRICS_RETRIES = 2           # extra attempts after a connection error, 429 or 5xx
+LYRICS_BACKOFF = 0.4         # first retry delay; doubles per attempt
+LYRICS_POOL_SIZE = 4         # keep-alive connections per host
+LYRICS_BASE_URL = os.environ.get("ALBIX_LYRICS_BASE_URL", "https://api.lyrics.ovh")
 LYRICS_USER_AGENT = "Albix-Lyrics/1.2 (+https://techtimejourney.net)"
 DEFAULT_DOCK_WIDTH = 560  # widen the lyrics pane
+LYRICS_PREFETCH_AHEAD = 3    # upcoming tracks whose lyrics are fetched while this one plays
+LYRICS_PREFETCH_WORKERS = 2
+LYRICS_JOB_WORKERS = 2       # current-track lookups; a cancelled request may still occupy one
+LYRICS_PROVIDER_WORKERS = 6  # provider attempts shared by all lookups
+LYRICS_HEDGE_PARALLEL = 2    # provider attempts started at once per lookup
+LYRICS_HEDGE_DELAY = 0.8     # start another attempt when none has answered this long (seconds)
+SYNCED_COLOR = "#7f8c95"         # synced lines not being sung
+SYNCED_ACTIVE_COLOR = "#e5e9ec"  # the line being sung
 
 DARK_STYLESHEET = """
 QDockWidget::title { padding: 6px 8px; background: #1a262d; color: #e5e9ec; }
@@ -53,9 +110,18 @@ QTextBrowser {
 }
 """
 
+METADATA_MEMO_SIZE = 20000   # files whose tags are kept in memory, keyed by (path, mtime)
+
 # -------- Helpers --------
+_EXT_RE = re.compile(r"\.(mp3|flac|ogg|wav|m4a|aac|wma|mp4|mkv|avi|mov|wmv)$", re.I)
+_TRAIL_BRACKET_RE = re.compile(r"\s*\[[^\]]+\]$")     # [Live], [Remastered]
+_TRAIL_PAREN_RE = re.compile(r"\s*\(.*?\)\s*$")        # (Radio Edit)
+_PAIR_RE = re.compile(r"^\s*(.+?)\s*[-–—]\s*(.+?)\s*$")
+_NUMBERED_PAIR_RE = re.compile(r"^\s*\d{1,3}\s*[-–—]\s*(.+?)\s*[-–—]\s*(.+?)\s*$")
+_TRACK_NO_RE = re.compile(r"^(?:[A-Za-z]?\d{1,3}[\s\.\-_]+)")
+
 def _strip_ext(name: str) -> str:
-    return re.sub(r"\.(mp3|flac|ogg|wav|m4a|aac|wma|mp4|mkv|avi|mov|wmv)$", "", name, flags=re.I)
+    return _EXT_RE.sub("", name)
 
 def _html_escape(s: str) -> str:
     return (s.replace("&", "&amp;")
@@ -78,16 +144,101 @@ def _ensure_str(val) -> str:
     return str(val)
 
 def _clean_piece(s: str) -> str:
-    s = re.sub(r"\s*\[[^\]]+\]$", "", s)     # [Live], [Remastered]
-    s = re.sub(r"\s*\(.*?\)\s*$", "", s)     # (Radio Edit)
+    s = _TRAIL_BRACKET_RE.sub("", s)
+    s = _TRAIL_PAREN_RE.sub("", s)
     s = s.replace("_", " ")
     return s.strip(" -_.")
 
-def parse_artist_title_from_tags(path: str) -> Tuple[Optional[str], Optional[str]]:
+# -------- Tag memo --------
+# Raw (artist, title) tags by (path, mtime_ns): a file is opened (or looked
+# up in the library) once per modification, however often it is asked about.
+_tag_memo: "OrderedDict[Tuple[str, int], Tuple[Optional[str], Optional[str]]]" = OrderedDict()
+_tag_memo_lock = threading.Lock()
+
+def _memo_key(path: str) -> Optional[Tuple[str, int]]:
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _memo_get(key):
+    with _tag_memo_lock:
+        hit = _tag_memo.get(key)
+        if hit is not None:
+            _tag_memo.move_to_end(key)
+        return hit
+
+def _memo_put(key, tags):
+    with _tag_memo_lock:
+        _tag_memo[key] = tags
+        _tag_memo.move_to_end(key)
+        while len(_tag_memo) > METADATA_MEMO_SIZE:
+            _tag_memo.popitem(last=False)
+
+def _stripped(a, t) -> Tuple[Optional[str], Optional[str]]:
+    return _ensure_str(a).strip() or None, _ensure_str(t).strip() or None
+
+def _raw_tags(path: str) -> Tuple[Optional[str], Optional[str]]:
+    """Artist/title tags exactly as stored (memo, then library cache, then the file)."""
     if not _HAVE_MUTAGEN:
         return None, None
+    key = _memo_key(path)
+    hit = _memo_get(key) if key else None
+    if hit is not None:
+        return hit
+    # Media library first: only re-reads the file when its size/mtime changed
+    lib = albix_library.get_library() if _HAVE_LIBRARY else None
+    if lib is not None:
+        info = lib.lookup(path)
+        tags = _stripped(info.artist, info.title) if info is not None else (None, None)
+    else:
+        tags = _stripped(*_read_tags(path))
+    if key:
+        _memo_put(key, tags)
+    return tags
+
+def raw_tags_many(paths: Iterable[str], read_files: bool = False) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    _raw_tags() for many paths: memo hits first, then one batched library
+    query for the rest. Files the library has no current row for are only
+    opened when `read_files` is set; otherwise they are left out.
+    """
+    out: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    if not _HAVE_MUTAGEN:
+        return out
+    todo = []
+    for p in paths:
+        key = _memo_key(p)
+        if key is None:
+            continue
+        hit = _memo_get(key)
+        if hit is not None:
+            out[p] = hit
+        else:
+            todo.append(key)
+    lib = albix_library.get_library() if (todo and _HAVE_LIBRARY) else None
+    known = lib.get_many(p for p, _ in todo) if lib is not None else {}
+    for key in todo:
+        info = known.get(key[0])
+        if info is not None and info.mtime_ns == key[1]:
+            out[key[0]] = _stripped(info.artist, info.title)
+            _memo_put(key, out[key[0]])
+        elif read_files:
+            out[key[0]] = _raw_tags(key[0])
+    return out
+
+def _clean_tags(a: Optional[str], t: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    return (_clean_piece(a) or None) if a else None, (_clean_piece(t) or None) if t else None
+
+def parse_artist_title_from_tags(path: str) -> Tuple[Optional[str], Optional[str]]:
+    return _clean_tags(*_raw_tags(path))
+
+def _read_tags(path: str):
+    mutagen_file = _mutagen_file()
+    if mutagen_file is None:
+        return None, None
     try:
-        m = MutagenFile(path, easy=True)
+        m = mutagen_file(path, easy=True)
         if not m:
             return None, None
         artist = None
@@ -102,11 +253,23 @@ def parse_artist_title_from_tags(path: str) -> Tuple[Optional[str], Optional[str
             if v:
                 title = v[0] if isinstance(v, list) else v
                 break
-        return (_clean_piece(_ensure_str(artist)) or None,
-                _clean_piece(_ensure_str(title)) or None)
+        return artist, title
     except Exception:
         return None, None
 
+@lru_cache(maxsize=METADATA_MEMO_SIZE)
+def _pair_from_name(base: str) -> Tuple[Optional[str], Optional[str]]:
+    """Explicit "Artist - Title.ext" / "01 - Artist - Title.ext" file names only."""
+    stem = _strip_ext(base)
+    for rx in (_PAIR_RE, _NUMBERED_PAIR_RE):
+        m = rx.match(stem)
+        if m:
+            a, t = _clean_piece(m.group(1)), _clean_piece(m.group(2))
+            if a and t:
+                return a, t
+    return None, None
+
+@lru_cache(maxsize=METADATA_MEMO_SIZE)
 def parse_artist_title_from_filename(path: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Common layouts:
@@ -116,29 +279,183 @@ def parse_artist_title_from_filename(path: str) -> Tuple[Optional[str], Optional
       4) 01 - Artist - Title.ext
     """
     base = os.path.basename(path)
-    stem = _strip_ext(base)
-
-    m = re.match(r"^\s*(.+?)\s*[-–—]\s*(.+?)\s*$", stem)
-    if m:
-        a, t = _clean_piece(m.group(1)), _clean_piece(m.group(2))
-        if a and t:
-            return a, t
-
-    m = re.match(r"^\s*\d{1,3}\s*[-–—]\s*(.+?)\s*[-–—]\s*(.+?)\s*$", stem)
-    if m:
-        a, t = _clean_piece(m.group(1)), _clean_piece(m.group(2))
-        if a and t:
-            return a, t
+    a, t = _pair_from_name(base)
+    if a and t:
+        return a, t
 
+    stem = _strip_ext(base)
     parts = os.path.normpath(path).split(os.sep)
     if len(parts) >= 3:
         artist_guess = _clean_piece(parts[-3])
-        title_guess = _clean_piece(re.sub(r"^(?:[A-Za-z]?\d{1,3}[\s\.\-_]+)", "", stem))
+        title_guess = _clean_piece(_TRACK_NO_RE.sub("", stem))
         if artist_guess and title_guess:
             return artist_guess, title_guess
 
     return None, _clean_piece(stem) or None
 
+def display_names(paths: Iterable[str]) -> Dict[str, str]:
+    """
+    "Artist – Title" for playlist rows, resolved in one batch: tags already
+    known to the memo or the library, else an explicit "Artist - Title" file
+    name. No file is opened here, so it is safe for thousands of rows on the
+    GUI thread; paths without a confident answer are left out.
+    """
+    paths = list(paths)
+    tags = raw_tags_many(paths)
+    out = {}
+    for p in paths:
+        a, t = _clean_tags(*tags.get(p, (None, None)))
+        if not a or not t:
+            fa, ft = _pair_from_name(os.path.basename(p))
+            a, t = a or fa, t or ft
+        if a and t:
+            out[p] = f"{a} – {t}"
+    return out
+
+def resolve_artist_title(path: Optional[str], artist: Optional[str] = None,
+                         title: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """Fill in whatever of (artist, title) is missing: tags first, then filename patterns."""
+    a, t = artist, title
+    if (not a or not t) and path:
+        ta, tt = parse_artist_title_from_tags(path)
+        a = a or ta
+        t = t or tt
+    if (not a or not t) and path:
+        fa, ft = parse_artist_title_from_filename(path)
+        a = a or fa
+        t = t or ft
+    return a, t
+
+def query_variants(path: Optional[str], artist: Optional[str] = None,
+                   title: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    (artist, title) guesses, best first: the merged guess resolve_artist_title()
+    makes, then raw (uncleaned) tags, then the filename alone. Duplicates dropped.
+    """
+    out = [resolve_artist_title(path, artist, title)]
+    if path:
+        out.append(_raw_tags(path))
+        out.append(parse_artist_title_from_filename(path))
+    if artist and title:
+        out.insert(1, (_clean_piece(artist), _clean_piece(title)))
+    seen, variants = set(), []
+    for a, t in out:
+        if a and t and (a, t) not in seen:
+            seen.add((a, t))
+            variants.append((a, t))
+    return variants
+
+def _sidecar(path: Optional[str]) -> Optional[str]:
+    if path:
+        stem, _ = os.path.splitext(path)
+        for cand in (stem + ".lrc", stem + ".txt"):
+            if os.path.exists(cand):
+                return cand
+    return None
+
+# -------- Cancellation --------
+class CancelToken:
+    """Set from the GUI thread, polled by a lookup between its steps (and during backoff)."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to `seconds`; True if cancelled meanwhile."""
+        return self._event.wait(seconds)
+
+# -------- HTTP transport --------
+class LyricsTransport:
+    """
+    One keep-alive requests.Session shared by every lookup, so repeat fetches
+    reuse pooled connections instead of paying DNS/TCP/TLS each time.
+    Retries with exponential backoff on connection errors, 429 and 5xx, all
+    inside a single per-request deadline. `base_url` can point at a local
+    stand-in server (e.g. for latency benchmarks).
+    """
+
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url: str = LYRICS_BASE_URL, timeout: float = LYRICS_TIMEOUT,
+                 retries: int = LYRICS_RETRIES, backoff: float = LYRICS_BACKOFF,
+                 pool_size: int = LYRICS_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        _load_requests()
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = LYRICS_USER_AGENT
+
+    def get(self, path: str, deadline: Optional[float] = None, cancel: Optional["CancelToken"] = None):
+        """
+        GET base_url + path (or an absolute URL). `deadline` is a time.monotonic() value (default:
+        now + timeout). Returns the last response, or None if no attempt got
+        one. A cancelled token stops further attempts and backoff waits.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout
+        url = path if "://" in path else self.base_url + path
+        res = None
+        for attempt in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (cancel is not None and cancel.cancelled):
+                return None
+            try:
+                res = self.session.get(url, timeout=(min(LYRICS_CONNECT_TIMEOUT, remaining), remaining))
+            except requests.RequestException:
+                res = None
+            if res is not None and res.status_code not in self.RETRY_STATUS:
+                return res
+            delay = self.backoff * (2 ** attempt)
+            if res is not None:
+                try:
+                    delay = max(delay, float(res.headers.get("Retry-After", 0)))
+                except ValueError:
+                    pass
+            if attempt == self.retries or time.monotonic() + delay >= deadline:
+                break
+            if cancel is not None:
+                if cancel.wait(delay):
+                    return None
+            else:
+                time.sleep(delay)
+        return res
+
+    def close(self):
+        self.session.close()
+
+_transport: Optional[LyricsTransport] = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> Optional[LyricsTransport]:
+    """Process-wide transport, created on first use. None without requests."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            if _load_requests() is None:
+                return None
+            _transport = LyricsTransport()
+        return _transport
+
+def set_transport(transport: Optional[LyricsTransport]):
+    """Swap the shared transport (None: rebuild from the defaults on next use)."""
+    global _transport
+    with _transport_lock:
+        old, _transport = _transport, transport
+    if old is not None and old is not transport:
+        old.close()
+
 # -------- Data --------
 @dataclass
 class LyricsResult:
@@ -147,54 +464,309 @@ class LyricsResult:
     text: str
     source: str
 
-def fetch_lyrics(artist: str, title: str) -> Optional[LyricsResult]:
-    if not _HAVE_REQUESTS or not artist or not title:
-        return None
-    try:
-        url = f"https://api.lyrics.ovh/v1/{artist}/{title}"
-        res = requests.get(url, timeout=LYRICS_TIMEOUT,
-                           headers={"User-Agent": LYRICS_USER_AGENT})
+# -------- Providers --------
+@dataclass
+class ProviderStats:
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0       # network failures, timeouts, server errors
+    total_ms: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.requests if self.requests else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.requests} asked · {self.hit_rate:.0%} found · {self.misses} missed · "
+                f"{self.errors} failed · mean {self.mean_ms:.0f} ms")
+
+class LyricsProvider:
+    """
+    One lyrics source. fetch() returns (result, definitive): definitive is
+    False when the source could not answer (network, timeout, cancelled),
+    so the miss is not cached. Each provider has its own time budget.
+    """
+    name = "provider"
+    remote = True
+    timeout = LYRICS_TIMEOUT
+
+    def __init__(self):
+        self.stats = ProviderStats()
+        self._stats_lock = threading.Lock()
+
+    def fetch(self, artist: str, title: str, deadline: float,
+              cancel: Optional[CancelToken]) -> Tuple[Optional[LyricsResult], bool]:
+        raise NotImplementedError
+
+    def attempt(self, artist: str, title: str, deadline: float,
+                cancel: Optional[CancelToken]) -> Tuple[Optional[LyricsResult], bool]:
+        """fetch() within this provider's budget, with statistics."""
+        t0 = time.monotonic()
+        try:
+            res, definitive = self.fetch(artist, title, min(deadline, t0 + self.timeout), cancel)
+        except Exception:
+            res, definitive = None, False
+        if res is None and cancel is not None and cancel.cancelled:
+            return None, False  # lost the race: not this provider's miss
+        with self._stats_lock:
+            st = self.stats
+            st.requests += 1
+            st.total_ms += (time.monotonic() - t0) * 1000.0
+            if res is not None:
+                st.hits += 1
+            elif definitive:
+                st.misses += 1
+            else:
+                st.errors += 1
+        return res, definitive
+
+class LocalFolderProvider(LyricsProvider):
+    """`Artist - Title.lrc` / `.txt` files in a lyrics folder (ALBIX_LYRICS_DIR)."""
+    name = "local folder"
+    remote = False
+
+    def __init__(self, folder: Optional[str] = None):
+        super().__init__()
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        self.folder = folder or os.environ.get("ALBIX_LYRICS_DIR") or os.path.join(base, "albix", "lyrics")
+        self._index: Dict[str, str] = {}
+        self._index_mtime = None
+
+    def fetch(self, artist, title, deadline, cancel):
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return None, True
+        if mtime != self._index_mtime:
+            index = {}
+            for name in sorted(os.listdir(self.folder)):
+                stem, ext = os.path.splitext(name)
+                if ext.lower() not in (".lrc", ".txt"):
+                    continue
+                a, t = parse_artist_title_from_filename(stem)
+                if a and t:
+                    index.setdefault(_variant_key(a, t), os.path.join(self.folder, name))
+            self._index, self._index_mtime = index, mtime
+        path = self._index.get(_variant_key(artist, title))
+        if not path:
+            return None, True
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return LyricsResult(artist=artist, title=title, text=f.read(), source=os.path.basename(path)), True
+
+class LrclibProvider(LyricsProvider):
+    """lrclib.net: free, no key, often has time-synced (LRC) lyrics."""
+    name = "lrclib"
+    timeout = 6.0
+    base_url = os.environ.get("ALBIX_LRCLIB_BASE_URL", "https://lrclib.net")
+
+    def fetch(self, artist, title, deadline, cancel):
+        transport = get_transport()
+        if transport is None:
+            return None, False
+        url = (f"{self.base_url.rstrip('/')}/api/get?artist_name={quote(artist, safe='')}"
+               f"&track_name={quote(title, safe='')}")
+        res = transport.get(url, deadline=deadline, cancel=cancel)
+        if res is None:
+            return None, False
+        if res.status_code == 200:
+            data = res.json() or {}
+            text = data.get("syncedLyrics") or data.get("plainLyrics") or ""
+            if text.strip():
+                return LyricsResult(artist=artist, title=title, text=text, source="lrclib.net"), True
+            return None, True
+        return None, res.status_code == 404
+
+class LyricsOvhProvider(LyricsProvider):
+    name = "lyrics.ovh"
+    timeout = 6.0
+
+    def fetch(self, artist, title, deadline, cancel):
+        transport = get_transport()
+        if transport is None:
+            return None, False
+        res = transport.get(f"/v1/{quote(artist, safe='')}/{quote(title, safe='')}", deadline=deadline, cancel=cancel)
+        if res is None:
+            return None, False
         if res.status_code == 200:
             lyrics = (res.json() or {}).get("lyrics", "") or ""
             if lyrics.strip():
-                return LyricsResult(artist=artist, title=title, text=lyrics, source="lyrics.ovh")
-    except Exception:
-        pass
-    return None
+                return LyricsResult(artist=artist, title=title, text=lyrics, source="lyrics.ovh"), True
+            return None, True
+        return None, res.status_code == 404
 
-# -------- Worker (emits job_id + result) --------
-class _LyricsWorker(QtCore.QObject):
-    finished = pyqtSignal(int, object)  # job_id, LyricsResult | None
+PROVIDERS: List[LyricsProvider] = [LocalFolderProvider(), LrclibProvider(), LyricsOvhProvider()]
 
-    def __init__(self, job_id: int, path: Optional[str], artist: Optional[str], title: Optional[str]):
-        super().__init__()
-        self.job_id = job_id
-        self.path = path
-        self.artist = artist
-        self.title = title
-
-    @QtCore.pyqtSlot()
-    def run(self):
-        a, t = self.artist, self.title
-
-        # 1) tags
-        if (not a or not t) and self.path:
-            ta, tt = parse_artist_title_from_tags(self.path)
-            a = a or ta
-            t = t or tt
-
-        # 2) filename patterns
-        if (not a or not t) and self.path:
-            fa, ft = parse_artist_title_from_filename(self.path)
-            a = a or fa
-            t = t or ft
-
-        # 3) online fetch
-        result = fetch_lyrics(a, t) if (a and t) else None
-        self.finished.emit(self.job_id, result)
+def register_provider(provider: LyricsProvider, first: bool = False):
+    """Add a lyrics source to the chain (local ones are always asked before remote ones)."""
+    if first:
+        PROVIDERS.insert(0, provider)
+    else:
+        PROVIDERS.append(provider)
+
+def provider_stats() -> Dict[str, ProviderStats]:
+    return {p.name: p.stats for p in PROVIDERS}
+
+def provider_summary() -> Optional[str]:
+    """One line per provider that has been asked, or None before the first lookup."""
+    lines = [f"{name}: {st.summary()}" for name, st in provider_stats().items() if st.requests]
+    return "\n".join(lines) or None
+
+# -------- Hedged lookup --------
+_provider_pool: Optional[ThreadPoolExecutor] = None
+_provider_pool_lock = threading.Lock()
+
+def _get_provider_pool() -> ThreadPoolExecutor:
+    global _provider_pool
+    with _provider_pool_lock:
+        if _provider_pool is None:
+            _provider_pool = ThreadPoolExecutor(max_workers=LYRICS_PROVIDER_WORKERS,
+                                                thread_name_prefix="albix-lyrics-provider")
+        return _provider_pool
+
+def _variant_key(artist: str, title: str) -> str:
+    if _HAVE_CACHE:
+        return albix_lyrics_cache.normalize_key(artist, title)
+    return artist.casefold().strip() + "\x1f" + title.casefold().strip()
+
+def hedged_fetch(variants: List[Tuple[str, str]], cancel: Optional[CancelToken] = None,
+                 deadline: Optional[float] = None) -> Tuple[Optional[LyricsResult], bool]:
+    """
+    Ask every provider for every (artist, title) variant and return the first
+    hit: (result, definitive). Local providers are asked first, inline.
+    Remote attempts start LYRICS_HEDGE_PARALLEL at a time, best variant
+    first; another starts whenever one misses or LYRICS_HEDGE_DELAY passes
+    without an answer. The rest are cancelled once something is found.
+    """
+    deadline = deadline if deadline is not None else time.monotonic() + LYRICS_TIMEOUT
+    variants = [v for v in variants if v[0] and v[1]]
+    if not variants:
+        return None, False
+    remote = []
+    for p in list(PROVIDERS):
+        if p.remote:
+            remote.append(p)
+            continue
+        for a, t in variants:
+            res, _ = p.attempt(a, t, deadline, cancel)
+            if res is not None:
+                return res, True
+    tasks = [(p, a, t) for a, t in variants for p in remote]
+    if not tasks or not _HAVE_REQUESTS:
+        return None, False
+
+    stop = CancelToken()  # cancels the losing attempts
+    pool = _get_provider_pool()
+    pending = set()
+    started = 0
+    complete = True       # every attempt so far gave a definitive miss
+    last_start = 0.0
+
+    def launch(n: int):
+        nonlocal started, last_start
+        while n > 0 and started < len(tasks):
+            p, a, t = tasks[started]
+            pending.add(pool.submit(p.attempt, a, t, deadline, stop))
+            started += 1
+            n -= 1
+            last_start = time.monotonic()
+
+    try:
+        launch(LYRICS_HEDGE_PARALLEL)
+        while pending:
+            now = time.monotonic()
+            if now >= deadline or (cancel is not None and cancel.cancelled):
+                return None, False
+            done, pending = wait(pending, timeout=min(0.1, deadline - now), return_when=FIRST_COMPLETED)
+            for fut in done:
+                res, definitive = fut.result()
+                if res is not None:
+                    return res, True
+                complete = complete and definitive
+            if done:
+                launch(len(done))
+            elif time.monotonic() - last_start >= LYRICS_HEDGE_DELAY:
+                launch(1)  # nothing back yet: hedge with the next attempt
+        return None, complete and started == len(tasks)
+    finally:
+        stop.cancel()
+        for fut in pending:
+            fut.cancel()
+
+def fetch_lyrics(artist: str, title: str) -> Optional[LyricsResult]:
+    return hedged_fetch([(artist, title)])[0]
+
+def cached_lyrics(artist: Optional[str], title: Optional[str]):
+    """Cache entry for the song (found or known-missing), or None when it has to be fetched."""
+    cache = albix_lyrics_cache.get_lyrics_cache() if _HAVE_CACHE else None
+    if cache is None or not artist or not title:
+        return None
+    return cache.get(artist, title)
+
+_inflight: Dict[str, threading.Event] = {}  # normalized key -> set when that fetch is done
+_inflight_lock = threading.Lock()
+
+def lookup_lyrics(artist: str, title: str, cancel: Optional[CancelToken] = None,
+                  variants: Iterable[Tuple[str, str]] = ()) -> Optional[LyricsResult]:
+    """
+    hedged_fetch() behind the persistent cache, keyed by (artist, title);
+    `variants` are extra guesses tried alongside it. Misses are remembered too.
+    Concurrent lookups of the same song (current track + prefetch) share one
+    request: later callers wait for the first and read its answer from the cache.
+    """
+    hit = cached_lyrics(artist, title)
+    if hit is not None:
+        return _from_cache(hit)
+    queries = [(artist, title)]
+    seen = {_variant_key(artist, title)}
+    for a, t in variants:
+        if a and t and _variant_key(a, t) not in seen:
+            seen.add(_variant_key(a, t))
+            queries.append((a, t))
+    cache = albix_lyrics_cache.get_lyrics_cache() if _HAVE_CACHE else None
+    if cache is None:
+        return hedged_fetch(queries, cancel)[0]
+
+    key = albix_lyrics_cache.normalize_key(artist, title)
+    with _inflight_lock:
+        done = _inflight.get(key)
+        owner = done is None
+        if owner:
+            done = _inflight[key] = threading.Event()
+    if not owner:
+        deadline = time.monotonic() + LYRICS_TIMEOUT
+        while not done.wait(0.05):
+            if (cancel is not None and cancel.cancelled) or time.monotonic() > deadline:
+                return None
+        hit = cache.get(artist, title)
+        return _from_cache(hit) if hit is not None else None
+    try:
+        res, definitive = hedged_fetch(queries, cancel)
+        if res is not None:
+            cache.put(artist, title, res.text, res.source)
+        elif definitive:
+            cache.put_missing(artist, title)
+        return res
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        done.set()
+
+def _from_cache(hit) -> Optional[LyricsResult]:
+    if not hit.found:
+        return None
+    return LyricsResult(artist=hit.artist, title=hit.title, text=hit.text, source=hit.source or "cache")
 
 # -------- Controller --------
 class AlbixLyrics(QtCore.QObject):
+    # emitted from pool threads, delivered queued on the GUI thread
+    _job_done = pyqtSignal(int, object, object)     # job_id, LyricsResult | None, (artist, title)
+    _prefetched = pyqtSignal(str, object, object)   # path, (artist, title), CancelToken
+
     def __init__(self, main_window: QtWidgets.QMainWindow, video_widget: Optional[QtWidgets.QWidget] = None):
         super().__init__(main_window)
         self.win = main_window
@@ -220,10 +792,31 @@ class AlbixLyrics(QtCore.QObject):
         except Exception:
             pass
 
-        # Thread state
-        self._thread: Optional[QtCore.QThread] = None
-        self._worker: Optional[_LyricsWorker] = None
-        self._job_id = 0  # monotonically increasing
+        # Synced (LRC) state: lyric i is document block _lrc_first_block + i
+        self._lrc: Optional[albix_lrc.LrcLyrics] = None
+        self._lrc_first_block = 0
+        self._lrc_active = -1
+        self._playing = False
+        self._fmt_line = QtGui.QTextCharFormat()
+        self._fmt_line.setForeground(QtGui.QColor(SYNCED_COLOR))
+        self._fmt_line.setFontWeight(NormalWeight)
+        self._fmt_active = QtGui.QTextCharFormat()
+        self._fmt_active.setForeground(QtGui.QColor(SYNCED_ACTIVE_COLOR))
+        self._fmt_active.setFontWeight(BoldWeight)
+
+        # Current-track lookup: persistent pool, at most one live job (older ones are cancelled)
+        self._jobs: Optional[ThreadPoolExecutor] = None
+        self._job = None          # (Future, CancelToken) of the latest job
+        self._job_id = 0          # monotonically increasing
+        self._job_path: Optional[str] = None
+        self._resolved: Dict[str, Tuple[str, str]] = {}  # path -> (artist, title) found by workers
+        self._job_done.connect(self._on_ready)
+
+        # Prefetch for upcoming tracks: a small pool that only fills the cache
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._prefetching: Dict[str, tuple] = {}  # path -> (Future, CancelToken)
+        self._await_path: Optional[str] = None     # current track, waiting on its prefetch
+        self._prefetched.connect(self._on_prefetched)
 
         # Initial UI
         if not _HAVE_REQUESTS:
@@ -264,21 +857,58 @@ class AlbixLyrics(QtCore.QObject):
         else:
             self.show_panel()
 
+    def update_position(self, position_ms: int):
+        """Highlight the synced line at `position_ms` (no-op for plain lyrics)."""
+        lrc = self._lrc
+        if lrc is None:
+            return
+        idx = lrc.index_at(position_ms)
+        if idx == self._lrc_active:
+            return
+        prev, self._lrc_active = self._lrc_active, idx
+        # restyle just the two affected blocks; the rest of the document is untouched
+        if prev >= 0:
+            self._format_line(prev, self._fmt_line)
+        if idx >= 0:
+            self._format_line(idx, self._fmt_active)
+            if self._playing:
+                self._scroll_to_line(idx)
+
+    def set_playing(self, playing: bool):
+        """Synced lyrics follow playback only while playing, so paused lyrics can be scrolled freely."""
+        self._playing = bool(playing)
+        if self._playing and self._lrc is not None and self._lrc_active >= 0:
+            self._scroll_to_line(self._lrc_active)
+
     def set_media(self, path: Optional[str], artist: Optional[str] = None, title: Optional[str] = None):
         """Called by player when a new local file starts."""
         self._cancel_job()
+        self._lrc = None
+        self._await_path = None
 
         # Sidecar first
-        if path:
-            stem, _ = os.path.splitext(path)
-            for cand in (stem + ".lrc", stem + ".txt"):
-                if os.path.exists(cand):
-                    try:
-                        txt = open(cand, "r", encoding="utf-8", errors="replace").read()
-                        self._set_text(txt, source=os.path.basename(cand))
-                        return
-                    except Exception:
-                        pass
+        cand = _sidecar(path)
+        if cand:
+            try:
+                txt = open(cand, "r", encoding="utf-8", errors="replace").read()
+                self._set_text(txt, source=os.path.basename(cand))
+                return
+            except Exception:
+                pass
+
+        # Cached answer: shown at once, no thread, no network
+        if path and not (artist and title) and path in self._resolved:
+            artist, title = self._resolved[path]
+        hit = cached_lyrics(artist, title)
+        if hit is not None:
+            self._show_result(_from_cache(hit))
+            return
+
+        # Already being prefetched: wait for that instead of fetching twice
+        if path and not (artist and title) and path in self._prefetching:
+            self._await_path = path
+            self.view.setHtml("<i>Fetching lyrics…</i>")
+            return
 
         if not _HAVE_REQUESTS:
             self.view.setHtml("<b>Lyrics:</b> <i>Install 'requests' to enable online fetching.</i>")
@@ -286,77 +916,191 @@ class AlbixLyrics(QtCore.QObject):
 
         self.view.setHtml("<i>Fetching lyrics…</i>")
 
-        # New job
+        # New job (the previous one was cancelled above)
         self._job_id += 1
-        job_id = self._job_id
+        token = CancelToken()
+        if self._jobs is None:
+            self._jobs = ThreadPoolExecutor(max_workers=LYRICS_JOB_WORKERS, thread_name_prefix="albix-lyrics-job")
+        fut = self._jobs.submit(self._run_job, self._job_id, path, artist, title, token)
+        self._job = (fut, token)
+        self._job_path = path
 
-        thread = QtCore.QThread(self)
-        worker = _LyricsWorker(job_id, path, artist, title)
-        worker.moveToThread(thread)
-
-        # Wire up using local 'thread' variable to avoid referencing self._thread later
-        thread.started.connect(worker.run)
-        worker.finished.connect(self._on_ready, QtCore.Qt.ConnectionType.QueuedConnection if USING_QT6 else QtCore.Qt.QueuedConnection)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
+    def prefetch(self, paths: Iterable[str]):
+        """
+        Resolve and fetch lyrics for upcoming tracks in the background, so they
+        are in the cache by the time set_media() is called. Paths that dropped
+        out of the list and have not started yet are cancelled.
+        """
+        if not (_HAVE_REQUESTS and _HAVE_CACHE):
+            return
+        wanted = []
+        for p in paths:
+            if len(wanted) >= LYRICS_PREFETCH_AHEAD:
+                break
+            if p and p not in wanted:
+                wanted.append(p)
+        for p, (fut, token) in list(self._prefetching.items()):
+            # the playing track's prefetch is what set_media() waits on; it is never stale
+            if p not in wanted and p != self._await_path:
+                token.cancel()
+                fut.cancel()
+                del self._prefetching[p]
+        for p in wanted:
+            if p in self._prefetching:
+                continue
+            if p in self._resolved and cached_lyrics(*self._resolved[p]) is not None:
+                continue
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=LYRICS_PREFETCH_WORKERS,
+                                                thread_name_prefix="albix-lyrics")
+            token = CancelToken()
+            self._prefetching[p] = (self._pool.submit(self._prefetch_one, p, token), token)
 
-        self._thread = thread
-        self._worker = worker
-        thread.start()
+    def shutdown(self):
+        """Cancel everything; the GUI thread does not wait for requests in flight."""
+        self._cancel_job()
+        for fut, token in self._prefetching.values():
+            token.cancel()
+        self._prefetching.clear()
+        for pool in (self._jobs, self._pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._jobs = self._pool = None
 
     def clear(self):
         self._cancel_job()
+        self._lrc = None
+        self._await_path = None
         self.view.setHtml("<i>No lyrics.</i>")
 
     # --- internals ---
-    @QtCore.pyqtSlot(int, object)
-    def _on_ready(self, job_id: int, res: Optional['LyricsResult']):
+    def _run_job(self, job_id: int, path: Optional[str], artist: Optional[str],
+                 title: Optional[str], token: CancelToken):
+        """Runs on a pool thread: tags, filename patterns, then cache/network."""
+        a, t, result = artist, title, None
+        with albix_metrics.span("lyrics_lookup") as info:
+            try:
+                variants = query_variants(path, artist, title)
+                if variants and not token.cancelled:
+                    a, t = variants[0]
+                    result = lookup_lyrics(a, t, token, variants[1:])
+            except Exception as e:
+                print("lyrics lookup error:", e)
+            info["found"] = result is not None
+        if token.cancelled:
+            return
+        try:
+            self._job_done.emit(job_id, result, (a, t))
+        except RuntimeError:
+            pass  # controller already destroyed (app closing)
+
+    def _prefetch_one(self, path: str, token: CancelToken):
+        """Runs on a pool thread: only touches the (thread-safe) cache, then signals back."""
+        a = t = None
+        with albix_metrics.span("lyrics_prefetch"):
+            try:
+                if not _sidecar(path) and not token.cancelled:
+                    variants = query_variants(path)
+                    if variants and not token.cancelled:
+                        a, t = variants[0]
+                        lookup_lyrics(a, t, token, variants[1:])
+            except Exception as e:
+                print("lyrics prefetch error:", e)
+        try:
+            self._prefetched.emit(path, (a, t), token)
+        except RuntimeError:
+            pass  # controller already destroyed (app closing)
+
+    @QtCore.pyqtSlot(str, object, object)
+    def _on_prefetched(self, path: str, resolved, token):
+        entry = self._prefetching.get(path)
+        if entry is not None and entry[1] is token:
+            del self._prefetching[path]
+        if resolved[0] and resolved[1]:
+            self._resolved[path] = resolved
+        if path == self._await_path:
+            self.set_media(path)
+
+    @QtCore.pyqtSlot(int, object, object)
+    def _on_ready(self, job_id: int, res: Optional['LyricsResult'], resolved):
         # Ignore late results from older jobs
         if job_id != self._job_id:
             return
+        if self._job_path and resolved[0] and resolved[1]:
+            self._resolved[self._job_path] = resolved
+        self._show_result(res)
+
+    def _show_result(self, res: Optional['LyricsResult']):
         if res and res.text.strip():
+            at = f"{res.artist or ''} — {res.title or ''}".strip(" —")
+            if self._show_synced(res.text, res.source, at):
+                return
             header = ""
             if res.artist or res.title:
-                at = f"{res.artist or ''} — {res.title or ''}".strip(" —")
                 header = f"<div style='color:#9aa5ae;margin-bottom:6px'>{_html_escape(at)}</div>"
             src = f"<div style='color:#74808a;font-size:11px'>Source: {_html_escape(res.source)}</div>"
             body = f"<pre style='white-space:pre-wrap;margin:0'>{_html_escape(res.text)}</pre>"
             self.view.setHtml(header + body + src)
         else:
-            self.view.setHtml("<i>No lyrics found (tried tags, filename and lyrics.ovh).</i>")
+            tried = ", ".join(p.name for p in PROVIDERS)
+            self.view.setHtml(f"<i>No lyrics found (tried tags, filename; {_html_escape(tried)}).</i>")
 
     def _set_text(self, text: str, source: Optional[str] = None):
+        if self._show_synced(text, source):
+            return
         src = f"<div style='color:#74808a;font-size:11px'>Source: {_html_escape(source)}</div>" if source else ""
         self.view.setHtml(f"<pre style='white-space:pre-wrap;margin:0'>{_html_escape(text)}</pre>{src}")
 
+    def _show_synced(self, text: str, source: Optional[str] = None, header: str = "") -> bool:
+        """Lay out LRC lyrics one block per line. False when `text` has no time tags."""
+        lrc = albix_lrc.parse_lrc(text)
+        if lrc is None:
+            return False
+        doc = self.view.document()
+        doc.clear()
+        cur = QtGui.QTextCursor(doc)
+        if header:
+            cur.insertHtml(f"<div style='color:#9aa5ae'>{_html_escape(header)}</div>")
+            cur.insertBlock()
+        self._lrc_first_block = cur.block().blockNumber()
+        for i, line in enumerate(lrc.lines):
+            if i:
+                cur.insertBlock()
+            cur.insertText(line, self._fmt_line)
+        if source:
+            cur.insertBlock()
+            cur.insertHtml(f"<span style='color:#74808a;font-size:11px'>Source: {_html_escape(source)}</span>")
+        self._lrc = lrc
+        self._lrc_active = -1
+        self.view.verticalScrollBar().setValue(0)
+        return True
+
+    def _format_line(self, idx: int, fmt):
+        block = self.view.document().findBlockByNumber(self._lrc_first_block + idx)
+        if not block.isValid():
+            return
+        cur = QtGui.QTextCursor(block)
+        cur.movePosition(EndOfBlock, KeepAnchor)
+        cur.setCharFormat(fmt)
+
+    def _scroll_to_line(self, idx: int):
+        doc = self.view.document()
+        block = doc.findBlockByNumber(self._lrc_first_block + idx)
+        if not block.isValid():
+            return
+        rect = doc.documentLayout().blockBoundingRect(block)
+        bar = self.view.verticalScrollBar()
+        bar.setValue(int(rect.top() - (self.view.viewport().height() - rect.height()) / 2))
+
     def _cancel_job(self):
-        """Stop any running worker safely (no dangling signal calls)."""
-        t, w = self._thread, self._worker
-        self._thread = None
-        self._worker = None
+        """Cancel the current lookup without waiting for it; its late result is ignored."""
+        job, self._job = self._job, None
         # Bump job id so any late results are ignored
         self._job_id += 1
-
-        if t:
-            try:
-                # RequestInterruption is best-effort; worker is short-lived anyway
-                if hasattr(t, "requestInterruption"):
-                    t.requestInterruption()
-            except Exception:
-                pass
-            try:
-                t.quit()
-            except Exception:
-                pass
-            try:
-                t.wait(1500)  # wait up to 1.5s to finish
-            except Exception:
-                pass
-            try:
-                t.deleteLater()
-            except Exception:
-                pass
+        if job is not None:
+            fut, token = job
+            token.cancel()
+            fut.cancel()  # never started: drop it from the queue
 
 # --- manual test ---
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# albix_lyrics_cache.py — persistent lyrics cache for Albix (SQLite, TTL, negative entries, LRU front)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, re, sys, time, sqlite3, threading
+sys.dont_write_bytecode = True
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+
+def _default_db_path() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "albix", "lyrics.db")
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+LYRICS_CACHE_PATH = os.environ.get("ALBIX_LYRICS_DB") or _default_db_path()
+LYRICS_CACHE_TTL = _env_float("ALBIX_LYRICS_TTL_DAYS", 90) * 86400          # found lyrics
+LYRICS_NEGATIVE_TTL = _env_float("ALBIX_LYRICS_MISS_TTL_DAYS", 3) * 86400   # "no lyrics" answers
+LYRICS_CACHE_MAX_BYTES = int(_env_float("ALBIX_LYRICS_CACHE_MB", 64) * 1024 * 1024)
+LYRICS_MEMORY_ENTRIES = 128
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lyrics (
+    key      TEXT PRIMARY KEY,
+    artist   TEXT,
+    title    TEXT,
+    text     TEXT,
+    source   TEXT,
+    expires  REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lyrics_accessed ON lyrics(accessed);
+"""
+
+_BRACKETS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_FEAT = re.compile(r"\s(?:feat\.?|ft\.?|featuring)\s.*$")
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_key(artist: str, title: str) -> str:
+    """Cache key that survives case, punctuation, "(Remastered)" and "feat. X" differences."""
+    def norm(s: str) -> str:
+        s = _BRACKETS.sub(" ", (s or "").casefold())
+        s = _FEAT.sub("", " " + s)
+        return " ".join(_NON_WORD.sub(" ", s).split())
+    return norm(artist) + "\x1f" + norm(title)
+
+
+# -------- Data --------
+@dataclass
+class CachedLyrics:
+    artist: Optional[str]
+    title: Optional[str]
+    text: Optional[str]      # None: known to have no lyrics
+    source: Optional[str]
+    expires: float
+
+    @property
+    def found(self) -> bool:
+        return self.text is not None
+
+
+# -------- Cache --------
+class LyricsCache:
+    """
+    Lyrics by normalized (artist, title). Found lyrics and "not found"
+    answers are both stored, with separate TTLs, so neither a known song
+    nor a known miss goes back to the network until it expires. Recent
+    entries are served from an in-memory LRU; the file is kept under
+    LYRICS_CACHE_MAX_BYTES by dropping the least recently used rows.
+    Safe to share between threads; one connection is serialized by a lock.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: int = LYRICS_CACHE_MAX_BYTES,
+                 ttl: float = LYRICS_CACHE_TTL, negative_ttl: float = LYRICS_NEGATIVE_TTL,
+                 memory_entries: int = LYRICS_MEMORY_ENTRIES):
+        self.db_path = db_path or LYRICS_CACHE_PATH
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory: "OrderedDict[str, CachedLyrics]" = OrderedDict()
+        self._memory_entries = memory_entries
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                pass
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute("DELETE FROM lyrics WHERE expires < ?", (time.time(),))
+            self._conn.commit()
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM lyrics").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- reads ---
+    def get(self, artist: str, title: str) -> Optional[CachedLyrics]:
+        """Unexpired entry (found or negative), or None when the network has to be asked."""
+        key = normalize_key(artist, title)
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if hit.expires >= now:
+                    self._memory.move_to_end(key)
+                    return hit
+                del self._memory[key]
+            row = self._conn.execute(
+                "SELECT artist, title, text, source, expires FROM lyrics WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[4] < now:
+                self._delete(key)
+                return None
+            self._conn.execute("UPDATE lyrics SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            hit = CachedLyrics(*row)
+            self._remember(key, hit)
+            return hit
+
+    # --- writes ---
+    def put(self, artist: str, title: str, text: str, source: str) -> CachedLyrics:
+        return self._put(artist, title, text, source, self.ttl)
+
+    def put_missing(self, artist: str, title: str) -> CachedLyrics:
+        """Record that no provider has lyrics for this song (rechecked after the negative TTL)."""
+        return self._put(artist, title, None, None, self.negative_ttl)
+
+    def forget(self, artist: str, title: str):
+        key = normalize_key(artist, title)
+        with self._lock:
+            self._memory.pop(key, None)
+            self._delete(key)
+            self._conn.commit()
+
+    # --- internals ---
+    def _put(self, artist, title, text, source, ttl: float) -> CachedLyrics:
+        key = normalize_key(artist, title)
+        now = time.time()
+        entry = CachedLyrics(artist, title, text, source, now + ttl)
+        size = len(key) + len(text or "") + len(artist or "") + len(title or "") + 64
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM lyrics WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lyrics (key, artist, title, text, source, expires, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (key, artist, title, text, source, entry.expires, now, size))
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: CachedLyrics):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key: str):
+        row = self._conn.execute("SELECT size FROM lyrics WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM lyrics WHERE key = ?", (key,))
+            self._bytes -= row[0]
+
+    def _evict(self):
+        """Drop expired rows, then least recently used ones, down to 90% of the limit."""
+        self._conn.execute("DELETE FROM lyrics WHERE expires < ?", (time.time(),))
+        target = int(self.max_bytes * 0.9)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM lyrics").fetchone()[0]
+        if self._bytes <= target:
+            return
+        drop, freed = [], 0
+        for key, size in self._conn.execute("SELECT key, size FROM lyrics ORDER BY accessed"):
+            drop.append((key,))
+            freed += size
+            if self._bytes - freed <= target:
+                break
+        self._conn.executemany("DELETE FROM lyrics WHERE key = ?", drop)
+        self._bytes -= freed
+        for (key,) in drop:
+            self._memory.pop(key, None)
+
+
+# -------- Shared instance --------
+_cache: Optional[LyricsCache] = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+def get_lyrics_cache() -> Optional[LyricsCache]:
+    """Process-wide cache, opened on first use. None if the database cannot be opened."""
+    global _cache, _cache_failed
+    if _cache is not None or _cache_failed:
+        return _cache
+    with _cache_lock:
+        if _cache is None and not _cache_failed:
+            try:
+                _cache = LyricsCache()
+            except Exception as e:
+                print("albix_lyrics_cache: cannot open", LYRICS_CACHE_PATH, "-", e)
+                _cache_failed = True
+    return _cache
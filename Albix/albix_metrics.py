@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# albix_metrics.py — timing spans for Albix (rolling histograms, JSON-lines log, stats dock)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys, json, time, atexit, threading
+sys.dont_write_bytecode = True
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore, QtGui, QtWidgets
+    from PyQt6.QtCore import Qt
+    USING_QT6 = True
+except Exception:
+    from PyQt5 import QtCore, QtGui, QtWidgets
+    from PyQt5.QtCore import Qt
+    USING_QT6 = False
+
+DockArea = Qt.DockWidgetArea if USING_QT6 else Qt
+
+# ALBIX_METRICS=0 turns the spans into no-ops; ALBIX_METRICS_LOG=<file> appends every sample as a JSON line
+METRICS_ENABLED = os.environ.get("ALBIX_METRICS", "1").lower() not in ("0", "no", "false", "off")
+METRICS_LOG_PATH = os.environ.get("ALBIX_METRICS_LOG") or None
+METRICS_WINDOW = 512          # recent samples per span behind the percentiles and histogram
+RATE_WINDOW_S = 10.0          # counters report events per second over this window
+LOG_FLUSH_LINES = 256         # buffered log lines that force a write
+LOG_FLUSH_S = 5.0             # ... or the age of the oldest buffered line
+STATS_REFRESH_MS = 1000       # stats dock refresh while it is visible
+BUCKET_EDGES = tuple(2.0 ** i for i in range(13))   # histogram upper edges: 1, 2, 4 … 4096 ms, then the rest
+_BARS = " ▁▂▃▄▅▆▇█"
+
+
+# -------- Figures --------
+class SpanStats:
+    """Durations of one span: running totals plus a rolling window of recent samples."""
+
+    __slots__ = ("name", "count", "total_ms", "max_ms", "last_ms", "_recent")
+
+    def __init__(self, name: str, window: int = METRICS_WINDOW):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self._recent.append(ms)
+
+    def percentile(self, q: float) -> float:
+        s = sorted(self._recent)
+        return s[min(len(s) - 1, int(q * len(s)))] if s else 0.0
+
+    def buckets(self) -> List[int]:
+        """Recent samples per BUCKET_EDGES slot, plus one for everything slower."""
+        counts = [0] * (len(BUCKET_EDGES) + 1)
+        for ms in self._recent:
+            i = 0
+            while i < len(BUCKET_EDGES) and ms > BUCKET_EDGES[i]:
+                i += 1
+            counts[i] += 1
+        return counts
+
+    def as_dict(self) -> dict:
+        return {"count": self.count, "last_ms": round(self.last_ms, 3), "mean_ms": round(self.total_ms / self.count, 3)
+                if self.count else 0.0, "p50_ms": round(self.percentile(0.5), 3),
+                "p90_ms": round(self.percentile(0.9), 3), "p99_ms": round(self.percentile(0.99), 3),
+                "max_ms": round(self.max_ms, 3), "buckets": self.buckets()}
+
+
+class RateCounter:
+    """How often something happens: a total and the rate over the last RATE_WINDOW_S seconds."""
+
+    __slots__ = ("name", "count", "_times")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self._times: Deque[float] = deque()
+
+    def hit(self, now: float):
+        self.count += 1
+        times = self._times
+        times.append(now)
+        while now - times[0] > RATE_WINDOW_S:
+            times.popleft()
+
+    def rate(self, now: Optional[float] = None) -> float:
+        now = time.perf_counter() if now is None else now
+        recent = sum(1 for t in self._times if now - t <= RATE_WINDOW_S)
+        return recent / RATE_WINDOW_S
+
+
+def sparkline(counts: List[int]) -> str:
+    top = max(counts) if counts else 0
+    if not top:
+        return " " * len(counts)
+    return "".join(_BARS[0] if not c else _BARS[max(1, round(c / top * (len(_BARS) - 1)))] for c in counts)
+
+
+# -------- Registry --------
+class Metrics:
+    """
+    Named timing spans and counters, safe to use from any thread. A span
+    is either timed around a block (span(), timed()) or opened in one place
+    and closed in another (begin()/end(), e.g. setSource until the player
+    reports BufferedMedia). With a log path every sample is also appended
+    as one JSON line; lines are buffered and written in batches.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, log_path: Optional[str] = METRICS_LOG_PATH,
+                 window: int = METRICS_WINDOW):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.window = window
+        self.spans: Dict[str, SpanStats] = {}
+        self.counters: Dict[str, RateCounter] = {}
+        self._open: Dict[str, Tuple[str, float, dict]] = {}
+        self._log: List[str] = []
+        self._log_since = 0.0
+        self._logged_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # --- recording ---
+    def record(self, name: str, ms: float, **info):
+        if not self.enabled:
+            return
+        with self._lock:
+            st = self.spans.get(name)
+            if st is None:
+                st = self.spans[name] = SpanStats(name, self.window)
+            st.add(ms)
+            if self.log_path:
+                self._log_line(dict(info, span=name, ms=round(ms, 3)))
+
+    @contextmanager
+    def span(self, name: str, **info):
+        """Time the block. The yielded dict can take extra fields for the log."""
+        if not self.enabled:
+            yield info
+            return
+        t0 = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000.0, **info)
+
+    def timed(self, name: str):
+        """Decorator: time every call of the function as span `name`."""
+        def wrap(fn):
+            @wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, (time.perf_counter() - t0) * 1000.0)
+            return inner
+        return wrap
+
+    def begin(self, key: str, name: str, **info):
+        """Open span `name` under `key`, replacing whatever was open there."""
+        if self.enabled:
+            with self._lock:
+                self._open[key] = (name, time.perf_counter(), info)
+
+    def end(self, key: str, **info) -> Optional[float]:
+        """Close the span open under `key`; returns its ms, or None when nothing was open."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            opened = self._open.pop(key, None)
+        if opened is None:
+            return None
+        name, t0, first = opened
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.record(name, ms, **dict(first, **info))
+        return ms
+
+    def cancel(self, key: str):
+        with self._lock:
+            self._open.pop(key, None)
+
+    def hit(self, name: str):
+        """Count one occurrence (for things too frequent to time one by one)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            c = self.counters.get(name)
+            if c is None:
+                c = self.counters[name] = RateCounter(name)
+            c.hit(time.perf_counter())
+
+    # --- reading ---
+    def snapshot(self) -> dict:
+        now = time.perf_counter()
+        with self._lock:
+            return {"spans": {n: s.as_dict() for n, s in self.spans.items()},
+                    "counters": {n: {"count": c.count, "per_s": round(c.rate(now), 2)}
+                                 for n, c in self.counters.items()}}
+
+    def report(self) -> str:
+        """Plain-text table of every span and counter."""
+        snap = self.snapshot()
+        lines = [f"{'span':<22}{'n':>6}{'last':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  "
+                 f"ms: 1 … 4096+"]
+        for name in sorted(snap["spans"]):
+            s = snap["spans"][name]
+            lines.append(f"{name:<22}{s['count']:>6}{s['last_ms']:>9.1f}{s['p50_ms']:>9.1f}{s['p90_ms']:>9.1f}"
+                         f"{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}  {sparkline(s['buckets'])}")
+        if len(lines) == 1:
+            lines.append("(nothing timed yet)")
+        if snap["counters"]:
+            lines += ["", f"{'counter':<22}{'total':>10}{'per s':>9}"]
+            for name in sorted(snap["counters"]):
+                c = snap["counters"][name]
+                lines.append(f"{name:<22}{c['count']:>10}{c['per_s']:>9.1f}")
+        return "\n".join(lines)
+
+    # --- log ---
+    def _log_line(self, obj: dict):
+        # called with the lock held
+        obj["t"] = round(time.time(), 3)
+        if not self._log:
+            self._log_since = time.perf_counter()
+        self._log.append(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+        if len(self._log) >= LOG_FLUSH_LINES or time.perf_counter() - self._log_since >= LOG_FLUSH_S:
+            self._write_log()
+
+    def flush(self):
+        """Write buffered samples, plus counter totals that moved since the last flush."""
+        if not self.log_path:
+            return
+        with self._lock:
+            now = time.perf_counter()
+            for name, c in self.counters.items():
+                if self._logged_counts.get(name) != c.count:
+                    self._logged_counts[name] = c.count
+                    self._log.append(json.dumps({"counter": name, "count": c.count, "per_s": round(c.rate(now), 2),
+                                                 "t": round(time.time(), 3)}, separators=(",", ":")))
+            self._write_log()
+
+    def _write_log(self):
+        lines, self._log = self._log, []
+        if not lines:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            print("albix_metrics: cannot write", self.log_path, "-", e)
+            self.log_path = None
+
+
+# -------- Shared instance --------
+_metrics = Metrics()
+atexit.register(_metrics.flush)
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+def span(name: str, **info):
+    return _metrics.span(name, **info)
+
+def timed(name: str):
+    return _metrics.timed(name)
+
+def record(name: str, ms: float, **info):
+    _metrics.record(name, ms, **info)
+
+def begin(key: str, name: str, **info):
+    _metrics.begin(key, name, **info)
+
+def end(key: str, **info) -> Optional[float]:
+    return _metrics.end(key, **info)
+
+def cancel(key: str):
+    _metrics.cancel(key)
+
+def hit(name: str):
+    _metrics.hit(name)
+
+
+# -------- Dock --------
+class StatsDock(QtCore.QObject):
+    """
+    "Performance Stats" dock: the span table, refreshed every
+    STATS_REFRESH_MS while visible (nothing runs while it is hidden), plus
+    any sections added with add_section().
+    """
+
+    def __init__(self, main_window: QtWidgets.QMainWindow, metrics: Optional[Metrics] = None):
+        super().__init__(main_window)
+        self.win = main_window
+        self.metrics = metrics or _metrics
+        self._sections: List[Tuple[str, Callable[[], Optional[str]]]] = []
+
+        self.dock = QtWidgets.QDockWidget("Performance Stats", self.win)
+        self.dock.setObjectName("AlbixStatsDock")
+        self.dock.setAllowedAreas(DockArea.BottomDockWidgetArea | DockArea.RightDockWidgetArea
+                                  | DockArea.LeftDockWidgetArea)
+        self.view = QtWidgets.QPlainTextEdit(self.dock)
+        self.view.setReadOnly(True)
+        self.view.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap if USING_QT6
+                                  else QtWidgets.QPlainTextEdit.NoWrap)
+        font = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont if USING_QT6
+                                              else QtGui.QFontDatabase.FixedFont)
+        self.view.setFont(font)
+        self.dock.setWidget(self.view)
+        self.win.addDockWidget(DockArea.BottomDockWidgetArea, self.dock)
+        self.dock.hide()
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(STATS_REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.dock.visibilityChanged.connect(self._on_visibility)
+
+    def add_section(self, title: str, text: Callable[[], Optional[str]]):
+        """Extra lines under the table; `text()` returning None or "" hides the section."""
+        self._sections.append((title, text))
+
+    def is_visible(self) -> bool:
+        return self.dock.isVisible()
+
+    def show_panel(self):
+        self.dock.show()
+        self.refresh()
+
+    def hide_panel(self):
+        self.dock.hide()
+
+    def refresh(self):
+        parts = [self.metrics.report()]
+        for title, text in self._sections:
+            try:
+                body = text()
+            except Exception as e:
+                body = f"({e})"
+            if body:
+                parts.append(f"{title}\n{body}")
+        bar = self.view.verticalScrollBar()
+        keep = bar.value()
+        self.view.setPlainText("\n\n".join(parts))
+        bar.setValue(keep)
+
+    def _on_visibility(self, visible: bool):
+        if visible:
+            self._timer.start()
+        else:
+            self._timer.stop()
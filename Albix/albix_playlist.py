@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# albix_playlist.py — indexed playlist model for Albix (QListView backed, no per-item widgets)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys
+sys.dont_write_bytecode = True
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore
+    from PyQt6.QtCore import Qt, pyqtSignal
+    USING_QT6 = True
+except Exception:
+    from PyQt5 import QtCore
+    from PyQt5.QtCore import Qt, pyqtSignal
+    USING_QT6 = False
+
+if USING_QT6:
+    DisplayRole = Qt.ItemDataRole.DisplayRole
+    ToolTipRole = Qt.ItemDataRole.ToolTipRole
+    UserRole = Qt.ItemDataRole.UserRole
+    MoveAction = Qt.DropAction.MoveAction
+    ItemIsDragEnabled = Qt.ItemFlag.ItemIsDragEnabled
+    ItemIsDropEnabled = Qt.ItemFlag.ItemIsDropEnabled
+else:
+    DisplayRole = Qt.DisplayRole
+    ToolTipRole = Qt.ToolTipRole
+    UserRole = Qt.UserRole
+    MoveAction = Qt.MoveAction
+    ItemIsDragEnabled = Qt.ItemIsDragEnabled
+    ItemIsDropEnabled = Qt.ItemIsDropEnabled
+
+PathRole = int(UserRole) + 1
+TypeRole = int(UserRole) + 2
+ROWS_MIME = "application/x-albix-playlist-rows"   # internal drag: the dragged row numbers
+
+
+# -------- Model --------
+class PlaylistModel(QtCore.QAbstractListModel):
+    """
+    Playlist entries ({"path", "type"} dicts) exposed to a QListView.
+
+    A path -> row dict makes duplicate checks O(1). Removals and moves only
+    mark the rows after the edit as stale; they are renumbered lazily on the
+    next lookup that needs them, so bulk edits never rescan per item.
+
+    Multi-row edits (remove_rows, move_rows, insert_rows) are one pass over
+    the list with one ranged signal; rows scattered over the list are first
+    gathered with a single layout change. Rows dragged inside the view are
+    not moved here but handed out through dropRequested, so whoever tracks
+    the current row (PlaybackController) makes the move.
+
+    With a `namer` (paths -> {path: display name}), rows show that name
+    instead of the file name. Only rows that are actually painted are named,
+    batched once per event-loop pass, and each path is asked about once.
+    """
+
+    dropRequested = pyqtSignal(object, int)   # sorted rows, insert-before row (pre-move numbering)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None, library=None,
+                 namer: Optional[Callable[[List[str]], Dict[str, str]]] = None):
+        super().__init__(parent)
+        self.library = library  # albix_library.MediaLibrary, used for tooltips
+        self.namer = namer
+        self._entries: List[dict] = []  # live list; only ever mutated in place
+        self._rows: Dict[str, int] = {}
+        self._stale_from = 0            # rows >= this may have outdated numbers in _rows
+        self._names: Dict[str, str] = {}  # path -> display name ("" = use the file name)
+        self._unnamed: set = set()        # painted paths waiting for the next naming batch
+        self._name_timer = QtCore.QTimer(self)
+        self._name_timer.setSingleShot(True)
+        self._name_timer.setInterval(0)
+        self._name_timer.timeout.connect(self._name_pending)
+
+    # --- Qt model API ---
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if not (0 <= row < len(self._entries)):
+            return None
+        entry = self._entries[row]
+        if role == DisplayRole:
+            return entry.get("title") or self._display_name(entry["path"])
+        if role == ToolTipRole:
+            return self._tooltip(entry["path"])
+        if role == PathRole:
+            return entry["path"]
+        if role == TypeRole:
+            return entry["type"]
+        return None
+
+    def flags(self, index):
+        base = super().flags(index)
+        # rows can be dragged; drops land between rows, never onto one
+        return base | ItemIsDragEnabled if index.isValid() else base | ItemIsDropEnabled
+
+    def supportedDropActions(self):
+        return MoveAction
+
+    def mimeTypes(self) -> List[str]:
+        return [ROWS_MIME]
+
+    def mimeData(self, indexes):
+        data = QtCore.QMimeData()
+        rows = sorted({ix.row() for ix in indexes if ix.isValid()})
+        data.setData(ROWS_MIME, QtCore.QByteArray(",".join(map(str, rows)).encode()))
+        return data
+
+    def dropMimeData(self, data, action, row, column, parent) -> bool:
+        if action != MoveAction or not data.hasFormat(ROWS_MIME):
+            return False
+        try:
+            rows = [int(r) for r in bytes(data.data(ROWS_MIME)).decode().split(",") if r]
+        except ValueError:
+            return False
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self._entries)
+        self.dropRequested.emit(rows, row)
+        return True
+
+    # --- lookup ---
+    @property
+    def entries(self) -> List[dict]:
+        """The backing list. Callers may read it; edits must go through the model."""
+        return self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path) -> bool:
+        return path in self._rows
+
+    def entry(self, row: int) -> dict:
+        return self._entries[row]
+
+    def path(self, row: int) -> str:
+        return self._entries[row]["path"]
+
+    def row_of(self, path: str) -> int:
+        """Row of `path`, or -1. O(1) unless an earlier edit left the row stale."""
+        row = self._rows.get(path)
+        if row is None:
+            return -1
+        if row >= self._stale_from:
+            self._reindex()
+            row = self._rows[path]
+        return row
+
+    # --- edits ---
+    def add_entries(self, entries: Iterable[dict]) -> int:
+        """Append entries whose path is not already listed. Returns the number added."""
+        fresh = []
+        seen = set()
+        for it in entries:
+            p = it["path"]
+            if p in self._rows or p in seen:
+                continue
+            seen.add(p)
+            fresh.append(it)
+        if not fresh:
+            return 0
+        first = len(self._entries)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(fresh) - 1)
+        self._entries.extend(fresh)
+        for i, it in enumerate(fresh, first):
+            self._rows[it["path"]] = i
+        if self._stale_from == first:
+            self._stale_from = len(self._entries)
+        self.endInsertRows()
+        return len(fresh)
+
+    def add_entry(self, path: str, mtype: str) -> bool:
+        return self.add_entries(({"path": path, "type": mtype},)) == 1
+
+    def remove_row(self, row: int) -> Optional[dict]:
+        if not (0 <= row < len(self._entries)):
+            return None
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        it = self._entries.pop(row)
+        self._rows.pop(it["path"], None)
+        self._stale_from = min(self._stale_from, row)
+        self.endRemoveRows()
+        return it
+
+    def move_row(self, src: int, dst: int) -> bool:
+        """Move row `src` so that it ends up at index `dst`."""
+        n = len(self._entries)
+        if not (0 <= src < n and 0 <= dst < n) or src == dst:
+            return False
+        # Qt wants the destination expressed as "insert before" in pre-move numbering
+        qt_dst = dst + 1 if dst > src else dst
+        if not self.beginMoveRows(QtCore.QModelIndex(), src, src, QtCore.QModelIndex(), qt_dst):
+            return False
+        self._entries.insert(dst, self._entries.pop(src))
+        self._stale_from = min(self._stale_from, src, dst)
+        self.endMoveRows()
+        return True
+
+    def remove_rows(self, rows: Iterable[int]) -> List[Tuple[int, dict]]:
+        """
+        Remove many rows at once. Returns the (row, entry) pairs removed, in row
+        order, which insert_rows() puts back where they were.
+        """
+        n = len(self._entries)
+        rows = sorted({r for r in rows if 0 <= r < n})
+        if not rows:
+            return []
+        k = len(rows)
+        first = rows[0]
+        if rows[-1] - first + 1 != k:
+            self._relocate(rows, range(n - k, n))
+            first = n - k
+        self.beginRemoveRows(QtCore.QModelIndex(), first, first + k - 1)
+        taken = self._entries[first:first + k]
+        del self._entries[first:first + k]
+        for it in taken:
+            self._rows.pop(it["path"], None)
+        self._stale_from = min(self._stale_from, rows[0])
+        self.endRemoveRows()
+        return list(zip(rows, taken))
+
+    def insert_rows(self, items: Iterable[Tuple[int, dict]]) -> List[int]:
+        """
+        Insert entries so each ends up at its given row (the reverse of
+        remove_rows). Paths already listed are skipped; returns the rows used.
+        """
+        fresh, seen = [], set()
+        for row, it in sorted(items, key=lambda x: x[0]):
+            if it["path"] not in self._rows and it["path"] not in seen:
+                seen.add(it["path"])
+                fresh.append((row, it))
+        if not fresh:
+            return []
+        first = len(self._entries)
+        self.add_entries(it for _, it in fresh)
+        n, k = len(self._entries), len(fresh)
+        # strictly increasing and inside the list, even when rows were skipped or the list shrank
+        dst = [min(max(row, 0), n - k + i) for i, (row, _) in enumerate(fresh)]
+        for i in range(1, k):
+            dst[i] = max(dst[i], dst[i - 1] + 1)
+        self.relocate_rows(range(first, n), dst)
+        return dst
+
+    def move_rows(self, rows: Iterable[int], before: int) -> List[int]:
+        """
+        Move rows, keeping their order, so they sit together in front of row
+        `before` (counted before the move; len() means the end). Returns the
+        rows they end up at, or [] when nothing moved.
+        """
+        n = len(self._entries)
+        rows = sorted({r for r in rows if 0 <= r < n})
+        if not rows:
+            return []
+        before = min(max(before, 0), n)
+        start = before - bisect_left(rows, before)
+        dst = list(range(start, start + len(rows)))
+        return dst if self.relocate_rows(rows, dst) else []
+
+    def relocate_rows(self, src: Sequence[int], dst: Sequence[int]) -> bool:
+        """
+        Move the rows at `src` to the rows `dst` (both ascending, same length);
+        all other rows keep their order around them. False when nothing moved.
+        """
+        src, dst = list(src), list(dst)
+        n = len(self._entries)
+        if len(src) != len(dst) or not src or src == dst:
+            return False
+        if not all(0 <= r < n for r in src) or not all(0 <= r < n for r in dst):
+            return False
+        k = len(src)
+        if src[-1] - src[0] + 1 == k and dst[-1] - dst[0] + 1 == k:
+            # one block: a ranged move (Qt wants the destination in pre-move numbering)
+            qt_dst = dst[0] + k if dst[0] > src[0] else dst[0]
+            if not self.beginMoveRows(QtCore.QModelIndex(), src[0], src[-1], QtCore.QModelIndex(), qt_dst):
+                return False
+            block = self._entries[src[0]:src[-1] + 1]
+            del self._entries[src[0]:src[-1] + 1]
+            self._entries[dst[0]:dst[0]] = block
+            self._stale_from = min(self._stale_from, src[0], dst[0])
+            self.endMoveRows()
+            return True
+        self._relocate(src, dst)
+        return True
+
+    def set_entries(self, entries: Iterable[dict]):
+        """Replace the whole playlist (duplicates dropped, first occurrence wins)."""
+        self.beginResetModel()
+        self._entries.clear()
+        self._rows.clear()
+        for it in entries:
+            p = it["path"]
+            if p in self._rows:
+                continue
+            self._rows[p] = len(self._entries)
+            self._entries.append(it)
+        self._stale_from = len(self._entries)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_entries(())
+
+    def refresh_names(self):
+        """Forget display names (e.g. after a library scan) so visible rows are named again."""
+        self._names.clear()
+        self._unnamed.clear()
+        if self._entries:
+            self.dataChanged.emit(self.index(0), self.index(len(self._entries) - 1), [DisplayRole])
+
+    # --- internals ---
+    def _display_name(self, path: str) -> str:
+        name = self._names.get(path)
+        if name:
+            return name
+        if name is None and self.namer is not None:
+            self._unnamed.add(path)
+            self._name_timer.start()
+        return os.path.basename(path)
+
+    def _name_pending(self):
+        paths, self._unnamed = list(self._unnamed), set()
+        try:
+            names = self.namer(paths)
+        except Exception as e:
+            print("albix_playlist: naming failed -", e)
+            names = {}
+        rows = []
+        for p in paths:
+            self._names[p] = names.get(p, "")
+            if self._names[p]:
+                row = self.row_of(p)
+                if row >= 0:
+                    rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), [DisplayRole])
+
+    def _tooltip(self, path: str) -> str:
+        info = self.library.get(path) if self.library is not None else None
+        if info is None:
+            return path
+        lines = []
+        at = " — ".join(x for x in (info.artist, info.title) if x)
+        if at:
+            lines.append(at)
+        if info.album:
+            lines.append(info.album)
+        if info.duration:
+            s = int(info.duration)
+            lines.append(f"{s // 60:02}:{s % 60:02}")
+        lines.append(path)
+        return "\n".join(lines)
+
+    def _relocate(self, src: Sequence[int], dst: Sequence[int]):
+        """Permute rows in one pass, as one layout change that carries persistent indexes along."""
+        entries = self._entries
+        n, k = len(entries), len(src)
+        moving = set(src)
+        rest = iter([i for i in range(n) if i not in moving])
+        order = [0] * n               # new row -> old row
+        j = 0
+        for pos in range(n):
+            if j < k and dst[j] == pos:
+                order[pos] = src[j]
+                j += 1
+            else:
+                order[pos] = next(rest)
+        self.layoutAboutToBeChanged.emit()
+        entries[:] = [entries[i] for i in order]
+        new_row = [0] * n
+        for pos, old in enumerate(order):
+            new_row[old] = pos
+        before = self.persistentIndexList()
+        if before:
+            self.changePersistentIndexList(before, [self.index(new_row[ix.row()]) for ix in before])
+        self._stale_from = min(self._stale_from, src[0], dst[0])
+        self.layoutChanged.emit()
+
+    def _reindex(self):
+        rows = self._rows
+        entries = self._entries
+        for i in range(self._stale_from, len(entries)):
+            rows[entries[i]["path"]] = i
+        self._stale_from = len(entries)
+
+
+# -------- Filter result view --------
+class FilteredPlaylistModel(QtCore.QAbstractListModel):
+    """
+    Read-only window onto selected rows of a PlaylistModel (a search result).
+    Rows are kept in source order, so mapping back and forth is a list lookup
+    or a bisect; nothing is asked of the source per row except for painting.
+    """
+
+    def __init__(self, source: PlaylistModel, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._source = source
+        self._rows: List[int] = []
+        source.dataChanged.connect(self._on_source_changed)
+
+    def set_rows(self, rows: Iterable[int]):
+        self.beginResetModel()
+        self._rows = sorted(rows)
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        return self._source.data(self._source.index(self._rows[index.row()]), role)
+
+    def _on_source_changed(self, top, bottom, roles=()):
+        lo = bisect_left(self._rows, top.row())
+        hi = bisect_left(self._rows, bottom.row() + 1) - 1
+        if lo <= hi:
+            self.dataChanged.emit(self.index(lo), self.index(hi), list(roles))
+
+    def source_row(self, row: int) -> int:
+        return self._rows[row] if 0 <= row < len(self._rows) else -1
+
+    def row_for_source(self, source_row: int) -> int:
+        i = bisect_left(self._rows, source_row)
+        return i if i < len(self._rows) and self._rows[i] == source_row else -1
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# albix_playlist_io.py — streaming playlist files for Albix (JSON Lines, legacy JSON, M3U/M3U8, PLS, XSPF)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, re, sys, json, tempfile
+sys.dont_write_bytecode = True
+from typing import Dict, Iterable, Iterator, Optional
+from urllib.parse import unquote, urlparse
+from urllib.request import pathname2url
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as _xml_escape
+
+PLAYLIST_FORMAT_VERSION = 1
+READ_CHUNK_SIZE = 64 * 1024
+
+# Native format (JSON Lines): one header line, then one compact JSON object per entry.
+#   {"albix_playlist": 1}
+#   {"path": "/music/a.mp3", "type": "audio"}
+#
+# Entries read from M3U/PLS/XSPF may also carry "title" and "duration" (seconds).
+# Stream URLs come back with type "radio" and the URL as "path".
+M3U_EXTENSIONS = {".m3u", ".m3u8"}
+PLS_EXTENSIONS = {".pls"}
+XSPF_EXTENSIONS = {".xspf"}
+
+_URL_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://")
+_EXTINF_RE = re.compile(r"^#EXTINF:\s*(-?\d+(?:\.\d+)?)?[^,]*,(.*)$", re.I)
+_PLS_KEY_RE = re.compile(r"^(File|Title|Length)(\d+)$", re.I)
+
+
+class PlaylistFormatError(ValueError):
+    pass
+
+
+# -------- Reading --------
+def _valid_entry(obj) -> Optional[dict]:
+    if not isinstance(obj, dict):
+        return None
+    path, mtype = obj.get("path"), obj.get("type")
+    if not isinstance(path, str) or not path or not isinstance(mtype, str):
+        return None
+    return obj
+
+def _iter_jsonl(f, stats: dict) -> Iterator[dict]:
+    for lineno, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            stats["skipped"] += 1
+            continue
+        if lineno == 1 and isinstance(obj, dict) and "albix_playlist" in obj:
+            continue
+        entry = _valid_entry(obj)
+        if entry is None:
+            stats["skipped"] += 1
+            continue
+        yield entry
+
+def _iter_json_array(f, stats: dict) -> Iterator[dict]:
+    """Incremental reader for the legacy `[{"path": ..., "type": ...}, ...]` files."""
+    dec = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        more = f.read(READ_CHUNK_SIZE)
+        if not more:
+            eof = True
+        buf = buf[pos:] + more
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    skip_ws()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise PlaylistFormatError("The selected JSON does not contain a valid playlist.")
+    pos += 1
+    need_comma = False
+    while True:
+        skip_ws()
+        if pos >= len(buf):
+            raise PlaylistFormatError("Unexpected end of playlist file.")
+        if buf[pos] == "]":
+            return
+        if need_comma:
+            if buf[pos] != ",":
+                raise PlaylistFormatError("Malformed playlist: expected ',' between entries.")
+            pos += 1
+            need_comma = False
+            continue
+        try:
+            obj, end = dec.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                raise PlaylistFormatError("Malformed playlist entry.")
+            fill()  # entry straddles the chunk boundary
+            continue
+        pos = end
+        need_comma = True
+        entry = _valid_entry(obj)
+        if entry is None:
+            stats["skipped"] += 1
+            continue
+        yield entry
+
+# -------- Reading: M3U / PLS / XSPF --------
+def _decode_line(raw: bytes) -> str:
+    # M3U8 is UTF-8; plain M3U from older tools is often Latin-1
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+def _resolve_location(loc: str, base_dir: str, ext_types: Optional[Dict[str, str]], stats: dict,
+                      title: Optional[str] = None, duration: Optional[float] = None) -> Optional[dict]:
+    """Turn a playlist location into an entry: streams become radio, local paths are made absolute."""
+    loc = loc.strip().lstrip("\ufeff")
+    if not loc:
+        return None
+    if _URL_RE.match(loc) and not loc.lower().startswith("file:"):
+        entry = {"path": loc, "type": "radio"}
+    else:
+        if loc.lower().startswith("file:"):
+            loc = unquote(urlparse(loc).path)
+        elif os.sep == "/" and "\\" in loc and "/" not in loc:
+            loc = loc.replace("\\", "/")  # written on Windows
+        path = os.path.normpath(os.path.join(base_dir, os.path.expanduser(loc)))
+        mtype = "audio"
+        if ext_types is not None:
+            mtype = ext_types.get(os.path.splitext(path)[1].lower())
+            if not mtype:
+                stats["skipped"] += 1
+                return None
+        entry = {"path": path, "type": mtype}
+        # a title that is just the file name says nothing; the playlist names the row better
+        if title and title.strip() == os.path.splitext(os.path.basename(path))[0]:
+            title = None
+    if title:
+        entry["title"] = title
+    if duration is not None and duration > 0:
+        entry["duration"] = duration
+    return entry
+
+def _iter_m3u(path: str, stats: dict, ext_types) -> Iterator[dict]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    title = duration = None
+    with open(path, "rb") as f:
+        for raw in f:
+            line = _decode_line(raw).strip().lstrip("\ufeff")
+            if not line:
+                continue
+            if line.startswith("#"):
+                m = _EXTINF_RE.match(line)
+                if m:
+                    duration = float(m.group(1)) if m.group(1) else None
+                    title = m.group(2).strip() or None
+                continue
+            entry = _resolve_location(line, base_dir, ext_types, stats, title, duration)
+            title = duration = None
+            if entry is not None:
+                yield entry
+
+def _iter_pls(path: str, stats: dict, ext_types) -> Iterator[dict]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    pending: Dict[int, dict] = {}
+
+    def flush(below: Optional[int]):
+        for n in sorted(k for k in pending if below is None or k < below):
+            fields = pending.pop(n)
+            if "file" not in fields:
+                stats["skipped"] += 1
+                continue
+            try:
+                length = float(fields.get("length", "")) if fields.get("length") else None
+            except ValueError:
+                length = None
+            entry = _resolve_location(fields["file"], base_dir, ext_types, stats, fields.get("title"), length)
+            if entry is not None:
+                yield entry
+
+    with open(path, "rb") as f:
+        for raw in f:
+            line = _decode_line(raw).strip()
+            if not line or line.startswith(("[", ";", "#")) or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            m = _PLS_KEY_RE.match(key.strip())
+            if not m:
+                continue
+            n = int(m.group(2))
+            # Entries are normally grouped by number: once N+1 shows up, N is complete
+            yield from flush(n)
+            pending.setdefault(n, {})[m.group(1).lower()] = value.strip()
+    yield from flush(None)
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def _iter_xspf(path: str, stats: dict, ext_types) -> Iterator[dict]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    try:
+        for _event, elem in ElementTree.iterparse(path, events=("end",)):
+            if _local(elem.tag) != "track":
+                continue
+            loc = title = None
+            duration = None
+            for child in elem:
+                name = _local(child.tag)
+                text = (child.text or "").strip()
+                if name == "location" and loc is None:
+                    loc = text
+                elif name == "title":
+                    title = text or None
+                elif name == "duration" and text:
+                    try:
+                        duration = int(text) / 1000.0
+                    except ValueError:
+                        pass
+            elem.clear()  # keep memory flat on huge files
+            if not loc:
+                stats["skipped"] += 1
+                continue
+            entry = _resolve_location(loc, base_dir, ext_types, stats, title, duration)
+            if entry is not None:
+                yield entry
+    except ElementTree.ParseError as e:
+        raise PlaylistFormatError(f"Malformed XSPF playlist: {e}")
+
+def iter_playlist(path: str, stats: Optional[dict] = None,
+                  ext_types: Optional[Dict[str, str]] = None) -> Iterator[dict]:
+    """
+    Yield playlist entries from `path` without loading the whole file.
+    Accepts the JSON Lines format, the older JSON list, M3U/M3U8, PLS and
+    XSPF. Malformed entries are skipped and counted in `stats["skipped"]`.
+    For the foreign formats, `ext_types` (".mp3" -> "audio") decides the type
+    of local files; files with other extensions are skipped.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("skipped", 0)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in M3U_EXTENSIONS:
+        yield from _iter_m3u(path, stats, ext_types)
+        return
+    if ext in PLS_EXTENSIONS:
+        yield from _iter_pls(path, stats, ext_types)
+        return
+    if ext in XSPF_EXTENSIONS:
+        yield from _iter_xspf(path, stats, ext_types)
+        return
+    with open(path, "r", encoding="utf-8-sig") as f:
+        first = ""
+        while not first:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            first = chunk.lstrip()[:1]
+        f.seek(0)
+        if first == "[":
+            yield from _iter_json_array(f, stats)
+        elif first == "{":
+            yield from _iter_jsonl(f, stats)
+        elif first == "":
+            return
+        else:
+            raise PlaylistFormatError("The selected file does not contain a valid playlist.")
+
+
+# -------- Writing --------
+def _atomic_write(path: str, write_body):
+    """Write through a temp file in the target directory, then rename over `path`."""
+    target_dir = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".albix-", suffix=".tmp", dir=target_dir)
+    try:
+        # mkstemp creates 0600; keep the mode a plain open() would have given
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp, mode)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+            write_body(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def _compact(entry: dict) -> str:
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+def _entry_title(entry: dict) -> str:
+    """The entry's own title, or "" (a file name is not written as one)."""
+    return str(entry.get("title") or "").replace("\n", " ")
+
+def _entry_location(entry: dict, uri: bool = False) -> str:
+    p = entry["path"]
+    if entry.get("type") == "radio" or _URL_RE.match(p) or not uri:
+        return p
+    return "file://" + pathname2url(os.path.abspath(p))
+
+def _entry_seconds(entry: dict) -> int:
+    try:
+        return int(round(float(entry.get("duration") or -1)))
+    except (TypeError, ValueError):
+        return -1
+
+def _write_m3u(f, entries: Iterable[dict]) -> int:
+    count = 0
+    f.write("#EXTM3U\n")
+    for entry in entries:
+        title, secs = _entry_title(entry), _entry_seconds(entry)
+        if title or secs >= 0:
+            f.write(f"#EXTINF:{secs},{title}\n")
+        f.write(f"{_entry_location(entry)}\n")
+        count += 1
+    return count
+
+def _write_pls(f, entries: Iterable[dict]) -> int:
+    count = 0
+    f.write("[playlist]\n")
+    for entry in entries:
+        count += 1
+        f.write(f"File{count}={_entry_location(entry)}\n")
+        title = _entry_title(entry)
+        if title:
+            f.write(f"Title{count}={title}\n")
+        f.write(f"Length{count}={_entry_seconds(entry)}\n")
+    # Counted on the way, so the total goes last (as Winamp writes it too)
+    f.write(f"NumberOfEntries={count}\nVersion=2\n")
+    return count
+
+def _write_xspf(f, entries: Iterable[dict]) -> int:
+    count = 0
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<playlist version="1" xmlns="http://xspf.org/ns/0/">\n  <trackList>\n')
+    for entry in entries:
+        f.write("    <track>")
+        f.write(f"<location>{_xml_escape(_entry_location(entry, uri=True))}</location>")
+        title = _entry_title(entry)
+        if title:
+            f.write(f"<title>{_xml_escape(title)}</title>")
+        secs = entry.get("duration")
+        if secs:
+            try:
+                f.write(f"<duration>{int(float(secs) * 1000)}</duration>")
+            except (TypeError, ValueError):
+                pass
+        f.write("</track>\n")
+        count += 1
+    f.write("  </trackList>\n</playlist>\n")
+    return count
+
+def write_playlist(path: str, entries: Iterable[dict]) -> int:
+    """
+    Save `entries` atomically; the format follows the extension.
+    `.json` keeps the legacy JSON list layout so older Albix versions can
+    read it; `.m3u`/`.m3u8`, `.pls` and `.xspf` write those formats; anything
+    else gets JSON Lines. Returns the number of entries written.
+    """
+    count = 0
+    ext = os.path.splitext(path)[1].lower()
+    legacy = ext == ".json"
+
+    def body(f):
+        nonlocal count
+        if ext in M3U_EXTENSIONS:
+            count = _write_m3u(f, entries)
+        elif ext in PLS_EXTENSIONS:
+            count = _write_pls(f, entries)
+        elif ext in XSPF_EXTENSIONS:
+            count = _write_xspf(f, entries)
+        elif legacy:
+            f.write("[")
+            for entry in entries:
+                f.write(",\n" if count else "\n")
+                f.write(_compact(entry))
+                count += 1
+            f.write("\n]\n")
+        else:
+            f.write(_compact({"albix_playlist": PLAYLIST_FORMAT_VERSION}) + "\n")
+            for entry in entries:
+                f.write(_compact(entry))
+                f.write("\n")
+                count += 1
+
+    _atomic_write(path, body)
+    return count
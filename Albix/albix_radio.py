@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+# albix_radio.py — radio stream helpers for Albix: station health probing, ICY now-playing, reconnects
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import re, sys, ssl, time, asyncio, threading
+sys.dont_write_bytecode = True
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore
+    from PyQt6.QtCore import pyqtSignal
+    USING_QT6 = True
+except Exception:
+    from PyQt5 import QtCore
+    from PyQt5.QtCore import pyqtSignal
+    USING_QT6 = False
+
+PROBE_CONNECT_TIMEOUT = 3.0   # s, TCP (+TLS) connect
+PROBE_TIMEOUT = 6.0           # s, whole probe: connect, redirects, headers, first audio byte
+PROBE_CONCURRENCY = 16        # stations probed at once
+PROBE_MAX_REDIRECTS = 3
+HEADER_LIMIT = 64 * 1024
+USER_AGENT = "Albix/6.0"
+ICY_SKIP_CHUNK = 16 * 1024     # audio bytes read (and dropped) per call while skipping to the next metadata block
+ICY_RETRY_DELAY = 10.0         # s before the now-playing reader reconnects after the stream dropped
+ICY_READ_TIMEOUT = 30.0        # s without any data before the reader gives up on a connection
+RECONNECT_DELAY_MS = 1000      # wait after every URL of a station failed; doubles per round
+RECONNECT_MAX_DELAY_MS = 30000
+RECONNECT_ROUNDS = 10          # rounds of failed attempts before giving up (0 = keep trying)
+RECONNECT_STABLE_MS = 10000    # playing this long means the next drop starts a fresh round
+STALL_TIMEOUT_MS = 8000        # buffering this long is treated as a dropped stream
+AUDIO_TIMEOUT_MS = 15000       # connected but no audio this long is a failed attempt
+STREAM_HISTORY = 50            # reconnect timings kept per station
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+
+
+class StreamError(Exception):
+    """A station could not be opened as an audio stream."""
+
+
+# -------- Stream opening --------
+async def open_stream(url: str, connect_timeout: float = PROBE_CONNECT_TIMEOUT,
+                      icy_metadata: bool = False, max_redirects: int = PROBE_MAX_REDIRECTS):
+    """
+    Open an HTTP(S)/Icecast/SHOUTcast stream and read the response headers.
+    Returns (reader, writer, status, headers, connect_ms); `headers` keys are
+    lower-case. Redirects are followed. HTTP/1.0 is used, so the body is the
+    raw stream (never chunked). Raises StreamError or asyncio.TimeoutError.
+    """
+    connect_ms = 0.0
+    for _ in range(max_redirects + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise StreamError(f"unsupported URL: {url}")
+        tls = parts.scheme == "https"
+        port = parts.port or (443 if tls else 80)
+        t = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(parts.hostname, port, ssl=ssl.create_default_context() if tls else None,
+                                        limit=HEADER_LIMIT),
+                connect_timeout)
+        except asyncio.TimeoutError:
+            raise StreamError(f"connect timed out after {connect_timeout:g} s")
+        except OSError as e:
+            raise StreamError(f"connect failed: {e.strerror or e}")
+        connect_ms += (time.perf_counter() - t) * 1000.0
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        writer.write((f"GET {target} HTTP/1.0\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\n"
+                      f"Accept: */*\r\nIcy-MetaData: {int(icy_metadata)}\r\nConnection: close\r\n\r\n").encode("latin-1"))
+        try:
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            writer.close()
+            raise StreamError("connection closed before the response headers")
+        except (OSError, asyncio.LimitOverrunError) as e:
+            writer.close()
+            raise StreamError(f"no response headers: {e}")
+        status, headers = _parse_head(head)
+        if status in _REDIRECTS and "location" in headers:
+            writer.close()
+            url = urljoin(url, headers["location"])
+            continue
+        return reader, writer, status, headers, connect_ms
+    raise StreamError("too many redirects")
+
+def _parse_head(head: bytes) -> Tuple[int, Dict[str, str]]:
+    lines = head.decode("latin-1").split("\r\n")
+    # "HTTP/1.1 200 OK" or SHOUTcast v1's "ICY 200 OK"
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise StreamError(f"bad status line: {lines[0][:80]!r}")
+    headers = {}
+    for line in lines[1:]:
+        k, sep, v = line.partition(":")
+        if sep:
+            headers[k.strip().lower()] = v.strip()
+    return status, headers
+
+def _is_audio(content_type: str) -> bool:
+    ct = content_type.split(";")[0].strip().lower()
+    # no content type is common with SHOUTcast; an HTML page means the URL is a website, not a stream
+    return not ct or not (ct.startswith("text/") or ct in ("application/json", "application/xml"))
+
+
+# -------- Probing --------
+@dataclass
+class ProbeResult:
+    name: str
+    url: str
+    ok: bool
+    status: int = 0
+    connect_ms: float = 0.0
+    first_byte_ms: float = 0.0    # probe start -> first audio byte (includes connect and redirects)
+    content_type: str = ""
+    error: str = ""
+    checked: float = 0.0          # time.time() of the probe
+
+    def summary(self) -> str:
+        if not self.ok:
+            return f"Dead: {self.error}"
+        return f"Connect {self.connect_ms:.0f} ms · first audio {self.first_byte_ms:.0f} ms"
+
+async def probe_station(name: str, url: str, timeout: float = PROBE_TIMEOUT,
+                        connect_timeout: float = PROBE_CONNECT_TIMEOUT) -> ProbeResult:
+    """Open the stream, wait for its first audio byte, hang up."""
+    res = ProbeResult(name, url, False, checked=time.time())
+    t0 = time.perf_counter()
+    writer = None
+
+    async def run():
+        nonlocal writer
+        reader, writer, res.status, headers, res.connect_ms = await open_stream(url, connect_timeout)
+        res.content_type = headers.get("content-type", "")
+        if not 200 <= res.status < 300:
+            raise StreamError(f"HTTP {res.status}")
+        if not _is_audio(res.content_type):
+            raise StreamError(f"not an audio stream ({res.content_type})")
+        if not await reader.read(1):
+            raise StreamError("stream closed before any audio")
+        res.first_byte_ms = (time.perf_counter() - t0) * 1000.0
+        res.ok = True
+
+    try:
+        await asyncio.wait_for(run(), timeout)
+    except asyncio.TimeoutError:
+        res.error = f"no audio within {timeout:g} s"
+    except StreamError as e:
+        res.error = str(e)
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+    finally:
+        if writer is not None:
+            writer.close()
+    return res
+
+async def probe_stations(stations: Iterable[Tuple[str, str]], concurrency: int = PROBE_CONCURRENCY,
+                         timeout: float = PROBE_TIMEOUT, connect_timeout: float = PROBE_CONNECT_TIMEOUT,
+                         on_result=None) -> List[ProbeResult]:
+    """Probe (name, url) pairs, at most `concurrency` at a time. Returns them ranked (see rank())."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(name, url):
+        async with sem:
+            res = await probe_station(name, url, timeout, connect_timeout)
+        if on_result is not None:
+            on_result(res)
+        return res
+
+    return rank(await asyncio.gather(*(one(n, u) for n, u in stations)))
+
+def rank(results: Iterable[ProbeResult]) -> List[ProbeResult]:
+    """Live stations by time to first audio byte, then dead ones by name."""
+    return sorted(results, key=lambda r: (not r.ok, r.first_byte_ms if r.ok else 0.0, r.name.casefold()))
+
+def probe_all(stations: Dict[str, str], **kwargs) -> List[ProbeResult]:
+    """Blocking probe_stations() for scripts and tests."""
+    return asyncio.run(probe_stations(stations.items(), **kwargs))
+
+
+# -------- ICY now-playing --------
+_STREAM_TITLE_RE = re.compile(rb"StreamTitle='(.*?)';", re.S)
+
+def parse_stream_title(meta: bytes) -> Optional[str]:
+    """StreamTitle out of an ICY metadata block ("StreamTitle='A - T';StreamUrl='';\0\0"), or None."""
+    m = _STREAM_TITLE_RE.search(meta.rstrip(b"\0"))
+    if m is None:
+        return None
+    raw = m.group(1)
+    try:
+        return raw.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        return raw.decode("latin-1").strip()   # older SHOUTcast servers
+
+def split_stream_title(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """"Artist - Title" -> (artist, title); (None, None) when it is not in that form."""
+    artist, sep, title = text.partition(" - ")
+    artist, title = artist.strip(), title.strip()
+    if not sep or not artist or not title:
+        return None, None
+    return artist, title
+
+async def read_stream_titles(url: str, on_title, connect_timeout: float = PROBE_CONNECT_TIMEOUT,
+                             read_timeout: float = ICY_READ_TIMEOUT) -> bool:
+    """
+    Follow the ICY metadata of one connection to `url`, calling
+    on_title(text) whenever StreamTitle changes. Audio between metadata
+    blocks is read ICY_SKIP_CHUNK bytes at a time and dropped, so memory
+    stays flat. Returns False at once when the server sends no metadata,
+    True when the stream ended; StreamError / asyncio.TimeoutError otherwise.
+    """
+    reader, writer, status, headers, _ = await open_stream(url, connect_timeout, icy_metadata=True)
+    try:
+        if not 200 <= status < 300:
+            raise StreamError(f"HTTP {status}")
+        try:
+            metaint = int(headers.get("icy-metaint", "0"))
+        except ValueError:
+            metaint = 0
+        if metaint <= 0:
+            return False
+        last = None
+        while True:
+            left = metaint
+            while left:
+                chunk = await asyncio.wait_for(reader.read(min(left, ICY_SKIP_CHUNK)), read_timeout)
+                if not chunk:
+                    return True
+                left -= len(chunk)
+            size = (await asyncio.wait_for(reader.readexactly(1), read_timeout))[0] * 16
+            if not size:
+                continue                        # unchanged since the last block
+            text = parse_stream_title(await asyncio.wait_for(reader.readexactly(size), read_timeout))
+            if text is not None and text != last:
+                last = text
+                on_title(text)
+    except asyncio.IncompleteReadError:
+        return True
+    finally:
+        writer.close()
+
+
+# -------- Qt side --------
+class StationProber(QtCore.QObject):
+    """
+    Runs probe_stations() on an event loop in a background thread. Signals
+    arrive on the GUI thread: probed() per station as it completes,
+    finished() once with the ranked list.
+    """
+
+    probed = pyqtSignal(object)     # ProbeResult
+    finished = pyqtSignal(object)   # List[ProbeResult], ranked
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._thread: Optional[threading.Thread] = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, stations: Dict[str, str], **kwargs) -> bool:
+        if self.is_running() or not stations:
+            return False
+        pairs = list(stations.items())
+
+        def run():
+            try:
+                results = asyncio.run(probe_stations(pairs, on_result=self.probed.emit, **kwargs))
+            except Exception as e:
+                print("albix_radio: probe failed -", e)
+                results = []
+            self.finished.emit(results)
+
+        self._thread = threading.Thread(target=run, name="albix-radio-probe", daemon=True)
+        self._thread.start()
+        return True
+
+
+class StreamTitleReader(QtCore.QObject):
+    """
+    Side channel for the station that is playing: a second, metadata-only
+    connection (the player never shows ICY data) on an event loop in a
+    background thread. titleChanged(station, text) arrives on the GUI
+    thread. Reconnects every ICY_RETRY_DELAY s while the station plays;
+    stops for good when the server has no metadata.
+    """
+
+    titleChanged = pyqtSignal(str, str)   # station name, StreamTitle
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None, retry_delay: float = ICY_RETRY_DELAY):
+        super().__init__(parent)
+        self.retry_delay = retry_delay
+        self._gen = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def start(self, station: str, url: str):
+        """Follow `url` instead of whatever was followed before."""
+        self.stop()
+        gen = self._gen
+        emit = lambda text: gen == self._gen and self.titleChanged.emit(station, text)
+
+        async def follow():
+            while gen == self._gen:
+                try:
+                    if not await read_stream_titles(url, emit):
+                        return
+                except (StreamError, asyncio.TimeoutError, OSError) as e:
+                    print("albix_radio: now-playing", station, "-", e)
+                await asyncio.sleep(self.retry_delay)
+
+        def run():
+            loop = asyncio.new_event_loop()
+            with self._lock:
+                if gen != self._gen:
+                    loop.close()
+                    return
+                self._loop, self._task = loop, loop.create_task(follow())
+            try:
+                loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                with self._lock:
+                    if self._loop is loop:
+                        self._loop = self._task = None
+                loop.close()
+
+        threading.Thread(target=run, name="albix-radio-icy", daemon=True).start()
+
+    def stop(self):
+        """Drop the current connection; titles still in flight are ignored."""
+        with self._lock:
+            self._gen += 1
+            if self._loop is not None and self._task is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+
+
+# -------- Reconnects --------
+@dataclass
+class StreamStats:
+    """Per-station streaming figures, kept for the whole run."""
+    station: str
+    connects: int = 0
+    reconnects: int = 0              # attempts after the stream had played and dropped
+    failovers: int = 0               # switches to another URL of the station
+    rebuffers: int = 0               # stalls while playing
+    stall_ms: float = 0.0            # total time spent stalled
+    max_stall_ms: float = 0.0
+    first_audio_ms: float = 0.0      # station picked -> audio, last time it was picked
+    reconnect_audio_ms: List[float] = field(default_factory=list)   # recent drop -> audio again times
+
+    def add_stall(self, ms: float):
+        self.stall_ms += ms
+        self.max_stall_ms = max(self.max_stall_ms, ms)
+
+    def add_reconnect(self, ms: float):
+        self.reconnect_audio_ms.append(ms)
+        if len(self.reconnect_audio_ms) > STREAM_HISTORY:
+            del self.reconnect_audio_ms[0]
+
+    def summary(self) -> str:
+        text = (f"{self.station}: audio after {self.first_audio_ms:.0f} ms · {self.rebuffers} rebuffers "
+                f"({self.stall_ms / 1000.0:.1f} s stalled, longest {self.max_stall_ms / 1000.0:.1f} s)")
+        if self.reconnects:
+            recent = self.reconnect_audio_ms
+            mean = sum(recent) / len(recent) if recent else 0.0
+            text += f" · {self.reconnects} reconnects, audio again after {mean:.0f} ms on average"
+        if self.failovers:
+            text += f" · {self.failovers} failovers"
+        return text
+
+
+class StreamSupervisor(QtCore.QObject):
+    """
+    Keeps a radio station playing through network trouble. It owns no
+    player: whoever plays the stream reports audio(), stalled() and
+    dropped(), and loads the URL asked for by connectRequested.
+
+    A drop after a while of steady playback reconnects at once. Failed
+    attempts move on to the station's next URL (failover); once every URL
+    failed, the next round waits RECONNECT_DELAY_MS, doubling up to
+    RECONNECT_MAX_DELAY_MS, and after RECONNECT_ROUNDS rounds it gives up
+    with failed(). Progress is reported through status(), never a dialog.
+
+    A player usually reports one failure twice (QMediaPlayer: InvalidMedia
+    and errorOccurred). Drops are acted on in the next event-loop pass, and
+    further reports until then are the same failure, so they are ignored.
+    """
+
+    connectRequested = pyqtSignal(str)   # URL to (re)load now
+    status = pyqtSignal(str)             # short status text
+    failed = pyqtSignal(str)             # gave up; the reason
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None, delay_ms: int = RECONNECT_DELAY_MS,
+                 max_delay_ms: int = RECONNECT_MAX_DELAY_MS, rounds: int = RECONNECT_ROUNDS,
+                 stable_ms: int = RECONNECT_STABLE_MS, stall_ms: int = STALL_TIMEOUT_MS,
+                 audio_ms: int = AUDIO_TIMEOUT_MS):
+        super().__init__(parent)
+        self.delay_ms, self.max_delay_ms, self.rounds = delay_ms, max_delay_ms, rounds
+        self.stable_ms, self.stall_ms, self.audio_ms = stable_ms, stall_ms, audio_ms
+        self.stats: Dict[str, StreamStats] = {}
+        self.station: Optional[str] = None
+        self._urls: List[str] = []
+        self._url_i = 0
+        self._round_start = 0        # URL the current round of attempts began with
+        self._round = 0
+        self._phase = "idle"         # idle | connecting | playing | stalled | waiting
+        self._reconnecting = False   # the stream played, dropped, and is being reopened
+        self._t_start = self._t_drop = self._t_audio = self._t_stall = 0.0
+        self._retry = QtCore.QTimer(self)
+        self._retry.setSingleShot(True)
+        self._retry.timeout.connect(self._connect)
+        self._watchdog = QtCore.QTimer(self)
+        self._watchdog.setSingleShot(True)
+        self._watchdog.timeout.connect(self._on_watchdog)
+        self._drop = QtCore.QTimer(self)
+        self._drop.setSingleShot(True)
+        self._drop.setInterval(0)
+        self._drop.timeout.connect(self._on_dropped)
+        self._drop_reason = ""
+
+    @property
+    def active(self) -> bool:
+        return self._phase != "idle"
+
+    @property
+    def phase(self) -> str:
+        return self._phase
+
+    @property
+    def url(self) -> Optional[str]:
+        return self._urls[self._url_i] if self._urls else None
+
+    # --- control ---
+    def start(self, station: str, urls: Iterable[str]):
+        """Play `station` from the first of its URLs; the others are alternates."""
+        self.stop()
+        self._urls = list(dict.fromkeys(u for u in urls if u))
+        if not self._urls:
+            return
+        self.station = station
+        self.stats.setdefault(station, StreamStats(station))
+        self._url_i = self._round_start = self._round = 0
+        self._reconnecting = False
+        self._t_start = time.perf_counter()
+        self._connect()
+
+    def stop(self):
+        if self._phase == "stalled":
+            self._end_stall()
+        self._retry.stop()
+        self._watchdog.stop()
+        self._drop.stop()
+        self._phase = "idle"
+
+    # --- player events ---
+    def audio(self):
+        """Audio is flowing (data buffered or the position moved). Cheap to call on every tick."""
+        if self._phase == "connecting":
+            now = time.perf_counter()
+            st = self.stats[self.station]
+            if self._reconnecting:
+                ms = (now - self._t_drop) * 1000.0
+                st.add_reconnect(ms)
+                self.status.emit(f"Reconnected to {self.station} after {ms / 1000.0:.1f} s.")
+            else:
+                st.first_audio_ms = (now - self._t_start) * 1000.0
+            self._reconnecting = False
+            self._t_audio = now
+            self._round_start = self._url_i
+        elif self._phase == "stalled":
+            self._end_stall()
+        else:
+            return
+        self._watchdog.stop()
+        self._phase = "playing"
+
+    def stalled(self):
+        """The player ran out of data and is buffering."""
+        if self._phase != "playing":
+            return
+        self._phase = "stalled"
+        self._t_stall = time.perf_counter()
+        self.stats[self.station].rebuffers += 1
+        self._watchdog.start(self.stall_ms)
+        self.status.emit(f"Buffering {self.station}…")
+
+    def dropped(self, reason: str = "stream ended"):
+        """The stream errored or ended. Returns False when not supervising (a real error)."""
+        if self._phase in ("idle", "waiting"):
+            return self._phase == "waiting"
+        if not self._drop.isActive():
+            self._drop_reason = reason
+            self._drop.start()
+        return True
+
+    # --- internals ---
+    def _on_dropped(self):
+        reason = self._drop_reason
+        if self._phase in ("idle", "waiting"):
+            return
+        was_playing = self._phase in ("playing", "stalled")
+        if self._phase == "stalled":
+            self._end_stall()
+        if was_playing:
+            self._reconnecting = True
+            self._t_drop = time.perf_counter()
+            if (self._t_drop - self._t_audio) * 1000.0 >= self.stable_ms:
+                # it played fine for a while: try the same URL again straight away
+                self._round = 0
+                self._round_start = self._url_i
+                self.status.emit(f"{self.station}: {reason}. Reconnecting…")
+                self._connect()
+                return
+        self._fail(reason)
+
+    def _connect(self):
+        self._phase = "connecting"
+        st = self.stats[self.station]
+        st.connects += 1
+        if self._reconnecting:
+            st.reconnects += 1
+        self._watchdog.start(self.audio_ms)
+        self.connectRequested.emit(self._urls[self._url_i])
+
+    def _fail(self, reason: str):
+        self._watchdog.stop()
+        self._phase = "waiting"
+        self._url_i = (self._url_i + 1) % len(self._urls)
+        if self._url_i != self._round_start:
+            self.stats[self.station].failovers += 1
+            self.status.emit(f"{self.station}: {reason}. Trying another stream URL…")
+            self._connect()
+            return
+        self._round += 1
+        if self.rounds and self._round > self.rounds:
+            self._phase = "idle"
+            self.failed.emit(f"{self.station}: {reason}. Gave up after {self.rounds} attempts.")
+            return
+        delay = min(self.max_delay_ms, self.delay_ms * 2 ** (self._round - 1))
+        self.status.emit(f"{self.station}: {reason}. Reconnecting in {delay / 1000.0:.0f} s "
+                         f"(attempt {self._round})…")
+        self._retry.start(int(delay))
+
+    def _on_watchdog(self):
+        if self._phase == "connecting":
+            self._fail(f"no audio within {self.audio_ms / 1000.0:.0f} s")
+        elif self._phase == "stalled":
+            self.dropped(f"stalled for {self.stall_ms / 1000.0:.0f} s")
+
+    def _end_stall(self):
+        self.stats[self.station].add_stall((time.perf_counter() - self._t_stall) * 1000.0)
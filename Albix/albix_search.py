@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# albix_search.py — incremental trigram search index for the Albix playlist and station list
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import sys
+sys.dont_write_bytecode = True
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+_PREFIX = "\x00"  # namespaces word-prefix grams so they never collide with trigrams
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+def _terms(query: str) -> List[str]:
+    return normalize(query).split()
+
+def _grams(doc: str) -> Set[str]:
+    grams = {doc[i:i + 3] for i in range(1, len(doc) - 2)}
+    for word in doc.split():
+        grams.add(_PREFIX + word[:1])
+        if len(word) > 1:
+            grams.add(_PREFIX + word[:2])
+    return grams
+
+def _term_gram(term: str) -> List[str]:
+    """Grams a document must contain to match `term`."""
+    if len(term) < 3:
+        return [_PREFIX + term]
+    return [term[i:i + 3] for i in range(len(term) - 2)]
+
+def _needles(terms: List[str]) -> List[str]:
+    # Documents are stored with a leading space: terms of 3+ characters match
+    # anywhere, shorter ones only at the start of a word
+    return [(" " + t) if len(t) < 3 else t for t in terms]
+
+def _verify(docs: List[Optional[str]], candidates: Iterable[int], needles: List[str]) -> List[int]:
+    if len(needles) == 1:
+        n = needles[0]
+        return [i for i in candidates if (d := docs[i]) is not None and n in d]
+    if len(needles) == 2:
+        a, b = needles
+        return [i for i in candidates if (d := docs[i]) is not None and a in d and b in d]
+    return [i for i in candidates if (d := docs[i]) is not None and all(n in d for n in needles)]
+
+
+class SearchIndex:
+    """
+    Substring search over short documents (file names, tags, station names).
+
+    Every document is split into trigrams plus 1-2 character word prefixes,
+    each mapping to a compact array of document ids. A query walks the
+    shortest posting list among its grams and verifies the candidates, so
+    the cost tracks the number of plausible hits, not the index size.
+    Removals leave tombstones that are compacted once they pile up. The last
+    result is kept, so a query that extends the previous one (typing) only
+    re-checks the previous hits.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Hashable, int] = {}
+        self._keys: List[Optional[Hashable]] = []
+        self._docs: List[Optional[str]] = []
+        self._postings: Dict[str, array] = {}
+        self._dead = 0
+        self._last_terms: Optional[List[str]] = None
+        self._last_hits: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key) -> bool:
+        return key in self._ids
+
+    # --- edits ---
+    def add(self, key: Hashable, *fields: Optional[str]):
+        """Index `key` under the given text fields (replaces an existing entry)."""
+        if key in self._ids:
+            self.remove(key)
+        doc = " " + normalize(" ".join(f for f in fields if f))
+        doc_id = len(self._docs)
+        self._ids[key] = doc_id
+        self._keys.append(key)
+        self._docs.append(doc)
+        postings = self._postings
+        for g in _grams(doc):
+            arr = postings.get(g)
+            if arr is None:
+                postings[g] = arr = array("I")
+            arr.append(doc_id)
+        self._last_terms = None
+
+    def remove(self, key: Hashable) -> bool:
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return False
+        self._keys[doc_id] = None
+        self._docs[doc_id] = None
+        self._dead += 1
+        self._last_terms = None
+        if self._dead > 1024 and self._dead * 2 > len(self._docs):
+            self._compact()
+        return True
+
+    def clear(self):
+        self.__init__()
+
+    # --- queries ---
+    def query(self, text: str) -> Optional[List[Hashable]]:
+        """Keys matching every word of `text`, in insertion order. None for an empty query."""
+        terms = _terms(text)
+        if not terms:
+            return None
+        last = self._last_terms
+        if last is not None and self._last_hits is not None and self._narrows(last, terms):
+            candidates = self._last_hits
+        else:
+            candidates = self._candidates(terms)
+        hits = _verify(self._docs, candidates, _needles(terms))
+        self._last_terms = terms
+        self._last_hits = hits
+        keys = self._keys
+        return [keys[i] for i in hits]
+
+    # --- internals ---
+    def _candidates(self, terms: List[str]) -> Iterable[int]:
+        best = None
+        for t in terms:
+            for g in _term_gram(t):
+                arr = self._postings.get(g)
+                if arr is None:
+                    return ()
+                if best is None or len(arr) < len(best):
+                    best = arr
+        return best if best is not None else ()
+
+    @staticmethod
+    def _narrows(old: List[str], new: List[str]) -> bool:
+        """True when every hit for `new` is guaranteed to be a hit for `old`."""
+        if len(new) < len(old):
+            return False
+        for o, n in zip(old, new):
+            if len(o) < 3:
+                # word-prefix semantics only carry over while the term stays short
+                if len(n) >= 3 or not n.startswith(o):
+                    return False
+            elif o not in n:
+                return False
+        return True
+
+    def _compact(self):
+        live = [(k, d) for k, d in zip(self._keys, self._docs) if k is not None]
+        self.__init__()
+        for k, d in live:
+            doc_id = len(self._docs)
+            self._ids[k] = doc_id
+            self._keys.append(k)
+            self._docs.append(d)
+            for g in _grams(d):
+                arr = self._postings.get(g)
+                if arr is None:
+                    self._postings[g] = arr = array("I")
+                arr.append(doc_id)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# albix_session.py — session snapshot for Albix (memory-mapped playlist + small JSON state)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys, json, mmap, random, struct, tempfile
+sys.dont_write_bytecode = True
+from typing import Iterable, Iterator, List, Optional
+
+
+def _default_session_dir() -> str:
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "albix", "session")
+
+SESSION_DIR = os.environ.get("ALBIX_SESSION_DIR") or _default_session_dir()
+SESSION_ENABLED = os.environ.get("ALBIX_SESSION", "1").lower() not in ("0", "no", "false", "off")
+SESSION_SAVE_INTERVAL_MS = 30000   # periodic snapshot while running
+SESSION_FIRST_BATCH = 500          # rows restored before the first paint
+SESSION_FILL_BATCH = 5000          # rows restored per event-loop pass afterwards
+
+# Playlist file layout (little-endian):
+#   header   8s magic, I version, I count, Q playlist id
+#   offsets  (count + 1) x I, relative to the start of the records
+#   records  utf-8 "type\0path\0extra", extra = compact JSON of other keys or empty
+_MAGIC = b"ALBXPL01"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIQ")
+_OFFSET = struct.Struct("<I")
+_BASE_KEYS = ("type", "path")
+
+
+class SessionFormatError(ValueError):
+    """The snapshot file is not a playlist snapshot this version can read."""
+
+
+# -------- Playlist snapshot --------
+def _record(entry: dict) -> bytes:
+    extra = {k: v for k, v in entry.items() if k not in _BASE_KEYS}
+    tail = json.dumps(extra, ensure_ascii=False, separators=(",", ":")) if extra else ""
+    return f"{entry['type']}\0{entry['path']}\0{tail}".encode("utf-8", "surrogateescape")
+
+def _atomic_write(path: str, chunks: Iterable[bytes]):
+    target_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(target_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".albix-session-", dir=target_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def write_playlist_snapshot(path: str, entries: List[dict], playlist_id: Optional[int] = None) -> int:
+    """Write `entries` in the snapshot layout. Returns the playlist id stored in the header."""
+    playlist_id = playlist_id if playlist_id is not None else random.getrandbits(63)
+    records = [_record(e) for e in entries]
+    offsets = bytearray(_OFFSET.size * (len(records) + 1))
+    pos = 0
+    for i, rec in enumerate(records):
+        _OFFSET.pack_into(offsets, i * _OFFSET.size, pos)
+        pos += len(rec)
+    if pos > 0xFFFFFFFF:
+        raise ValueError("playlist too large for a session snapshot")
+    _OFFSET.pack_into(offsets, len(records) * _OFFSET.size, pos)
+    _atomic_write(path, [_HEADER.pack(_MAGIC, _VERSION, len(records), playlist_id), bytes(offsets), *records])
+    return playlist_id
+
+
+class PlaylistSnapshot:
+    """
+    Read-only view of a playlist snapshot through mmap. Opening it costs one
+    header read whatever the size; entries are decoded only when asked for,
+    so a large list can be handed to the model in slices.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise SessionFormatError("truncated session snapshot")
+            magic, version, self._count, self.playlist_id = _HEADER.unpack_from(self._mm, 0)
+            if magic != _MAGIC or version != _VERSION:
+                raise SessionFormatError("not an Albix session snapshot")
+            self._records = _HEADER.size + _OFFSET.size * (self._count + 1)
+            end = _OFFSET.unpack_from(self._mm, _HEADER.size + _OFFSET.size * self._count)[0]
+            if self._records + end > len(self._mm):
+                raise SessionFormatError("truncated session snapshot")
+        except (SessionFormatError, struct.error) as e:
+            self._mm.close()
+            raise SessionFormatError(str(e))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def entry(self, i: int) -> dict:
+        if not (0 <= i < self._count):
+            raise IndexError(i)
+        lo, hi = struct.unpack_from("<II", self._mm, _HEADER.size + _OFFSET.size * i)
+        raw = self._mm[self._records + lo:self._records + hi].decode("utf-8", "surrogateescape")
+        mtype, path, tail = raw.split("\0", 2)
+        it = json.loads(tail) if tail else {}
+        it["path"] = path
+        it["type"] = mtype
+        return it
+
+    def entries(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        stop = self._count if stop is None else min(stop, self._count)
+        for i in range(max(0, start), stop):
+            yield self.entry(i)
+
+    def close(self):
+        if not self._mm.closed:
+            self._mm.close()
+
+
+# -------- Store --------
+class SessionStore:
+    """
+    The session on disk: `playlist.bin` (rewritten only when the playlist
+    changed) and `state.json` (current track, position, modes, volume,
+    custom stations). The state names the playlist id it belongs to, so a
+    state left over from another playlist is not applied to this one.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or SESSION_DIR
+        self.playlist_path = os.path.join(self.directory, "playlist.bin")
+        self.state_path = os.path.join(self.directory, "state.json")
+        self.playlist_id: Optional[int] = None
+
+    def open_playlist(self) -> Optional[PlaylistSnapshot]:
+        try:
+            snap = PlaylistSnapshot(self.playlist_path)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print("albix_session: ignoring", self.playlist_path, "-", e)
+            return None
+        self.playlist_id = snap.playlist_id
+        return snap
+
+    def read_state(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print("albix_session: ignoring", self.state_path, "-", e)
+            return {}
+        if not isinstance(state, dict):
+            return {}
+        if state.get("playlist_id") != self.playlist_id:
+            # the track index refers to some other playlist
+            for k in ("current", "path", "position"):
+                state.pop(k, None)
+        return state
+
+    def save_playlist(self, entries: List[dict]):
+        self.playlist_id = write_playlist_snapshot(self.playlist_path, entries)
+
+    def save_state(self, state: dict):
+        state = dict(state, playlist_id=self.playlist_id)
+        data = json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        _atomic_write(self.state_path, [data])
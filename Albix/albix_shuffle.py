@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# albix_shuffle.py — lazy Fisher–Yates shuffle order with history for Albix
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import sys, random
+sys.dont_write_bytecode = True
+from typing import Dict, Hashable, Iterable, List, Optional
+
+
+class ShuffleEngine:
+    """
+    Shuffle order over playlist keys (paths), one cycle at a time.
+
+    `_order[:_generated]` is the part of the permutation already drawn (the
+    history, played or peeked); `_order[_generated:]` is the unplayed pool
+    in no particular order. Each step of next() performs one Fisher–Yates
+    swap, so every track plays once per cycle and next/prev are O(1).
+    Added keys join the pool; removed keys are swapped out of the pool or
+    left as tombstones in the history, so the order stays valid as the
+    playlist changes.
+    """
+
+    def __init__(self, keys: Iterable[Hashable] = (), rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+        self._order: List[Optional[Hashable]] = []
+        self._where: Dict[Hashable, int] = {}
+        self._generated = 0
+        self._pos = -1
+        self._dead = 0
+        self._last_of_cycle: Optional[Hashable] = None
+        self.reset(keys)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key) -> bool:
+        return key in self._where
+
+    @property
+    def current(self) -> Optional[Hashable]:
+        return self._order[self._pos] if 0 <= self._pos < len(self._order) else None
+
+    # --- playlist sync ---
+    def reset(self, keys: Iterable[Hashable] = ()):
+        self._order = list(dict.fromkeys(keys))
+        self._where = {k: i for i, k in enumerate(self._order)}
+        self._generated = 0
+        self._pos = -1
+        self._dead = 0
+
+    def add(self, key: Hashable):
+        if key in self._where:
+            return
+        self._where[key] = len(self._order)
+        self._order.append(key)
+
+    def remove(self, key: Hashable):
+        i = self._where.pop(key, None)
+        if i is None:
+            return
+        if i >= self._generated:
+            # Unplayed pool is unordered: fill the hole with the last element
+            last = self._order.pop()
+            if i < len(self._order):
+                self._order[i] = last
+                self._where[last] = i
+        else:
+            self._order[i] = None  # keep history positions stable
+            self._dead += 1
+            if self._dead > 64 and self._dead * 2 > self._generated:
+                self._compact()
+
+    # --- navigation ---
+    def start_at(self, key: Hashable):
+        """Make `key` the current track (user picked it) without breaking the cycle."""
+        i = self._where.get(key)
+        if i is None:
+            return
+        if i >= self._generated:
+            g = self._generated
+            self._swap(i, g)
+            self._generated += 1
+            i = g
+            if self._pos + 1 < g:
+                # play it right after the current track, ahead of anything already peeked
+                self._swap(g, self._pos + 1)
+                i = self._pos + 1
+        self._pos = i
+
+    def next(self) -> Optional[Hashable]:
+        """Advance and return the next key; starts a fresh cycle when all have played."""
+        if not self._where:
+            return None
+        if not self._ensure_ahead(1):
+            self._new_cycle()
+            self._ensure_ahead(1)
+        self._pos = self._next_live(self._pos)
+        return self._order[self._pos]
+
+    def prev(self) -> Optional[Hashable]:
+        """Step back through this cycle's history; None at its start."""
+        i = self._pos - 1
+        while i >= 0 and self._order[i] is None:
+            i -= 1
+        if i < 0:
+            return None
+        self._pos = i
+        return self._order[i]
+
+    def peek(self, count: int = 1) -> List[Hashable]:
+        """Upcoming keys (drawn now, played later). Does not cross into the next cycle."""
+        self._ensure_ahead(count)
+        out = []
+        i = self._pos
+        while len(out) < count:
+            i = self._next_live(i)
+            if i >= self._generated:
+                break
+            out.append(self._order[i])
+        return out
+
+    # --- internals ---
+    def _next_live(self, i: int) -> int:
+        i += 1
+        while i < self._generated and self._order[i] is None:
+            i += 1
+        return i
+
+    def _ensure_ahead(self, count: int) -> bool:
+        """Draw from the pool until `count` live keys follow the current position."""
+        ahead = 0
+        i = self._next_live(self._pos)
+        while i < self._generated and ahead < count:
+            ahead += 1
+            i = self._next_live(i)
+        while ahead < count and self._generated < len(self._order):
+            j = self._rng.randrange(self._generated, len(self._order))
+            if (self._generated == 0 and self._last_of_cycle is not None
+                    and self._order[j] == self._last_of_cycle and len(self._order) > 1):
+                # don't open a new cycle with the track that closed the previous one
+                j = self._generated + (j - self._generated + 1) % (len(self._order) - self._generated)
+            self._swap(j, self._generated)
+            self._generated += 1
+            ahead += 1
+        return ahead >= count
+
+    def _swap(self, a: int, b: int):
+        o = self._order
+        o[a], o[b] = o[b], o[a]
+        if o[a] is not None:
+            self._where[o[a]] = a
+        if o[b] is not None:
+            self._where[o[b]] = b
+
+    def _new_cycle(self):
+        self._last_of_cycle = self.current
+        self.reset(k for k in self._order if k is not None)
+
+    def _compact(self):
+        cur = self.current
+        live_before = sum(1 for k in self._order[:max(self._pos, 0)] if k is not None)
+        gen_live = [k for k in self._order[:self._generated] if k is not None]
+        pool = self._order[self._generated:]
+        self._order = gen_live + pool
+        self._where = {k: i for i, k in enumerate(self._order)}
+        self._generated = len(gen_live)
+        self._dead = 0
+        if cur is not None:
+            self._pos = self._where[cur]
+        else:
+            # current track was removed: continue from the last live entry before it
+            self._pos = live_before - 1
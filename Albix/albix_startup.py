@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# albix_startup.py — startup timing for Albix (time to first window, per phase)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys, json, time
+sys.dont_write_bytecode = True
+from typing import List, Optional, Tuple
+
+# ALBIX_STARTUP_REPORT=1 prints the phases; ALBIX_STARTUP_LOG=<file> appends one JSON line per start
+STARTUP_REPORT = os.environ.get("ALBIX_STARTUP_REPORT", "").lower() not in ("", "0", "no", "false")
+STARTUP_LOG_PATH = os.environ.get("ALBIX_STARTUP_LOG") or None
+
+
+class StartupTimer:
+    """Milliseconds since construction at each named mark; create it before the heavy imports."""
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        ms = (time.perf_counter() - self._t0) * 1000.0
+        self.marks.append((name, ms))
+        return ms
+
+    def report(self) -> str:
+        lines, prev = [], 0.0
+        for name, ms in self.marks:
+            lines.append(f"  {name:<20} {ms:8.1f} ms  (+{ms - prev:.1f})")
+            prev = ms
+        return "Albix startup:\n" + "\n".join(lines)
+
+    def as_dict(self, **info) -> dict:
+        return dict(info, time=time.time(), marks={name: round(ms, 1) for name, ms in self.marks})
+
+    def finish(self, name: str, log_path: Optional[str] = STARTUP_LOG_PATH, print_report: bool = STARTUP_REPORT,
+               **info):
+        """Record the last mark, then print and/or log the run as configured."""
+        self.mark(name)
+        if print_report:
+            print(self.report())
+        if log_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+                with open(log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self.as_dict(**info), separators=(",", ":")) + "\n")
+            except OSError as e:
+                print("albix_startup: cannot write", log_path, "-", e)
@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+# albix_stations.py — radio station directory for Albix (SQLite, trigram search, station-list import, list model)
+# GPL v2 — JJ Posti (techtimejourney.net) 2025.
+
+import os, sys, csv, json, time, sqlite3, threading
+sys.dont_write_bytecode = True
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import albix_core
+import albix_playlist_io
+import albix_radio
+import albix_search
+
+# -------- Qt shims --------
+USING_QT6 = False
+try:
+    from PyQt6 import QtCore, QtGui
+    from PyQt6.QtCore import Qt, pyqtSignal
+    USING_QT6 = True
+except Exception:
+    from PyQt5 import QtCore, QtGui
+    from PyQt5.QtCore import Qt, pyqtSignal
+    USING_QT6 = False
+
+if USING_QT6:
+    DisplayRole = Qt.ItemDataRole.DisplayRole
+    ToolTipRole = Qt.ItemDataRole.ToolTipRole
+    ForegroundRole = Qt.ItemDataRole.ForegroundRole
+else:
+    DisplayRole = Qt.DisplayRole
+    ToolTipRole = Qt.ToolTipRole
+    ForegroundRole = Qt.ForegroundRole
+
+
+def _default_db_path() -> str:
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "albix", "stations.db")
+
+STATIONS_DB_PATH = os.environ.get("ALBIX_STATIONS_DB") or _default_db_path()
+STATIONS_BATCH_SIZE = 1000   # rows per transaction during imports
+STATIONS_PAGE_SIZE = 256     # rows the list model reads at a time
+STATIONS_PAGES_KEPT = 64     # pages the list model keeps in memory
+DEAD_STATION_COLOR = "#7d8a92"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stations (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    url         TEXT NOT NULL,
+    country     TEXT,
+    genre       TEXT,
+    bitrate     INTEGER,
+    custom      INTEGER NOT NULL DEFAULT 0,
+    doc         TEXT NOT NULL,
+    probe_ok    INTEGER,
+    probe_ms    REAL,
+    connect_ms  REAL,
+    probe_error TEXT,
+    probed      REAL,
+    alt_url     TEXT
+);
+"""
+
+# External-content trigram index over `doc`. Single edits update it row by row;
+# an import rebuilds it once at the end, which is several times faster than
+# indexing tens of thousands of rows one at a time.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS stations_fts USING fts5(doc, content='stations', content_rowid='id',
+                                                          tokenize='trigram');
+"""
+
+_COLUMNS = ("id, name, url, country, genre, bitrate, custom, probe_ok, probe_ms, connect_ms, probe_error, probed, "
+            "alt_url")
+
+_ORDERS = {
+    "added": "id",
+    "name": "name COLLATE NOCASE, id",
+    # alive by time to first audio, then dead, then never checked
+    "health": "CASE probe_ok WHEN 1 THEN 0 WHEN 0 THEN 1 ELSE 2 END, "
+              "CASE probe_ok WHEN 1 THEN probe_ms END, name COLLATE NOCASE",
+}
+
+
+def _doc(name: str, country: Optional[str], genre: Optional[str]) -> str:
+    # the same normalized text albix_search indexes, so filters behave alike everywhere
+    return " " + albix_search.normalize(" ".join(f for f in (name, genre, country) if f))
+
+
+# -------- Data --------
+@dataclass
+class StationInfo:
+    id: int
+    name: str
+    url: str
+    country: Optional[str] = None
+    genre: Optional[str] = None
+    bitrate: Optional[int] = None
+    custom: bool = False
+    probe_ok: Optional[bool] = None      # None: never checked
+    probe_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    probe_error: Optional[str] = None
+    probed: Optional[float] = None
+    alt_url: Optional[str] = None        # failover stream
+
+    def health(self) -> Optional[albix_radio.ProbeResult]:
+        """The last check as a ProbeResult, or None."""
+        if self.probe_ok is None:
+            return None
+        return albix_radio.ProbeResult(self.name, self.url, bool(self.probe_ok), connect_ms=self.connect_ms or 0.0,
+                                       first_byte_ms=self.probe_ms or 0.0, error=self.probe_error or "",
+                                       checked=self.probed or 0.0)
+
+    def tooltip(self) -> str:
+        facts = [f for f in (self.country, self.genre, f"{self.bitrate} kbps" if self.bitrate else None) if f]
+        lines = [" · ".join(facts)] if facts else []
+        probe = self.health()
+        if probe is not None:
+            lines.append(probe.summary())
+        lines.append(self.url)
+        if self.alt_url:
+            lines.append(f"Backup: {self.alt_url}")
+        return "\n".join(lines)
+
+
+# -------- Station-list files --------
+def _text(v) -> Optional[str]:
+    if v is None:
+        return None
+    s = str(v).strip()
+    return s or None
+
+def _bitrate(v) -> Optional[int]:
+    try:
+        b = int(float(v))
+    except (TypeError, ValueError):
+        return None
+    return b if b > 0 else None
+
+def station_record(obj) -> Optional[dict]:
+    """
+    Normalize one station from a dump ({"name", "url", ...}; radio-browser
+    style keys such as url_resolved, tags and countrycode are understood).
+    A second URL (alt_url, or radio-browser's url next to url_resolved)
+    becomes the failover stream. None when it has no usable name and URL.
+    """
+    if not isinstance(obj, dict):
+        return None
+    low = {str(k).strip().lower(): v for k, v in obj.items()}
+    name = _text(low.get("name") or low.get("title") or low.get("station"))
+    url = _text(low.get("url_resolved") or low.get("url") or low.get("stream") or low.get("stream_url"))
+    if not name or not url or "://" not in url:
+        return None
+    alt = _text(low.get("alt_url") or low.get("backup_url") or low.get("url"))
+    return {"name": " ".join(name.split()), "url": url, "alt_url": alt if alt != url and "://" in (alt or "") else None,
+            "country": _text(low.get("country") or low.get("countrycode")),
+            "genre": _text(low.get("genre") or low.get("tags")),
+            "bitrate": _bitrate(low.get("bitrate"))}
+
+def iter_station_file(path: str, stats: Optional[dict] = None) -> Iterator[dict]:
+    """
+    Station records from a station-list dump: a JSON array, JSON Lines,
+    CSV/TSV with a header row, or an M3U/PLS/XSPF playlist of streams.
+    Unusable rows are skipped and counted in `stats["skipped"]`.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("skipped", 0)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in albix_playlist_io.M3U_EXTENSIONS | albix_playlist_io.PLS_EXTENSIONS | albix_playlist_io.XSPF_EXTENSIONS:
+        for it in albix_playlist_io.iter_playlist(path, stats, ext_types={}):
+            if it["type"] == "radio":
+                yield {"name": it.get("title") or it["path"], "url": it["path"]}
+        return
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if ext in (".csv", ".tsv"):
+            rows = csv.DictReader(f, dialect="excel-tab" if ext == ".tsv" else "excel")
+        else:
+            head = f.read(4096).lstrip()[:1]
+            f.seek(0)
+            if head == "[":
+                try:
+                    rows = json.load(f)
+                except ValueError as e:
+                    raise albix_playlist_io.PlaylistFormatError(f"Malformed station list: {e}")
+                if not isinstance(rows, list):
+                    rows = []
+            elif head == "{":
+                rows = (_json_line(line) for line in f if line.strip())
+            elif head == "":
+                return
+            else:
+                raise albix_playlist_io.PlaylistFormatError("The selected file is not a station list.")
+        for obj in rows:
+            rec = station_record(obj)
+            if rec is None:
+                stats["skipped"] += 1
+                continue
+            yield rec
+
+def _json_line(line: str):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+# -------- Directory --------
+class StationDirectory:
+    """
+    Radio stations on disk: name, stream URL, country, genre, bitrate and
+    the last health check. Names are unique, because playback asks for a
+    station by name. A trigram index over name, genre and country answers
+    filters without scanning; without FTS5 in the sqlite build the same
+    queries fall back to a scan. Stations the user added are marked custom
+    and are never overwritten by an import.
+
+    Same station API as albix_core.StationRegistry, so it can be handed to
+    the PlaybackController. Safe to share between threads; one connection
+    is serialized by a lock.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, defaults: Optional[Dict[str, str]] = None):
+        self.db_path = db_path or STATIONS_DB_PATH
+        self.persistent = self.db_path != ":memory:"
+        if self.persistent:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                pass
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            if "alt_url" not in {r[1] for r in self._conn.execute("PRAGMA table_info(stations)")}:
+                self._conn.execute("ALTER TABLE stations ADD COLUMN alt_url TEXT")
+            try:
+                self._conn.executescript(_FTS_SCHEMA)
+                self._fts = True
+            except sqlite3.OperationalError:
+                self._fts = False
+            seeded = self._conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+            self._conn.commit()
+        if not seeded:
+            # first run: the built-in stations, once; removing one later is remembered
+            for name, url in (albix_core.DEFAULT_STATIONS if defaults is None else defaults).items():
+                self.add(name, url, custom=False)
+            with self._lock:
+                self._conn.execute("PRAGMA user_version = 1")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- StationRegistry API ---
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM stations").fetchone()[0]
+
+    def __contains__(self, name) -> bool:
+        return self.url(name) is not None
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT name FROM stations ORDER BY id")]
+
+    def url(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT url FROM stations WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def urls(self, name: str) -> List[str]:
+        """The station's stream URL followed by its failover URL, if any."""
+        with self._lock:
+            row = self._conn.execute("SELECT url, alt_url FROM stations WHERE name = ?", (name,)).fetchone()
+        return [u for u in row if u] if row else []
+
+    def add(self, name: str, url: str, country: Optional[str] = None, genre: Optional[str] = None,
+            bitrate: Optional[int] = None, custom: bool = True, alt_url: Optional[str] = None) -> bool:
+        """Add or update a station. Returns True when the name is new."""
+        with self._lock:
+            old = self._conn.execute("SELECT id, doc FROM stations WHERE name = ?", (name,)).fetchone()
+            self._upsert([(name, url, country, genre, bitrate, int(custom), _doc(name, country, genre), alt_url)],
+                         force=True)
+            if self._fts:
+                row = self._conn.execute("SELECT id, doc FROM stations WHERE name = ?", (name,)).fetchone()
+                if old != row:
+                    if old is not None:
+                        self._conn.execute("INSERT INTO stations_fts(stations_fts, rowid, doc) VALUES ('delete', ?, ?)", old)
+                    self._conn.execute("INSERT INTO stations_fts(rowid, doc) VALUES (?, ?)", row)
+            self._conn.commit()
+        return old is None
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            old = self._conn.execute("SELECT id, doc FROM stations WHERE name = ?", (name,)).fetchone()
+            if old is None:
+                return False
+            if self._fts:
+                self._conn.execute("INSERT INTO stations_fts(stations_fts, rowid, doc) VALUES ('delete', ?, ?)", old)
+            self._conn.execute("DELETE FROM stations WHERE id = ?", (old[0],))
+            self._conn.commit()
+        return True
+
+    def query(self, text: str) -> Optional[List[str]]:
+        """Matching names, or None when `text` filters nothing."""
+        if not albix_search.normalize(text):
+            return None
+        ids = self.ids(text)
+        return [s.name for s in self.rows(ids).values()]
+
+    def as_dict(self, ids: Optional[Iterable[int]] = None) -> Dict[str, str]:
+        """name -> URL for all stations, or just for `ids`."""
+        if ids is not None:
+            return {s.name: s.url for s in self.rows(ids).values()}
+        with self._lock:
+            return dict(self._conn.execute("SELECT name, url FROM stations ORDER BY id"))
+
+    def custom(self) -> Dict[str, str]:
+        """name -> URL of the stations the user added."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT name, url FROM stations WHERE custom = 1 ORDER BY id"))
+
+    def record_probes(self, results: Iterable[albix_radio.ProbeResult]):
+        """Store health check results (skipping stations whose URL changed meanwhile)."""
+        rows = [(int(r.ok), r.first_byte_ms if r.ok else None, r.connect_ms if r.ok else None,
+                 r.error or None, r.checked or time.time(), r.name, r.url) for r in results]
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE stations SET probe_ok = ?, probe_ms = ?, connect_ms = ?, probe_error = ?, probed = ? "
+                "WHERE name = ? AND url = ?", rows)
+            self._conn.commit()
+
+    # --- listing ---
+    def ids(self, text: str = "", order: str = "added") -> List[int]:
+        """
+        Ids of the stations matching every word of `text` (albix_search
+        rules: words of 3+ characters match anywhere in name, genre or
+        country, shorter ones the start of a word), in `order`.
+        """
+        terms = albix_search.normalize(text).split()
+        where, args = [], []
+        long_terms = [t for t in terms if len(t) >= 3]
+        if long_terms and self._fts:
+            where.append("id IN (SELECT rowid FROM stations_fts WHERE stations_fts MATCH ?)")
+            args.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for t in terms:
+            # the trigram match is case-insensitive over its own folding; this makes it exact
+            where.append("instr(doc, ?) > 0")
+            args.append(t if len(t) >= 3 else " " + t)
+        sql = "SELECT id FROM stations"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + _ORDERS.get(order, _ORDERS["added"])
+        with self._lock:
+            return [r[0] for r in self._conn.execute(sql, args)]
+
+    def rows(self, ids: Iterable[int]) -> Dict[int, StationInfo]:
+        """id -> StationInfo for the given ids, in the order asked for."""
+        ids = list(ids)
+        found = {}
+        for i in range(0, len(ids), STATIONS_BATCH_SIZE // 2):
+            chunk = ids[i:i + STATIONS_BATCH_SIZE // 2]
+            q = ",".join("?" * len(chunk))
+            with self._lock:
+                for row in self._conn.execute(f"SELECT {_COLUMNS} FROM stations WHERE id IN ({q})", chunk):
+                    found[row[0]] = StationInfo(*row[:6], bool(row[6]),
+                                                None if row[7] is None else bool(row[7]), *row[8:])
+        return {i: found[i] for i in ids if i in found}
+
+    # --- import ---
+    def import_stations(self, records: Iterable[dict], cancel: Optional[threading.Event] = None,
+                        progress=None) -> int:
+        """
+        Add or refresh stations from station_record()-style dicts, in
+        STATIONS_BATCH_SIZE transactions. Within one import, a name that
+        comes back with another URL gets its country (or a number) appended
+        rather than replacing the first. Returns the number of rows written;
+        `progress(done)` is called after every batch. Searches may miss the
+        new rows until the import has finished.
+        """
+        try:
+            return self._import(records, cancel, progress)
+        finally:
+            if self._fts:
+                with self._lock:
+                    self._conn.execute("INSERT INTO stations_fts(stations_fts) VALUES ('rebuild')")
+                    self._conn.commit()
+
+    def import_file(self, path: str, stats: Optional[dict] = None, cancel: Optional[threading.Event] = None,
+                    progress=None) -> int:
+        return self.import_stations(iter_station_file(path, stats), cancel, progress)
+
+    # --- internals ---
+    def _import(self, records: Iterable[dict], cancel: Optional[threading.Event], progress) -> int:
+        seen: Dict[str, str] = {}
+        batch, done = [], 0
+        for rec in records:
+            if cancel is not None and cancel.is_set():
+                break
+            name, url = rec["name"], rec["url"]
+            if seen.get(name, url) != url:
+                base = f"{name} ({rec['country']})" if rec.get("country") else name
+                name, n = base, 2
+                while seen.get(name, url) != url:
+                    name, n = f"{base} [{n}]", n + 1
+            seen[name] = url
+            batch.append((name, url, rec.get("country"), rec.get("genre"), rec.get("bitrate"), 0,
+                          _doc(name, rec.get("country"), rec.get("genre")), rec.get("alt_url")))
+            if len(batch) >= STATIONS_BATCH_SIZE:
+                done += self._write_batch(batch)
+                batch = []
+                if progress is not None:
+                    progress(done)
+        if batch:
+            done += self._write_batch(batch)
+            if progress is not None:
+                progress(done)
+        return done
+
+    def _write_batch(self, rows: List[tuple]) -> int:
+        with self._lock:
+            n = self._upsert(rows, force=False)
+            self._conn.commit()
+        return n
+
+    def _upsert(self, rows: List[tuple], force: bool) -> int:
+        # an import refreshes its own rows but leaves the user's stations alone
+        keep_custom = "" if force else " WHERE stations.custom = 0"
+        cur = self._conn.executemany(
+            "INSERT INTO stations (name, url, country, genre, bitrate, custom, doc, alt_url) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET url = excluded.url, alt_url = excluded.alt_url, "
+            "country = coalesce(excluded.country, stations.country), genre = coalesce(excluded.genre, stations.genre), "
+            "bitrate = coalesce(excluded.bitrate, stations.bitrate), custom = max(stations.custom, excluded.custom), "
+            "doc = CASE WHEN excluded.country IS NULL AND excluded.genre IS NULL THEN stations.doc ELSE excluded.doc END, "
+            "probe_ok = CASE WHEN stations.url = excluded.url THEN stations.probe_ok END, "
+            "probe_ms = CASE WHEN stations.url = excluded.url THEN stations.probe_ms END, "
+            "connect_ms = CASE WHEN stations.url = excluded.url THEN stations.connect_ms END, "
+            "probe_error = CASE WHEN stations.url = excluded.url THEN stations.probe_error END, "
+            "probed = CASE WHEN stations.url = excluded.url THEN stations.probed END" + keep_custom, rows)
+        return max(cur.rowcount, 0)
+
+
+# -------- Shared instance --------
+_directory: Optional[StationDirectory] = None
+_directory_lock = threading.Lock()
+
+def get_directory() -> StationDirectory:
+    """Process-wide directory, opened on first use. Falls back to memory if the file cannot be opened."""
+    global _directory
+    with _directory_lock:
+        if _directory is None:
+            try:
+                _directory = StationDirectory()
+            except Exception as e:
+                print("albix_stations: cannot open", STATIONS_DB_PATH, "-", e)
+                _directory = StationDirectory(":memory:")
+    return _directory
+
+
+class StationImporter(QtCore.QObject):
+    """
+    Runs StationDirectory.import_file() in a background thread. Signals
+    arrive on the GUI thread: progress(rows written), then finished(rows,
+    skipped, error text or "").
+    """
+
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(int, int, str)
+
+    def __init__(self, directory: StationDirectory, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.directory = directory
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, path: str) -> bool:
+        if self.is_running():
+            return False
+        self._cancel = cancel = threading.Event()
+
+        def run():
+            stats, done, err = {}, 0, ""
+            try:
+                done = self.directory.import_file(path, stats, cancel, self.progress.emit)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                err = str(e)
+            self.finished.emit(done, stats.get("skipped", 0), err)
+
+        self._thread = threading.Thread(target=run, name="albix-station-import", daemon=True)
+        self._thread.start()
+        return True
+
+    def cancel(self):
+        self._cancel.set()
+
+
+# -------- Model --------
+class StationListModel(QtCore.QAbstractListModel):
+    """
+    The station list for a QListView. Holds only the ids of the listed
+    stations (one indexed query per filter or order change); names, tooltips
+    and health are read from the directory a page at a time, when rows are
+    painted, and the most recent pages are kept.
+    """
+
+    def __init__(self, directory: StationDirectory, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.directory = directory
+        self._ids: List[int] = []
+        self._text = ""
+        self._order = "added"
+        self._pages: "OrderedDict[int, Dict[int, StationInfo]]" = OrderedDict()
+        self._dead_brush = QtGui.QBrush(QtGui.QColor(DEAD_STATION_COLOR))
+        self.annotate = None   # optional callable(name) -> extra tooltip line or None
+
+    # --- Qt model API ---
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index, role=DisplayRole):
+        if not index.isValid() or role not in (DisplayRole, ToolTipRole, ForegroundRole):
+            return None
+        info = self.info(index.row())
+        if info is None:
+            return None
+        if role == DisplayRole:
+            return info.name
+        if role == ToolTipRole:
+            extra = self.annotate(info.name) if self.annotate is not None else None
+            return info.tooltip() + "\n" + extra if extra else info.tooltip()
+        if info.probe_ok is False:
+            return self._dead_brush
+        return None
+
+    # --- lookup ---
+    @property
+    def order(self) -> str:
+        return self._order
+
+    def ids(self) -> List[int]:
+        return list(self._ids)
+
+    def info(self, row: int) -> Optional[StationInfo]:
+        if not (0 <= row < len(self._ids)):
+            return None
+        page_no = row // STATIONS_PAGE_SIZE
+        page = self._pages.get(page_no)
+        if page is None:
+            start = page_no * STATIONS_PAGE_SIZE
+            page = self.directory.rows(self._ids[start:start + STATIONS_PAGE_SIZE])
+            self._pages[page_no] = page
+            if len(self._pages) > STATIONS_PAGES_KEPT:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        return page.get(self._ids[row])
+
+    def name(self, row: int) -> Optional[str]:
+        info = self.info(row)
+        return info.name if info is not None else None
+
+    # --- edits ---
+    def set_filter(self, text: str):
+        self._text = text
+        self.refresh()
+
+    def set_order(self, order: str):
+        self._order = order
+        self.refresh()
+
+    def refresh(self):
+        """Re-run the query, e.g. after stations were added or checked."""
+        self.beginResetModel()
+        self._ids = self.directory.ids(self._text, self._order)
+        self._pages.clear()
+        self.endResetModel()